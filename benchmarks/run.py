@@ -0,0 +1,317 @@
+"""Offline benchmarks for the client.
+
+Every benchmark runs against the fake API and storage host in
+`tests/fake_server.py`, so no token or network access is needed. Run them
+from the repository root:
+
+    python -m benchmarks.run
+    python -m benchmarks.run --latency 0.02 --bandwidth 50e6 upload_files
+    python -m benchmarks.run --http2 gql download_file
+
+Each benchmark is repeated and the best and median wall-clock times are
+reported, together with operations and bytes per second.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from bln import queries as q
+from bln.catalog import Catalog
+from bln.client import _gql, _ungraphql
+from bln.models import build
+from tests.fake_server import FakeBLN
+
+BENCHMARKS = {}
+
+
+def benchmark(func):
+    """Register a benchmark; it returns (operations, bytes) for one run."""
+    BENCHMARKS[func.__name__.removeprefix("bench_")] = func
+    return func
+
+
+@benchmark
+def bench_gql(ctx):
+    """Fetch and unwrap `everything` through `Client._gql`."""
+    for _ in range(ctx.args.calls):
+        ctx.client.everything()
+    return ctx.args.calls, 0
+
+
+@benchmark
+def bench_ungraphql(ctx):
+    """Unwrap a cached `everything` payload without touching the network."""
+    for _ in range(ctx.args.calls):
+        _ungraphql(ctx.everything_raw)
+    return ctx.args.calls, 0
+
+
+@benchmark
+def bench_models(ctx):
+    """Build typed models from the same cached `everything` payload."""
+    for _ in range(ctx.args.calls):
+        build(ctx.everything_raw)
+    return ctx.args.calls, 0
+
+
+@benchmark
+def bench_search_projects(ctx):
+    """Search projects by name."""
+    for i in range(ctx.args.calls):
+        ctx.client.search_projects(lambda p, i=i: p["name"].endswith(str(i)))
+    return ctx.args.calls, 0
+
+
+@benchmark
+def bench_catalog_refresh(ctx):
+    """Refresh a local catalog in full."""
+    for _ in range(ctx.args.calls):
+        ctx.catalog.refresh(ctx.client, incremental=False)
+    return ctx.args.calls, 0
+
+
+@benchmark
+def bench_catalog_refresh_incremental(ctx):
+    """Refresh a local catalog when one project changed."""
+    for i in range(ctx.args.calls):
+        ctx.server.add_file(ctx.transfer_project, "touched.csv", str(i).encode())
+        ctx.catalog.refresh(ctx.client)
+    return ctx.args.calls, 0
+
+
+@benchmark
+def bench_upload_files(ctx):
+    """Upload a batch of files."""
+    ctx.client.upload_files(ctx.transfer_project, ctx.paths)
+    return len(ctx.paths), ctx.transfer_bytes
+
+
+@benchmark
+def bench_download_file(ctx):
+    """Download a batch of files one after another."""
+    with tempfile.TemporaryDirectory() as out:
+        for path in ctx.paths:
+            name = os.path.basename(path)
+            ctx.client.download_file(ctx.transfer_project, name, output_dir=out)
+    return len(ctx.paths), ctx.transfer_bytes
+
+
+@benchmark
+def bench_download_segmented(ctx):
+    """Download the same batch, each file as parallel byte ranges."""
+    with tempfile.TemporaryDirectory() as out:
+        for path in ctx.paths:
+            name = os.path.basename(path)
+            ctx.client.download_file(
+                ctx.transfer_project, name, output_dir=out, segments=ctx.args.segments
+            )
+    return len(ctx.paths), ctx.transfer_bytes
+
+
+@benchmark
+def bench_read_bln(ctx):
+    """Read a CSV into a DataFrame with `read_bln`."""
+    if not ctx.pd:
+        return None
+    for _ in range(ctx.args.calls):
+        ctx.pd.read_bln(ctx.csv_project, "frame.csv", client=ctx.client)
+    return ctx.args.calls, ctx.args.calls * ctx.csv_bytes
+
+
+@benchmark
+def bench_read_bln_async(ctx):
+    """Read the same CSVs as `read_bln`, gathered on one event loop."""
+    if not ctx.pd or not ctx.httpx:
+        return None
+    import asyncio
+
+    async def read_all():
+        await asyncio.gather(
+            *(
+                ctx.pd.read_bln_async(ctx.csv_project, "frame.csv", client=ctx.client)
+                for _ in range(ctx.args.calls)
+            )
+        )
+
+    asyncio.run(read_all())
+    return ctx.args.calls, ctx.args.calls * ctx.csv_bytes
+
+
+@benchmark
+def bench_to_bln(ctx):
+    """Write a DataFrame as CSV with `to_bln`."""
+    if not ctx.pd:
+        return None
+    for _ in range(ctx.args.calls):
+        ctx.frame.to_bln(ctx.csv_project, "frame.csv", client=ctx.client, index=False)
+    return ctx.args.calls, ctx.args.calls * ctx.csv_bytes
+
+
+class Context:
+    """The fake server, client and fixtures shared by the benchmarks."""
+
+    def __init__(self, server, args, workdir):
+        """Populate `server` according to the command-line `args`."""
+        self.server = server
+        self.args = args
+        self.client = server.client(
+            http2=args.http2, persisted_queries=args.persisted_queries
+        )
+        # let the transfer files be split
+        self.client.MIN_SEGMENT_SIZE = args.transfer_size // args.segments
+        for i in range(args.projects):
+            files = {f"file{j}.csv": b"a,b\n1,2\n" for j in range(args.files)}
+            server.add_project(f"Project {i}", files=files, tags=["bench"])
+        self.everything_raw, _err = _gql(
+            self.client.endpoint, self.client.token, q.query_everything, ungraphql=False
+        )
+        self.transfer_project = server.add_project("Transfers")
+        self.paths = []
+        for i in range(args.transfer_files):
+            path = os.path.join(workdir, f"transfer{i}.bin")
+            with open(path, "wb") as f:
+                f.write(os.urandom(args.transfer_size))
+            self.paths.append(path)
+        self.transfer_bytes = args.transfer_files * args.transfer_size
+        for path in self.paths:
+            with open(path, "rb") as f:
+                server.add_file(self.transfer_project, os.path.basename(path), f.read())
+        self.catalog = Catalog()
+        self.catalog.refresh(self.client)
+        self.pd = self._pandas()
+        try:
+            import httpx  # noqa: F401
+        except ImportError:
+            self.httpx = False
+        else:
+            self.httpx = True
+
+    def _pandas(self):
+        try:
+            import pandas as pd
+        except ImportError:
+            return None
+        import bln
+
+        bln.pandas.register(pd)
+        self.frame = pd.DataFrame(
+            {
+                "a": range(self.args.rows),
+                "b": [f"row {i}" for i in range(self.args.rows)],
+            }
+        )
+        data = self.frame.to_csv(index=False).encode()
+        self.csv_bytes = len(data)
+        self.csv_project = self.server.add_project("Frames", files={"frame.csv": data})
+        return pd
+
+
+def parse_args(argv):
+    """Parse arguments."""
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.run",
+        description="Offline benchmarks for the Big Local News Python Client",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument(
+        "names",
+        nargs="*",
+        help=f"benchmarks to run, from {', '.join(BENCHMARKS)}; all if omitted",
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="runs per benchmark")
+    parser.add_argument("--calls", type=int, default=10, help="calls per run")
+    parser.add_argument("--projects", type=int, default=50, help="fake projects")
+    parser.add_argument("--files", type=int, default=20, help="files per project")
+    parser.add_argument(
+        "--transfer-files", type=int, default=8, help="files per transfer run"
+    )
+    parser.add_argument(
+        "--transfer-size", type=int, default=4 * 1024 * 1024, help="bytes per file"
+    )
+    parser.add_argument(
+        "--segments", type=int, default=4, help="ranges per segmented download"
+    )
+    parser.add_argument("--rows", type=int, default=100_000, help="DataFrame rows")
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="seconds added per request"
+    )
+    parser.add_argument(
+        "--bandwidth", type=float, default=None, help="bytes per second per request"
+    )
+    parser.add_argument(
+        "--error-rate",
+        type=float,
+        default=0.0,
+        help="share of requests that fail; note the client retries after 15 s",
+    )
+    parser.add_argument(
+        "--http2",
+        action="store_true",
+        help="send requests with the httpx HTTP/2 transport instead of requests",
+    )
+    parser.add_argument(
+        "--persisted-queries",
+        action="store_true",
+        help="send GraphQL queries as hashes once the server has seen them",
+    )
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    return parser.parse_args(argv)
+
+
+def run(func, ctx, repeat):
+    """Time `repeat` runs of a benchmark and summarize them."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        counts = func(ctx)
+        times.append(time.perf_counter() - start)
+        if counts is None:
+            return None
+    ops, nbytes = counts
+    median = statistics.median(times)
+    return {
+        "best": min(times),
+        "median": median,
+        "ops_per_second": ops / median,
+        "bytes_per_second": nbytes / median if nbytes else None,
+    }
+
+
+def main(argv=None):
+    """Run the benchmarks and print a report."""
+    args = parse_args(argv if argv is not None else sys.argv[1:])
+    names = args.names or list(BENCHMARKS)
+    unknown = set(names) - set(BENCHMARKS)
+    if unknown:
+        sys.exit(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+    results = {}
+    server = FakeBLN()
+    with server, tempfile.TemporaryDirectory() as workdir:
+        ctx = Context(server, args, workdir)
+        server.latency = args.latency
+        server.bandwidth = args.bandwidth
+        server.error_rate = args.error_rate
+        for name in names:
+            results[name] = run(BENCHMARKS[name], ctx, args.repeat)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'benchmark':<34} {'best s':>9} {'median s':>9} {'ops/s':>9} {'MB/s':>9}")
+    for name, r in results.items():
+        if r is None:
+            print(f"{name:<34} {'skipped':>9}")
+            continue
+        mbps = f"{r['bytes_per_second'] / 1e6:9.1f}" if r["bytes_per_second"] else ""
+        print(
+            f"{name:<34} {r['best']:9.4f} {r['median']:9.4f} "
+            f"{r['ops_per_second']:9.1f} {mbps:>9}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,16 @@
-from . import pandas
-from .client import Client
+import importlib
+
+# Client and the pandas extensions are loaded on first access, so that
+# `import bln` stays cheap
+_LAZY = {"Client": ".client", "pandas": ".pandas"}
 
 __all__ = ("Client", "pandas")
+
+
+def __getattr__(name):
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(_LAZY[name], __name__)
+    value = module if name == "pandas" else getattr(module, name)
+    globals()[name] = value
+    return value
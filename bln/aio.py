@@ -0,0 +1,203 @@
+"""Whole-file transfers as coroutines, for code running in an event loop.
+
+The client's methods block the thread that calls them. These coroutines
+mint uris and move bytes over an `httpx.AsyncClient` instead, so many
+transfers can share one event loop without a thread each. They use the
+client's token, endpoint, timeout and download uri cache, and respect the
+`bln.deadline.Deadline` in effect. httpx is an optional dependency:
+`pip install httpx[http2]`.
+"""
+
+import asyncio
+import contextlib
+import hashlib
+import logging
+import weakref
+
+from . import queries as q
+from .deadline import current
+from .exceptions import APIException, Cancelled
+from .manifest import same_md5
+
+logger = logging.getLogger(__name__)
+
+# how many files one client may be transferring, and so holding in memory,
+# at once on each event loop
+MAX_TRANSFERS = 8
+
+# the connections of each client in use on each event loop
+_states = weakref.WeakKeyDictionary()
+
+
+class _State:
+    """The connections and transfer limit of one client on one event loop."""
+
+    def __init__(self, client):
+        self.timeout = client.timeout
+        self.users = 0
+        self.limit = asyncio.Semaphore(MAX_TRANSFERS)
+        self._session = None
+        self._lock = asyncio.Lock()
+
+    async def session(self):
+        """Return the `AsyncSession`, opening it on first use."""
+        async with self._lock:
+            if self._session is None:
+                from .transport import AsyncSession
+
+                # loading certificates takes a while; keep the loop running
+                self._session = await asyncio.to_thread(AsyncSession, self.timeout)
+        return self._session
+
+    async def aclose(self):
+        if self._session is not None:
+            await self._session.aclose()
+
+
+@contextlib.asynccontextmanager
+async def connect(client):
+    """Keep `client`'s connections on the running event loop open for a block.
+
+    The transfers here open them when needed and close them when the last
+    one in flight on the loop ends, so nothing is left open when the loop
+    does. Wrap a series of awaited transfers in this to reuse connections
+    from one to the next; transfers gathered together share them anyway.
+    """
+    loop = asyncio.get_running_loop()
+    clients = _states.setdefault(loop, weakref.WeakKeyDictionary())
+    state = clients.get(client)
+    if state is None:
+        state = clients[client] = _State(client)
+    state.users += 1
+    try:
+        yield state
+    finally:
+        state.users -= 1
+        if not state.users:
+            del clients[client]
+            if not clients:
+                _states.pop(loop, None)
+            await state.aclose()
+
+
+@contextlib.asynccontextmanager
+async def slot(client):
+    """Hold one of `client`'s `MAX_TRANSFERS` transfers on the running loop.
+
+    Hold it for as long as a transfer's bytes are kept, e.g. while they are
+    parsed, so that at most `MAX_TRANSFERS` files are in memory at once.
+    """
+    async with connect(client) as state, state.limit:
+        yield
+
+
+async def _mutation(client, session, name, query, **inpt):
+    """Run a mutation and return its result, or None if it returned nothing."""
+    from .client import _ungraphql, responses
+
+    res = await session.post(
+        client.endpoint,
+        json={"query": query, "variables": {"input": inpt}},
+        headers={"Authorization": f"JWT {client.token}"},
+    )
+    if res.status_code != 200:
+        raise APIException(responses[res.status_code])
+    data = _ungraphql(res.json())
+    result = data.get(name) if isinstance(data, dict) else None
+    if not result:
+        return None
+    if result.get("err"):
+        raise APIException(result["err"])
+    return result.get("ok")
+
+
+async def download_uri(client, projectId, fileName, refresh=False):
+    """Return a signed download uri; see `Client.download_uri`."""
+    key = (projectId, fileName)
+    uri = client._cached_uri(key, refresh)
+    if uri is None:
+        async with connect(client) as state:
+            session = await state.session()
+            uri = await _mutation(
+                client,
+                session,
+                "createFileDownloadUri",
+                q.mutation_createFileDownloadUri,
+                projectId=projectId,
+                fileName=fileName,
+            )
+        client._cache_uri(key, uri)
+    return uri
+
+
+async def get(client, projectId, fileName):
+    """Return the contents of a file, or None if it has no download uri.
+
+    Files stored compressed are sent compressed and decompressed here. If
+    the storage host refuses the cached uri, a new one is minted for a
+    second try, as `Client._storage_get` does.
+    """
+    from .client import responses
+
+    async with connect(client) as state:
+        session = await state.session()
+        uri = await download_uri(client, projectId, fileName)
+        if not uri:
+            return None
+        res = await session.get(uri["uri"])
+        if res.status_code == 403:
+            uri = await download_uri(client, projectId, fileName, refresh=True)
+            res = await session.get(uri["uri"])
+    if res.status_code != 200:
+        raise APIException(responses[res.status_code])
+    return res.content
+
+
+async def put(client, projectId, fileName, data):
+    """Upload the bytes `data` as `fileName` and return their hex md5.
+
+    Failures are retried after the same waits as `Client.upload_file`.
+    """
+    from .client import RETRY_DELAYS
+
+    deadline = current()
+    async with connect(client) as state:
+        session = await state.session()
+        for delay in (*RETRY_DELAYS, None):
+            try:
+                return await _put(client, session, projectId, fileName, data)
+            except APIException as e:
+                if delay is None:
+                    raise
+                logger.warning(f"{e!r} uploading {fileName}, retrying in {delay}s")
+                try:
+                    await deadline.asleep(delay)
+                except Cancelled as stop:
+                    raise stop from e
+
+
+async def _put(client, session, projectId, fileName, data):
+    from .client import _stored_md5, responses
+
+    uri = await _mutation(
+        client,
+        session,
+        "createFileUploadUri",
+        q.mutation_createFileUploadUri,
+        projectId=projectId,
+        fileName=fileName,
+    )
+    if not uri:
+        raise APIException("No data returned from createFileUploadUri")
+    headers = {
+        "content-type": "application/octet-stream",
+        "host": "storage.googleapis.com",
+    }
+    res = await session.put(uri["uri"], content=data, headers=headers)
+    if res.status_code != 200:
+        raise APIException(responses[res.status_code])
+    md5 = hashlib.md5(data).hexdigest()
+    stored = _stored_md5(res.headers)
+    if stored and not same_md5(md5, stored):
+        raise APIException(f"{fileName} was stored with another md5")
+    return md5
@@ -0,0 +1,294 @@
+"""A local SQLite catalog of project and file metadata."""
+
+import json
+import os
+import sqlite3
+from datetime import datetime, timezone
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    id TEXT PRIMARY KEY,
+    name TEXT,
+    description TEXT,
+    contact TEXT,
+    contactMethod TEXT,
+    isOpen INTEGER,
+    updatedAt TEXT
+);
+CREATE TABLE IF NOT EXISTS roles (
+    id TEXT PRIMARY KEY,
+    projectId TEXT REFERENCES projects(id) ON DELETE CASCADE,
+    role TEXT
+);
+CREATE TABLE IF NOT EXISTS files (
+    id TEXT PRIMARY KEY,
+    projectId TEXT REFERENCES projects(id) ON DELETE CASCADE,
+    name TEXT,
+    size INTEGER,
+    md5 TEXT,
+    createdAt TEXT,
+    updatedAt TEXT
+);
+CREATE TABLE IF NOT EXISTS project_tags (
+    projectId TEXT REFERENCES projects(id) ON DELETE CASCADE,
+    tag TEXT
+);
+CREATE TABLE IF NOT EXISTS file_tags (
+    fileId TEXT REFERENCES files(id) ON DELETE CASCADE,
+    tag TEXT
+);
+CREATE INDEX IF NOT EXISTS projects_name ON projects(name);
+CREATE INDEX IF NOT EXISTS projects_updated ON projects(updatedAt);
+CREATE INDEX IF NOT EXISTS roles_project ON roles(projectId);
+CREATE INDEX IF NOT EXISTS files_project ON files(projectId);
+CREATE INDEX IF NOT EXISTS files_name ON files(name);
+CREATE INDEX IF NOT EXISTS files_size ON files(size);
+CREATE INDEX IF NOT EXISTS files_updated ON files(updatedAt);
+CREATE INDEX IF NOT EXISTS project_tags_tag ON project_tags(tag, projectId);
+CREATE INDEX IF NOT EXISTS project_tags_project ON project_tags(projectId);
+CREATE INDEX IF NOT EXISTS file_tags_tag ON file_tags(tag, fileId);
+CREATE INDEX IF NOT EXISTS file_tags_file ON file_tags(fileId);
+"""
+
+
+def _timestamp(value):
+    """Return `value` as a UTC ISO string comparable with the API's dates.
+
+    Naive datetimes are taken as local time, as `datetime.now()` returns.
+    """
+    if isinstance(value, datetime):
+        return value.astimezone(timezone.utc).isoformat()
+    return value
+
+
+def _tag_names(tags):
+    return [t["name"] if isinstance(t, dict) else t for t in tags or []]
+
+
+class Catalog:
+    """Project, file, tag and role metadata in indexed SQLite tables.
+
+    `refresh` copies everything the current user can see from the API into
+    the catalog; the search methods then only query the local database.
+
+        catalog = Catalog("~/.bln/catalog.sqlite")
+        catalog.refresh(client)
+        catalog.search_files(tags=["warn"], min_size=10**9, updated_after=week_ago)
+    """
+
+    def __init__(self, path=":memory:"):
+        """Open (or create) the catalog at `path`; in memory by default."""
+        if path != ":memory:":
+            path = os.path.expanduser(path)
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA foreign_keys = ON")
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        """Close the database."""
+        self.db.close()
+
+    def refresh(self, client, incremental=True):
+        """Bring the catalog up to date with the projects `client` can see.
+
+        Args:
+            client: a `bln.Client`.
+            incremental: if True, fetch full details only for projects whose
+                updatedAt changed since the last refresh (see
+                `Client.changed_projects`); otherwise refetch everything.
+        """
+        if not incremental:
+            roles = client.effectiveProjectRoles()
+            with self.db:
+                self.db.execute("DELETE FROM projects")
+                for role in roles:
+                    self._add_project(role["project"], role)
+            return
+        known = dict(self.db.execute("SELECT id, updatedAt FROM projects"))
+        changes = client.changed_projects(known)
+        with self.db:
+            self.db.executemany(
+                "DELETE FROM projects WHERE id = ?",
+                [(id_,) for id_ in changes["removed"]],
+            )
+            for role in changes["changed"]:
+                self._add_project(role["project"], role)
+            # roles can change without touching the project
+            for role in changes["unchanged"]:
+                self.db.execute(
+                    "DELETE FROM roles WHERE projectId = ?", (role["project"]["id"],)
+                )
+                self.db.execute(
+                    "INSERT INTO roles VALUES (?, ?, ?)",
+                    (role["id"], role["project"]["id"], role["role"]),
+                )
+
+    def _add_project(self, project, role=None):
+        """Insert or replace a project with its role, files and tags."""
+        id_ = project["id"]
+        self.db.execute("DELETE FROM projects WHERE id = ?", (id_,))
+        self.db.execute(
+            "INSERT INTO projects VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                id_,
+                project.get("name"),
+                project.get("description"),
+                project.get("contact"),
+                project.get("contactMethod"),
+                project.get("isOpen"),
+                project.get("updatedAt"),
+            ),
+        )
+        if role:
+            self.db.execute(
+                "INSERT INTO roles VALUES (?, ?, ?)", (role["id"], id_, role["role"])
+            )
+        self.db.executemany(
+            "INSERT INTO project_tags VALUES (?, ?)",
+            [(id_, tag) for tag in _tag_names(project.get("tags"))],
+        )
+        files = project.get("files") or []
+        self.db.executemany(
+            "INSERT INTO files VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    f["id"],
+                    id_,
+                    f["name"],
+                    f.get("size"),
+                    f.get("md5"),
+                    f.get("createdAt"),
+                    f.get("updatedAt"),
+                )
+                for f in files
+            ],
+        )
+        self.db.executemany(
+            "INSERT INTO file_tags VALUES (?, ?)",
+            [(f["id"], tag) for f in files for tag in _tag_names(f.get("tags"))],
+        )
+
+    def search_projects(
+        self,
+        name=None,
+        tags=None,
+        role=None,
+        updated_after=None,
+        updated_before=None,
+    ):
+        """Return the projects matching every given criterion.
+
+        Args:
+            name: a glob pattern for the project name, e.g. "WARN*".
+            tags: tag names the project must all have.
+            role: the current user's role, e.g. "ADMIN".
+            updated_after: a datetime or ISO string; only newer projects.
+            updated_before: a datetime or ISO string; only older projects.
+
+        Returns:
+            projects: list of project dicts with their tags and the user's role.
+        """
+        where, params = [], []
+        if name:
+            where.append("p.name GLOB ?")
+            params.append(name)
+        for tag in tags or []:
+            where.append(
+                "EXISTS (SELECT 1 FROM project_tags t"
+                " WHERE t.projectId = p.id AND t.tag = ?)"
+            )
+            params.append(tag)
+        if role:
+            where.append("r.role = ?")
+            params.append(role)
+        if updated_after:
+            where.append("p.updatedAt > ?")
+            params.append(_timestamp(updated_after))
+        if updated_before:
+            where.append("p.updatedAt < ?")
+            params.append(_timestamp(updated_before))
+        sql = """
+            SELECT p.*, r.role,
+                (SELECT json_group_array(tag) FROM project_tags
+                 WHERE projectId = p.id) AS tags
+            FROM projects p LEFT JOIN roles r ON r.projectId = p.id
+        """
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        rows = self.db.execute(sql + " ORDER BY p.name", params)
+        return [self._row(row, isOpen=bool(row["isOpen"])) for row in rows]
+
+    def search_files(
+        self,
+        name=None,
+        tags=None,
+        projectId=None,
+        min_size=None,
+        max_size=None,
+        updated_after=None,
+        updated_before=None,
+        created_after=None,
+        created_before=None,
+    ):
+        """Return the files matching every given criterion.
+
+        Args:
+            name: a glob pattern for the file name, e.g. "*.csv".
+            tags: tag names the file must all have.
+            projectId: only files in this project.
+            min_size: the smallest size in bytes, inclusive.
+            max_size: the largest size in bytes, inclusive.
+            updated_after: a datetime or ISO string; only newer files.
+            updated_before: a datetime or ISO string; only older files.
+            created_after: a datetime or ISO string; only newer files.
+            created_before: a datetime or ISO string; only older files.
+
+        Returns:
+            files: list of file dicts with projectId and projectName added, as
+                in `Client.search_files`.
+        """
+        where, params = [], []
+        if name:
+            where.append("f.name GLOB ?")
+            params.append(name)
+        for tag in tags or []:
+            where.append(
+                "EXISTS (SELECT 1 FROM file_tags t WHERE t.fileId = f.id AND t.tag = ?)"
+            )
+            params.append(tag)
+        if projectId:
+            where.append("f.projectId = ?")
+            params.append(projectId)
+        if min_size is not None:
+            where.append("f.size >= ?")
+            params.append(min_size)
+        if max_size is not None:
+            where.append("f.size <= ?")
+            params.append(max_size)
+        for column, op, value in (
+            ("updatedAt", ">", updated_after),
+            ("updatedAt", "<", updated_before),
+            ("createdAt", ">", created_after),
+            ("createdAt", "<", created_before),
+        ):
+            if value:
+                where.append(f"f.{column} {op} ?")
+                params.append(_timestamp(value))
+        sql = """
+            SELECT f.*, p.name AS projectName,
+                (SELECT json_group_array(tag) FROM file_tags
+                 WHERE fileId = f.id) AS tags
+            FROM files f JOIN projects p ON p.id = f.projectId
+        """
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        rows = self.db.execute(sql + " ORDER BY p.name, f.name", params)
+        return [self._row(row) for row in rows]
+
+    def _row(self, row, **overrides):
+        d = dict(row)
+        d["tags"] = json.loads(d["tags"])
+        d.update(overrides)
+        return d
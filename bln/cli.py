@@ -0,0 +1,394 @@
+"""The `bln` and `git-bln` commands."""
+
+import argparse
+import json
+import os
+import subprocess as sub
+import sys
+import time
+
+
+def parse_args(argv):
+    """Parse arguments."""
+    parser = argparse.ArgumentParser(
+        prog=argv[0],
+        description="Big Local News Python Client",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    sub = parser.add_subparsers(help="commands", dest="command", required=True)
+    upload = _add_command(sub, argv, "upload", "upload files to a project")
+    if is_git(argv[0]):
+        upload.add_argument(
+            "files",
+            nargs="*",
+            help="list of files to upload",
+        )
+        upload.add_argument(
+            "-c",
+            "--changed",
+            action="store_true",
+            help="only upload files that changed since they were last pushed"
+            ", according to the manifest in bln.json",
+        )
+        upload.add_argument(
+            "-s",
+            "--since",
+            metavar="REF",
+            help="also upload the files in `git diff` against REF",
+        )
+    else:  # regular `bln` command
+        upload.add_argument(
+            "files",
+            nargs="+",
+            help="list of files to upload",
+        )
+    upload.add_argument(
+        "-z",
+        "--compress",
+        action="store_true",
+        help="gzip text files (CSV, JSON, ...) on the way up; they are"
+        " decompressed again on download",
+    )
+    _add_transfer_arguments(upload)
+    download = _add_command(sub, argv, "download", "download files from a project")
+    download.add_argument(
+        "files",
+        nargs="*",
+        help="names of the files to download; all files if none are given",
+    )
+    download.add_argument(
+        "-o",
+        "--output_dir",
+        help="directory to save the files in",
+        default=".",
+    )
+    _add_transfer_arguments(download)
+    ls = _add_command(sub, argv, "ls", "list the files in a project")
+    ls.add_argument(
+        "--json",
+        action="store_true",
+        help="print the file metadata as JSON",
+    )
+    rm = _add_command(sub, argv, "rm", "delete files from a project")
+    rm.add_argument(
+        "files",
+        nargs="+",
+        help="names of the files to delete",
+    )
+    _add_transfer_arguments(rm)
+    sync = _add_command(sub, argv, "sync", "sync a directory with a project")
+    sync.add_argument(
+        "directory",
+        help="local directory to sync",
+    )
+    sync.add_argument(
+        "-d",
+        "--direction",
+        choices=("up", "down", "both"),
+        help="up: make the project match the directory; down: make the directory"
+        " match the project; both: carry changes each way",
+        default="both",
+    )
+    sync.add_argument(
+        "--delete",
+        action="store_true",
+        help="also propagate deletions",
+    )
+    sync.add_argument(
+        "-n",
+        "--dry_run",
+        action="store_true",
+        help="print the planned changes as JSON without making them",
+    )
+    _add_transfer_arguments(sync)
+    return parser.parse_args(argv[1:])
+
+
+def _add_command(sub, argv, name, help):
+    """Add a subcommand with the arguments every command takes."""
+    command = sub.add_parser(
+        name,
+        help=help,
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    if is_git(argv[0]):
+        command.add_argument(
+            "-p",
+            "--project_id",
+            help="project ID on Big Local News platform"
+            "; if not specified, will use projectId in ~/.git/bln.json",
+        )
+    else:  # regular `bln` command
+        command.add_argument(
+            "project_id",
+            help="project ID on Big Local News platform",
+        )
+    command.add_argument(
+        "-k",
+        "--api_key",
+        help="if not specified, looks for one at ~/.bln/api_key",
+    )
+    command.add_argument(
+        "-t",
+        "--tier",
+        help='which tier; external parties will only be able to use "prod"',
+        default="prod",
+    )
+    return command
+
+
+def _add_transfer_arguments(command):
+    """Add the arguments of commands that work on many files at once."""
+    command.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        help="how many files to work on at once; defaults to the number of CPUs",
+    )
+    command.add_argument(
+        "-q",
+        "--quiet",
+        action="store_true",
+        help="don't show progress",
+    )
+    command.add_argument(
+        "--deadline",
+        type=float,
+        metavar="SECONDS",
+        help="stop, retries included, if the command takes longer than this",
+    )
+
+
+class ProgressDisplay:
+    """Show transfer progress on stderr and remember the byte count."""
+
+    def __init__(self, show):
+        """Create a display; nothing is printed unless `show` is true."""
+        self.show = show
+        self.done = 0
+
+    def __call__(self, done, total, rate):
+        """Receive a progress report from the client."""
+        self.done = done
+        if not self.show:
+            return
+        line = f"{done / 1e6:,.1f}"
+        if total:
+            line += f" / {total / 1e6:,.1f} MB ({100 * done / total:.0f}%)"
+        else:
+            line += " MB"
+        sys.stderr.write(f"\r{line}  {rate / 1e6:,.1f} MB/s   ")
+        sys.stderr.flush()
+
+    def finish(self):
+        """End the progress line."""
+        if self.show:
+            sys.stderr.write("\n")
+
+
+def summarize(command, files, nbytes, start, **extra):
+    """Print a JSON summary of a bulk command to stdout."""
+    elapsed = time.monotonic() - start
+    summary = {
+        "command": command,
+        "files": files,
+        "bytes": nbytes,
+        "elapsed": round(elapsed, 3),
+        "throughput": round(nbytes / elapsed) if nbytes and elapsed else None,
+        **extra,
+    }
+    print(json.dumps(summary))
+
+
+def upload(client, project_id, args, **extra):
+    """Upload files and summarize the transfer."""
+    start = time.monotonic()
+    display = ProgressDisplay(_show_progress(args) and bool(args.files))
+    if args.files:
+        client.upload_files(
+            project_id,
+            args.files,
+            progress=display,
+            jobs=args.jobs,
+            compress=args.compress,
+        )
+    display.finish()
+    summarize("upload", len(args.files), display.done, start, **extra)
+
+
+def git_upload(client, manifest, args):
+    """Upload files from a git repository and record them in the manifest."""
+    files = list(args.files)
+    if args.since:
+        files += git_diff_files(manifest.root, args.since)
+    if not files:
+        print("Must provide files to upload, or a ref with --since!")
+        sys.exit(1)
+    # drop duplicates, e.g. a file both listed and in the diff
+    files = list({os.path.abspath(f): f for f in files}.values())
+    skipped = 0
+    if args.changed:
+        changed = manifest.changed(files)
+        skipped = len(files) - len(changed)
+        files = changed
+    args.files = files
+    upload(client, manifest.projectId, args, skipped=skipped)
+    for path in files:
+        manifest.record(path)
+    manifest.save()
+
+
+def download(client, project_id, args):
+    """Download files and summarize the transfer."""
+    start = time.monotonic()
+    display = ProgressDisplay(_show_progress(args))
+    paths = client.download_files(
+        project_id,
+        args.files or None,
+        output_dir=args.output_dir,
+        progress=display,
+        jobs=args.jobs,
+    )
+    display.finish()
+    summarize("download", len(paths), display.done, start)
+
+
+def ls(client, project_id, args):
+    """List the files in a project."""
+    files = client.get_project_by_id(project_id)["files"]
+    if args.json:
+        print(json.dumps(files, indent=2))
+        return
+    for f in sorted(files, key=lambda f: f["name"]):
+        print(f"{f.get('size') or 0:>14,}  {f['updatedAt'][:19]}  {f['name']}")
+
+
+def rm(client, project_id, args):
+    """Delete files and summarize the work."""
+    from multiprocessing.pool import ThreadPool
+
+    from .deadline import bind
+
+    start = time.monotonic()
+    with ThreadPool(args.jobs or os.cpu_count()) as p:
+        p.map(bind(lambda name: client.deleteFile(project_id, name)), args.files)
+    summarize("rm", len(args.files), 0, start)
+
+
+def sync(client, project_id, args):
+    """Sync a directory with a project and summarize the changes."""
+    start = time.monotonic()
+    display = ProgressDisplay(_show_progress(args) and not args.dry_run)
+    actions = client.sync_dir(
+        project_id,
+        args.directory,
+        direction=args.direction,
+        delete=args.delete,
+        dry_run=args.dry_run,
+        jobs=args.jobs,
+        progress=display,
+    )
+    display.finish()
+    if args.dry_run:
+        print(json.dumps(actions, indent=2))
+        return
+    counts = {}
+    for a in actions:
+        counts[a["action"]] = counts.get(a["action"], 0) + 1
+    transfers = ("upload", "download")
+    nbytes = sum(a["size"] or 0 for a in actions if a["action"] in transfers)
+    summarize("sync", len(actions), nbytes, start, **counts)
+
+
+def _show_progress(args):
+    return not args.quiet and sys.stderr.isatty()
+
+
+def is_git(cmd):
+    """Test if a git command."""
+    return cmd.endswith("git-bln")
+
+
+def git_root():
+    """Return the git root."""
+    return (
+        sub.Popen(["git", "rev-parse", "--show-toplevel"], stdout=sub.PIPE)
+        .communicate()[0]
+        .rstrip()
+        .decode("utf-8")
+    )
+
+
+def git_diff_files(root, ref):
+    """Return the existing files that differ from `ref` in the repository."""
+    names = sub.run(
+        ["git", "diff", "--name-only", ref, "--"],
+        cwd=root,
+        stdout=sub.PIPE,
+        check=True,
+        text=True,
+    ).stdout.splitlines()
+    paths = [os.path.join(root, name) for name in names]
+    return [p for p in paths if os.path.isfile(p)]
+
+
+def main(argv=None):
+    """Run the `bln` command."""
+    argv = argv or sys.argv
+    args = parse_args(argv)
+    # create api_key directory
+    bln_dir = os.path.expanduser("~/.bln")
+    if not os.path.exists(bln_dir):
+        os.mkdir(bln_dir)
+    # use and save API key or load from {api_key_path}
+    api_key_path = os.path.expanduser("~/.bln/api_key")
+    if args.api_key:
+        api_key = args.api_key
+        with open(api_key_path, "w") as f:
+            f.write(api_key)
+        print(
+            f"API key saved to {api_key_path}; future calls will use this "
+            "API key as a default."
+        )
+    else:
+        if not os.path.exists(api_key_path):
+            print(
+                "Must provide an API key, i.e. `-k <key>`; keys "
+                "can be obtained from https://biglocalnews.org/#/manage_keys"
+            )
+            sys.exit(1)
+        with open(api_key_path) as f:
+            api_key = f.read().strip()
+    # if git, use projectId from bln.json, otherwise use args.project_id
+    project_id = args.project_id
+    manifest = None
+    if is_git(argv[0]):
+        from .manifest import Manifest
+
+        manifest = Manifest(os.path.join(git_root(), "bln.json"))
+        if args.project_id:
+            manifest.set_project(args.project_id)
+            manifest.save()
+        project_id = manifest.projectId
+        if not project_id:
+            print("Must provide a project ID!")
+            sys.exit(1)
+    # imported here so that parsing arguments and printing help stay fast
+    from .client import Client
+
+    client = Client(api_key, args.tier)
+    with client.deadline(getattr(args, "deadline", None)):
+        if manifest and args.command == "upload":
+            return git_upload(client, manifest, args)
+        commands = {
+            "upload": upload,
+            "download": download,
+            "ls": ls,
+            "rm": rm,
+            "sync": sync,
+        }
+        commands[args.command](client, project_id, args)
+
+
+if __name__ == "__main__":
+    main()
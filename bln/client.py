@@ -1,31 +1,135 @@
 """Big Local News Python Client."""
 
-import json
+import functools
+import hashlib
 import logging
 import os
-import platform
 import re
-from http.client import responses
-from multiprocessing import Pool, cpu_count
-
-import requests
-from retry import retry
+import threading
+import time
+from datetime import datetime, timezone
+from http import HTTPStatus
 
 from . import queries as q
-from .exceptions import APIException
+from .deadline import CheckedReader, Deadline, bind
+from .deadline import current as current_deadline
+from .exceptions import APIException, Cancelled
+from .manifest import MD5Reader, same_md5
+from .progress import Progress, ProgressReader
+from .schedule import ByteBudget, largest_first
+
+# requests, retry and multiprocessing are imported where they are first
+# needed, so importing the client (and starting the `bln` command) stays fast
 
 logger = logging.getLogger(__name__)
 
+# the same table as http.client.responses, without importing http.client
+responses = {s.value: s.phrase for s in HTTPStatus}
+
+
+# the seconds to wait before each retry of a failed request
+RETRY_DELAYS = (15, 45, 135)
+
+
+def _retry(func):
+    """Retry `func` on APIException, four tries with 15s, 45s and 135s waits.
+
+    The waits end early if the deadline in effect is cancelled, and a retry
+    that could not start before the deadline raises `DeadlineExceeded`
+    instead of waiting.
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        from retry.api import retry_call
+
+        deadline = current_deadline()
+        delays = iter(RETRY_DELAYS)
+
+        def wait(e):
+            delay = next(delays, None)
+            if delay is None:
+                # the last try; retry_call raises
+                return False
+            logger.warning(f"{e!r} in {func.__qualname__}, retrying in {delay}s")
+            try:
+                deadline.sleep(delay)
+            except Cancelled as stop:
+                raise stop from e
+            return False
+
+        return retry_call(
+            func,
+            fargs=args,
+            fkwargs=kwargs,
+            exceptions=APIException,
+            tries=len(RETRY_DELAYS) + 1,
+            delay=0,
+            logger=None,
+            on_exception=wait,
+        )
+
+    return wrapper
+
+
+# the clients of Client.shared, by (token, tier)
+_shared = {}
+_shared_lock = threading.Lock()
+
+
+def _limited(func):
+    """Let `func` take `deadline`, `cancel` and `timeout`; see `Client.deadline`."""
+
+    @functools.wraps(func)
+    def wrapper(*args, deadline=None, cancel=None, timeout=None, **kwargs):
+        with Deadline(deadline, cancel, timeout):
+            return func(*args, **kwargs)
+
+    return wrapper
+
 
 class Client:
     """Big Local News Python Client."""
 
-    def __init__(self, token=None, tier="prod"):
+    # download uris are reused until this many seconds before they expire
+    URI_EXPIRY_MARGIN = 60
+    # segmented downloads give each connection at least this many bytes
+    MIN_SEGMENT_SIZE = 8 * 1024 * 1024
+    # seconds to wait for a connection, and then between bytes of a response
+    TIMEOUT = (30, 300)
+
+    def __init__(
+        self,
+        token=None,
+        tier="prod",
+        store=None,
+        models=False,
+        http2=None,
+        persisted_queries=False,
+        timeout=TIMEOUT,
+    ):
         """Create a Big Local News Python Client.
 
         Args:
             token: a personal token generated on the Big Local News website.
             tier: only 'prod' will work for external developers.
+            store: (optional) True or a `bln.store.EntityStore` to merge every
+                result into, so users, groups, projects and files that appear
+                several times are shared objects; pass the same store to
+                several clients to share entities between them.
+            models: (optional) if True, return users, groups, projects, files
+                and roles as the compact classes in `bln.models` instead of
+                dicts; they still support `obj["field"]` and `obj.get()`.
+            http2: (optional) if True, send requests over HTTP/2 with httpx,
+                which must be installed; defaults to True if the BLN_HTTP2
+                environment variable is set to 1. Otherwise requests is used.
+            persisted_queries: (optional) if True, send each query as its
+                SHA-256 hash instead of its text once the server has seen it
+                (automatic persisted queries); servers that do not support
+                them are sent the text as before.
+            timeout: (optional) the connect and read timeout of every
+                request, in seconds or as a `(connect, read)` tuple; None
+                waits forever. See also `deadline`.
 
         Returns:
             client: a Big Local News Python Client.
@@ -40,8 +144,99 @@ class Client:
             "dev": "https://dev-api.biglocalnews.org/graphql",
             "prod": "https://api.biglocalnews.org/graphql",
         }[tier]
+        if store is True:
+            from .store import EntityStore
+
+            store = EntityStore()
+        self.store = store
+        self.models = models
+        self._uris = {}
+        self._uris_lock = threading.Lock()
+        if http2 is None:
+            http2 = os.getenv("BLN_HTTP2") == "1"
+        self.http2 = http2
+        self.persisted_queries = persisted_queries
+        self.timeout = timeout
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    @property
+    def session(self):
+        """The pooled HTTP session all of the client's requests go through."""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    from .transport import session
+
+                    self._session = session(self.http2, self.timeout)
+        return self._session
+
+    def close(self):
+        """Close the client's connections."""
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    @classmethod
+    def shared(cls, token=None, tier="prod"):
+        """Return the process-wide client for `token` and `tier`.
+
+        The first call for a token and tier creates the client and later
+        calls, from any thread, return the same one, so code that makes
+        many short calls, like the pandas helpers, reuses its open
+        connections and download uri cache.
 
-    @retry(APIException, tries=4, delay=15, backoff=3)
+        Args:
+            token: a personal token; defaults to the BLN_API_TOKEN
+                environment variable.
+            tier: only 'prod' will work for external developers.
+
+        Returns:
+            client: the shared Big Local News Python Client.
+        """
+        if not token:
+            token = os.getenv("BLN_API_TOKEN")
+            if not token:
+                raise ValueError("No API token provided")
+        with _shared_lock:
+            client = _shared.get((token, tier))
+            if client is None:
+                client = _shared[(token, tier)] = cls(token, tier)
+        return client
+
+    def deadline(self, seconds=None, cancel=None, timeout=None):
+        """Limit the calls made inside a `with` block.
+
+            stop = threading.Event()
+            with client.deadline(600, cancel=stop):
+                client.sync_dir(project_id, "./data")
+
+        Requests, retries and transfers made in the block, including those on
+        worker threads, raise `bln.exceptions.DeadlineExceeded` once
+        `seconds` have passed, and `bln.exceptions.Cancelled` soon after
+        `cancel` is set; retries are not started if they could not finish in
+        time. Blocks may be nested; the earlier deadline wins.
+
+        Args:
+            seconds: (optional) how long the calls may take in all.
+            cancel: (optional) a `threading.Event` to stop them.
+            timeout: (optional) the connect and read timeout of each request
+                in place of the client's.
+
+        Returns:
+            deadline: a `bln.deadline.Deadline` context manager.
+        """
+        return Deadline(seconds, cancel, timeout)
+
+    def __enter__(self):
+        """Return the client, to close its connections on exit."""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Close the client's connections."""
+        self.close()
+
+    @_retry
     def _gql(self, query, variables=None):
         variables = variables or {}
         # special case: node query, which doesn't use an *Input type
@@ -51,10 +246,24 @@ class Client:
             # *Input object types, so nest variables inside 'input'; also,
             # remove 'self' so mutations can just pass 'locals()'
             variables = {"input": {k: v for k, v in variables.items() if k != "self"}}
-        data, err = _gql(self.endpoint, self.token, query, variables)
+        data, err = _gql(
+            self.endpoint,
+            self.token,
+            query,
+            variables,
+            ungraphql=not self.models,
+            session=self.session,
+            persisted=self.persisted_queries,
+        )
         # network error
         if err:
             raise APIException(err)
+        if self.models:
+            from .models import build
+
+            data = build(data)
+        if self.store is not None:
+            data = self.store.merge(data)
         if isinstance(data, dict):
             for _k, v in data.items():
                 # unwrap single-item dict lists
@@ -72,7 +281,15 @@ class Client:
 
     def raw(self, query, variables=None, ungraphql=False):
         """Execute a raw query directly with variables."""
-        data, err = _gql(self.endpoint, self.token, query, variables or {}, ungraphql)
+        data, err = _gql(
+            self.endpoint,
+            self.token,
+            query,
+            variables or {},
+            ungraphql,
+            session=self.session,
+            persisted=self.persisted_queries,
+        )
         if err:
             raise APIException(err)
         return data
@@ -117,6 +334,46 @@ class Client:
         """Create a file download uri with a projectId and fileName."""
         return self._gql(q.mutation_createFileDownloadUri, locals())
 
+    def download_uri(self, projectId, fileName, refresh=False):
+        """Return a signed download uri, reusing one minted earlier if valid.
+
+        Uris are kept per project and file until `URI_EXPIRY_MARGIN` seconds
+        before the expiry encoded in them, so reading the same file again
+        skips the `createFileDownloadUri` round trip.
+
+        Args:
+            projectId: the id of a Big Local News project.
+            fileName: the name of a file in the project.
+            refresh: if True, mint a new uri even if one is cached, e.g.
+                after the storage host rejected the cached one.
+
+        Returns:
+            uri: a dict with the name, uri and uriType, as returned by
+                `createFileDownloadUri`.
+        """
+        key = (projectId, fileName)
+        uri = self._cached_uri(key, refresh)
+        if uri is None:
+            uri = self.createFileDownloadUri(projectId, fileName)
+            self._cache_uri(key, uri)
+        return uri
+
+    def _cached_uri(self, key, refresh=False):
+        """Return the cached download uri for `key` if still valid, else None."""
+        with self._uris_lock:
+            cached = self._uris.pop(key, None)
+            if cached and not refresh and time.time() < cached[1]:
+                self._uris[key] = cached
+                return cached[0]
+        return None
+
+    def _cache_uri(self, key, uri):
+        """Keep a minted download uri until shortly before it expires."""
+        expires = uri and _uri_expiry(uri["uri"])
+        if expires:
+            with self._uris_lock:
+                self._uris[key] = (uri, expires - self.URI_EXPIRY_MARGIN)
+
     def createFileUploadUri(self, projectId, fileName):
         """Create a file upload uri with a projectId and fileName."""
         return self._gql(q.mutation_createFileUploadUri, locals())
@@ -161,6 +418,7 @@ class Client:
         groupRoles=None,
         tags=None,
         files=None,
+        refetch=True,
     ):
         """Create a project.
 
@@ -177,38 +435,232 @@ class Client:
             groupRoles: Define group admins, editors, and viewers; defaults
                 to no group roles.
             tags: Project tags.
+            files: the paths of files to upload to the new project.
+            refetch: if True and there are files, fetch the project again
+                once they are uploaded, so that they are listed in it; if
+                False, return the project as the mutation created it.
 
         Returns:
             project: the resulting project or None if error.
         """
-        variables = {k: v for k, v in locals().items() if k != "files" and v}
+        variables = {
+            k: v for k, v in locals().items() if k not in ("files", "refetch") and v
+        }
         project = self._gql(q.mutation_createProject, variables)
-        if not project:
-            return
-        self.upload_files(project["id"], files or [])
+        if not project or not files:
+            # the mutation returns the whole project, so there is nothing
+            # new to fetch
+            return project
+        self.upload_files(project["id"], files)
+        if not refetch:
+            return project
         return self._gql(q.query_project, {"id": project["id"]})
 
-    def upload_files(self, projectId, files):
-        """Upload a files to the provided project id."""
-        # run windows and mac uploads serially, for the following reasons:
-        # windows will crash if MP is not guarded by main
-        # mac has new fork rules: https://bugs.python.org/issue35219
-        if platform.system() != "Linux":
-            for f in files:
-                _upload_file(self.endpoint, self.token, projectId, f)
-            return
-        with Pool(cpu_count()) as p:
-            args = [(self.endpoint, self.token, projectId, f) for f in files]
-            p.starmap(_upload_file, args)
+    @_limited
+    def upload_files(
+        self,
+        projectId,
+        files,
+        progress=None,
+        jobs=None,
+        compress=False,
+        max_inflight_bytes=None,
+        report=None,
+    ):
+        """Upload files to the provided project id.
 
-    def upload_file(self, projectId, path):
+        Args:
+            projectId: the id of the project.
+            files: the paths of the files to upload, or `(name, data)` pairs
+                of files held in memory, where data is bytes or a binary
+                file object.
+            progress: (optional) a function called as
+                `progress(bytes_done, total, rate)` while the files upload,
+                with the bytes counted across the whole batch; `rate` is in
+                bytes per second.
+            jobs: how many files to upload at once; defaults to the number
+                of CPUs.
+            compress: if True, gzip text files such as CSV and JSON before
+                uploading them with a gzip content-encoding; they are stored
+                compressed and decompressed again on download.
+            max_inflight_bytes: (optional) the most bytes to upload at once;
+                files wait for room before they start, and a file bigger
+                than this is sent alone.
+            report: (optional) a function called with a dict for each
+                scheduling decision: "event" is "start" or "done", with the
+                file's "path", "size" and "position" in the upload order,
+                the "waited" seconds and "inflight" bytes when it started,
+                and the "seconds" it took when done.
+            deadline, cancel, timeout: (optional) limits on this call, as
+                for `deadline`.
+
+        Files are uploaded from the largest to the smallest, so that a big
+        file does not hold up the end of the batch on its own.
+
+        Returns:
+            md5s: the hex md5 digest of each file as stored, computed while
+                it uploaded; for a compressed file, that of the gzipped bytes.
+                An upload that storage records with another md5 raises
+                `APIException`.
+        """
+        files = list(files)
+        sizes = [_file_size(f) for f in files]
+        tracker = None
+        if progress:
+            tracker = Progress(progress, sum(sizes))
+        order = largest_first(sizes)
+        budget = ByteBudget(max_inflight_bytes)
+
+        def upload(position, i):
+            waited = budget.acquire(sizes[i])
+            event = {
+                "path": files[i],
+                "size": sizes[i],
+                "position": position,
+                "waited": waited,
+                "inflight": budget.inflight,
+            }
+            logger.debug(f"upload schedule: start {event}")
+            if report:
+                report(dict(event, event="start"))
+            start = time.monotonic()
+            try:
+                return _upload_file(
+                    self.endpoint,
+                    self.token,
+                    projectId,
+                    files[i],
+                    tracker,
+                    self.session,
+                    compress,
+                )
+            finally:
+                budget.release(sizes[i])
+                if report:
+                    report(dict(event, event="done", seconds=time.monotonic() - start))
+
+        # uploads are I/O bound, so threads are enough to run them in
+        # parallel, and unlike processes they are safe on every platform and
+        # can share the progress tracker
+        from multiprocessing.pool import ThreadPool
+
+        with ThreadPool(jobs or os.cpu_count()) as p:
+            # one file per task, so the workers take them in size order
+            # rather than in chunks
+            results = p.starmap(bind(upload), enumerate(order), chunksize=1)
+        if tracker:
+            tracker.close()
+        md5s = [None] * len(files)
+        for i, md5 in zip(order, results):
+            md5s[i] = md5
+        return md5s
+
+    @_limited
+    def upload_file(self, projectId, path, progress=None, compress=False):
         """Upload a file locally to a project.
 
         Args:
             projectId: the id of the project.
             path: the path of the file to upload.
+            progress: (optional) a function called as
+                `progress(bytes_done, total, rate)` while the file uploads.
+            compress: if True and it is a text file, gzip it on the way up.
+            deadline, cancel, timeout: (optional) limits on this call, as
+                for `deadline`.
+
+        Returns:
+            md5: the hex md5 digest of the file as stored.
         """
-        return self.upload_files(projectId, [path])
+        return self.upload_files(
+            projectId, [path], progress=progress, compress=compress
+        )[0]
+
+    def upload_stream(
+        self,
+        projectId,
+        files,
+        progress=None,
+        jobs=None,
+        compress=False,
+        queue_size=None,
+        deadline=None,
+        cancel=None,
+        timeout=None,
+    ):
+        """Upload files as they are produced, yielding each once it is done.
+
+        Unlike `upload_files`, `files` is read lazily, so a generator can
+        keep producing files while earlier ones upload. At most `queue_size`
+        files wait beyond the ones uploading; the generator is not asked for
+        more until one finishes, which bounds the memory held by files made
+        in memory.
+
+            for name, md5 in client.upload_stream(project_id, export()):
+                print(f"uploaded {name}")
+
+        Args:
+            projectId: the id of the project.
+            files: an iterable of paths, or of `(name, data)` pairs of files
+                held in memory, where data is bytes or a binary file object.
+            progress: (optional) a function called as
+                `progress(bytes_done, total, rate)`, where `total` grows as
+                files arrive.
+            jobs: how many files to upload at once; defaults to the number
+                of CPUs.
+            compress: if True, gzip text files on the way up.
+            queue_size: how many files to take from `files` ahead of the
+                uploads; defaults to `jobs`.
+            deadline, cancel, timeout: (optional) limits on the uploads, as
+                for `deadline`; the deadline counts from the first file asked for.
+
+        Yields:
+            (file, md5): each path or name, with the hex md5 digest of the
+                file as stored, in the order the uploads finish.
+        """
+        jobs = jobs or os.cpu_count()
+        # the uploads run under these limits, but the caller's code between
+        # the files it is given does not
+        limits = Deadline(deadline, cancel, timeout)
+        tracker = Progress(progress, 0) if progress else None
+        slots = threading.Semaphore(jobs + (queue_size or jobs))
+        stop = threading.Event()
+
+        def produce():
+            for f in files:
+                slots.acquire()
+                if stop.is_set():
+                    return
+                if tracker:
+                    tracker.add_total(_file_size(f))
+                yield f
+
+        def upload(f):
+            try:
+                md5 = _upload_file(
+                    self.endpoint,
+                    self.token,
+                    projectId,
+                    f,
+                    tracker,
+                    self.session,
+                    compress,
+                )
+                return (f[0] if isinstance(f, tuple) else f), md5
+            finally:
+                slots.release()
+
+        from multiprocessing.pool import ThreadPool
+
+        with ThreadPool(jobs) as p:
+            try:
+                yield from p.imap_unordered(bind(upload, limits), produce())
+            finally:
+                # let the pool's feeder thread out of `produce` so it can
+                # shut down, if the caller stopped early or an upload failed
+                stop.set()
+                slots.release()
+        if tracker:
+            tracker.close()
 
     def createTag(self, name):
         """Create a tag."""
@@ -216,6 +668,8 @@ class Client:
 
     def deleteFile(self, projectId, fileName):
         """Delete `filename` from `projectId`."""
+        with self._uris_lock:
+            self._uris.pop((projectId, fileName), None)
         return self._gql(q.mutation_deleteFile, locals())
 
     def deleteProject(self, id):
@@ -263,6 +717,7 @@ class Client:
         groupRoles=None,
         tags=None,
         files=None,
+        refetch=True,
     ):
         """Update a project.
 
@@ -280,13 +735,110 @@ class Client:
             groupRoles: Define group admins, editors, and viewers; defaults
                 to no group roles.
             tags: Project tags.
+            files: the paths of files to upload to the project; they are
+                sent while the other fields are updated. If an upload fails,
+                its error is raised once the update has finished too.
+            refetch: if True and there are files, fetch the project again
+                once both are done, so that the files are listed in it; if
+                False, return the project as the mutation updated it, whose
+                files are only those uploaded by the time the mutation ran.
 
         Returns:
             project: the resulting project or None if error.
         """
-        variables = {k: v for k, v in locals().items() if k != "files" and v}
-        self.upload_files(id, files or [])
-        return self._gql(q.mutation_updateProject, variables)
+        variables = {
+            k: v for k, v in locals().items() if k not in ("files", "refetch") and v
+        }
+        if not files:
+            return self._gql(q.mutation_updateProject, variables)
+        from multiprocessing.pool import ThreadPool
+
+        # the uploads only need the project's id, so they do not wait for
+        # the mutation
+        with ThreadPool(1) as p:
+            mutation = p.apply_async(
+                bind(self._gql), (q.mutation_updateProject, variables)
+            )
+            try:
+                self.upload_files(id, files)
+            except BaseException:
+                # let the update finish rather than abandon it half-way, so
+                # the fields are either changed or, as logged, not
+                try:
+                    mutation.get()
+                except Exception as e:
+                    logger.error(f"updating project {id} failed too: {e!r}")
+                raise
+            project = mutation.get()
+        if not project or not refetch:
+            return project
+        return self._gql(q.query_project, {"id": id})
+
+    def changed_projects(self, known, batch_size=25):
+        """Fetch only the projects that changed since they were last fetched.
+
+        A cheap listing of every project's id and updatedAt is compared with
+        `known`, and full details are fetched, `batch_size` projects per
+        request, only for projects that are new or have a different
+        updatedAt.
+
+        Args:
+            known: a dict of project id to the updatedAt already held.
+            batch_size: how many projects to fetch per request.
+
+        Returns:
+            changes: a dict with "changed", the effective project roles of
+                new or updated projects with full project details;
+                "unchanged", the roles of the other projects, with only
+                id, name and updatedAt; and "removed", the ids in `known`
+                that are no longer visible.
+        """
+        roles = self._gql(q.query_projectUpdates)
+        changed, unchanged = [], []
+        for role in roles:
+            project = role["project"]
+            if known.get(project["id"]) == project["updatedAt"]:
+                unchanged.append(role)
+            else:
+                changed.append(role)
+        ids = [r["project"]["id"] for r in changed]
+        projects = {}
+        for i in range(0, len(ids), batch_size):
+            for project in self._projects(ids[i : i + batch_size]):
+                projects[project["id"]] = project
+        # a project deleted between the two requests is left out
+        changed = [r for r in changed if r["project"]["id"] in projects]
+        for role in changed:
+            role["project"] = projects[role["project"]["id"]]
+        visible = {r["project"]["id"] for r in roles}
+        return {
+            "changed": changed,
+            "unchanged": unchanged,
+            "removed": [id_ for id_ in known if id_ not in visible],
+        }
+
+    @_retry
+    def _projects(self, ids):
+        variables = {f"id{i}": id_ for i, id_ in enumerate(ids)}
+        data, err = _gql(
+            self.endpoint,
+            self.token,
+            q.query_projects(len(ids)),
+            variables,
+            ungraphql=not self.models,
+            session=self.session,
+            persisted=self.persisted_queries,
+        )
+        if err:
+            raise APIException(err)
+        if self.models:
+            from .models import node
+
+            data = {k: node(v) for k, v in data["data"].items()}
+        projects = [data[f"p{i}"] for i in range(len(ids)) if data.get(f"p{i}")]
+        if self.store is not None:
+            projects = self.store.merge(projects)
+        return projects
 
     def get_project_by_id(self, id: str):
         """Get the project with the provided id.
@@ -303,7 +855,7 @@ class Client:
 
         return project
 
-    @retry(APIException, tries=4, delay=15, backoff=3)
+    @_retry
     def get_project_by_name(self, name: str):
         """Get the project with the provided name.
 
@@ -326,56 +878,385 @@ class Client:
         # Otherwise, return the one project found
         return project_list[0]
 
-    @retry(APIException, tries=4, delay=15, backoff=3)
-    def download_file(self, projectId, filename, output_dir=None):
+    @_limited
+    def download_file(
+        self,
+        projectId,
+        filename,
+        output_dir=None,
+        progress=None,
+        segments=1,
+        return_md5=False,
+    ):
         """Download `filename` in project `projectId` to `output_dir`.
 
         Args:
             projectId: the id of a Big Local News project.
             filename: the name of a file in the project.
             output_dir: uses current working directory if not specified.
+            progress: (optional) a function called as
+                `progress(bytes_done, total, rate)` while the file downloads;
+                `total` is None if the server does not report a size.
+            segments: (optional) split a large file into up to this many
+                byte ranges and fetch them over separate connections at
+                once, each at least `MIN_SEGMENT_SIZE` bytes.
+            return_md5: (optional) if True, also return the hex md5 digest of
+                the saved file, computed as it downloaded.
+            deadline, cancel, timeout: (optional) limits on this call, as
+                for `deadline`.
+
+        The bytes are hashed as they arrive and checked against the md5
+        storage reports for the file, or else the md5 the API records, so a
+        corrupted transfer is retried and then raises `APIException` instead
+        of leaving a bad copy. Files stored compressed are not checked, since
+        that md5 is of the compressed bytes.
+
+        Returns:
+            ouput_path: location where file was saved or None if error; with
+                `return_md5`, an `(output_path, md5)` tuple.
+        """
+        tracker = Progress(progress) if progress else None
+        info = next(
+            (
+                f
+                for f in self.get_project_by_id(projectId)["files"]
+                if f["name"] == filename
+            ),
+            None,
+        )
+        size, md5 = (info.get("size"), info.get("md5")) if info else (None, None)
+        result = None
+        if segments > 1:
+            result = self._download_segmented(
+                projectId, filename, output_dir, tracker, segments, size, md5
+            )
+        if not result:
+            result = self._download_file(projectId, filename, output_dir, tracker, md5)
+        if tracker:
+            tracker.close()
+        output_path, md5 = result or (None, None)
+        return (output_path, md5) if return_md5 else output_path
+
+    def open(self, projectId, fileName, block_size=1024 * 1024, read_ahead=4):
+        """Open a project file for reading without downloading all of it.
+
+        The file is read with HTTP range requests as it is used, so readers
+        that only need part of it, such as pyarrow reading a Parquet file's
+        footer or `zipfile` reading one member, only transfer that part.
+
+        Args:
+            projectId: the id of a Big Local News project.
+            fileName: the name of a file in the project.
+            block_size: (optional) the bytes fetched and cached together.
+            read_ahead: (optional) how many more blocks to fetch with each
+                request while the file is read from start to end.
+
+        Returns:
+            file: a seekable, read-only binary file object; see
+                `bln.remote.RemoteFile`.
+        """
+        from .remote import RemoteFile
+
+        return RemoteFile(
+            self, projectId, fileName, block_size=block_size, read_ahead=read_ahead
+        )
+
+    @_limited
+    def download_files(
+        self,
+        projectId,
+        filenames=None,
+        output_dir=None,
+        progress=None,
+        jobs=None,
+        return_md5=False,
+    ):
+        """Download several files from project `projectId` in parallel.
+
+        Args:
+            projectId: the id of a Big Local News project.
+            filenames: the names of files in the project; all of its files if
+                not specified.
+            output_dir: uses current working directory if not specified.
+            progress: (optional) a function called as
+                `progress(bytes_done, total, rate)` with the bytes counted
+                across the whole batch.
+            jobs: how many files to download at once; defaults to the number
+                of CPUs.
+            return_md5: (optional) if True, return `(output_path, md5)`
+                tuples, with the hex md5 digest computed as each downloaded.
+            deadline, cancel, timeout: (optional) limits on this call, as
+                for `deadline`.
+
+        Each file is checked against the md5 storage reports, or else the md5
+        the API records, as in `download_file`.
+
+        Returns:
+            output_paths: the locations where the files were saved.
+        """
+        files = self.get_project_by_id(projectId)["files"]
+        if filenames is not None:
+            filenames = list(filenames)
+            wanted = set(filenames)
+            files = [f for f in files if f["name"] in wanted]
+        else:
+            filenames = [f["name"] for f in files]
+        tracker = None
+        if progress:
+            tracker = Progress(progress, sum(f.get("size") or 0 for f in files))
+        from multiprocessing.pool import ThreadPool
+
+        md5s = {f["name"]: f.get("md5") for f in files}
+        with ThreadPool(jobs or os.cpu_count()) as p:
+            args = [
+                (projectId, name, output_dir, tracker, md5s.get(name))
+                for name in filenames
+            ]
+            results = p.starmap(bind(self._download_file), args)
+        if tracker:
+            tracker.close()
+        results = [r or (None, None) for r in results]
+        return results if return_md5 else [path for path, _ in results]
+
+    @_retry
+    def _download_file(self, projectId, filename, output_dir, tracker, md5=None):
+        """Download a file in one piece, hashing it on the way.
 
         Returns:
-            ouput_path: location where file was saved or None if error.
+            (output_path, md5): where the file was saved and its hex md5
+                digest, or None if it has no download uri.
         """
+        import requests
+
         if not output_dir:
             output_dir = os.getcwd()
         output_dir = os.path.expanduser(output_dir)
-        uri = self.createFileDownloadUri(projectId, filename)
-        if not uri:
+        r = self._storage_get(projectId, filename, stream=True)
+        if r is None:
             return
-        with requests.get(uri["uri"], stream=True) as r:
+        with r:
             if r.status_code != requests.codes.ok:
                 raise APIException(responses[r.status_code])
             output_path = os.path.join(output_dir, filename)
-            with open(output_path, "wb") as f:
-                for chunk in r.iter_content(chunk_size=1024 * 1024):
-                    if chunk:  # filter out keep-alive new chunks
+            size = r.headers.get("content-length")
+            if tracker and tracker.total is None and size:
+                tracker.total = int(size)
+            # the md5 storage reports describes the stored bytes, so it can
+            # not check a file decompressed on the way
+            encoded = "content-encoding" in r.headers or (
+                "x-goog-stored-content-encoding" in r.headers
+                and r.headers["x-goog-stored-content-encoding"] != "identity"
+            )
+            expected = None if encoded else _stored_md5(r.headers) or md5
+            digest = hashlib.md5()
+            check = current_deadline().check
+            count = 0
+            try:
+                with open(output_path, "wb") as f:
+                    # compressed files are decompressed as they are read
+                    for chunk in r.iter_content(chunk_size=1024 * 1024):
+                        check()
+                        if chunk:  # filter out keep-alive new chunks
+                            f.write(chunk)
+                            digest.update(chunk)
+                            if tracker:
+                                # count the bytes transferred, which is what
+                                # the size and content-length describe
+                                received = r.raw.tell()
+                                tracker.update(received - count)
+                                count = received
+                if expected and not same_md5(digest.hexdigest(), expected):
+                    os.remove(output_path)
+                    raise APIException(f"{filename} does not match its md5")
+            except Exception:
+                # take back the bytes of a failed attempt before any retry
+                if tracker:
+                    tracker.update(-count)
+                raise
+            return output_path, digest.hexdigest()
+
+    def _storage_get(self, projectId, fileName, **kwargs):
+        """GET a file from storage, or return None if it has no download uri.
+
+        The cached download uri is used, and if the storage host refuses it
+        (it expired or was revoked) a new one is minted for a second try.
+        """
+        uri = self.download_uri(projectId, fileName)
+        if not uri:
+            return None
+        r = self.session.get(uri["uri"], **kwargs)
+        if r.status_code == 403:
+            r.close()
+            uri = self.download_uri(projectId, fileName, refresh=True)
+            r = self.session.get(uri["uri"], **kwargs)
+        return r
+
+    def _download_segmented(
+        self, projectId, filename, output_dir, tracker, segments, size, md5=None
+    ):
+        """Download a file as parallel byte ranges into a preallocated file.
+
+        `size` and `md5` are those the API records for the file. The file is
+        removed if the download fails, rather than left zero-filled at its
+        full size.
+
+        Returns:
+            (output_path, md5): where the file was saved and its hex md5
+                digest, or None if it is too small to split or the storage
+                host does not serve ranges, for the caller to download it in
+                one piece instead.
+        """
+        count = min(segments, -(-(size or 0) // self.MIN_SEGMENT_SIZE))
+        if count < 2:
+            return None
+        output_dir = os.path.expanduser(output_dir or os.getcwd())
+        output_path = os.path.join(output_dir, filename)
+        with open(output_path, "wb") as f:
+            _preallocate(f.fileno(), size)
+        if tracker and tracker.total is None:
+            tracker.total = size
+        bounds = [size * i // count for i in range(count + 1)]
+        try:
+            md5 = self._download_segments(
+                projectId, filename, output_path, bounds, tracker, md5
+            )
+        except BaseException as e:
+            os.remove(output_path)
+            if isinstance(e, _RangesIgnored):
+                return None
+            raise
+        return output_path, md5
+
+    @_retry
+    def _download_segments(
+        self, projectId, filename, output_path, bounds, tracker, md5
+    ):
+        """Download the ranges between `bounds` in parallel and check the md5.
+
+        A mismatch downloads every range again, as the md5 of the whole file
+        cannot tell which of them was damaged.
+        """
+        args = [
+            (projectId, filename, output_path, start, end, tracker)
+            for start, end in zip(bounds, bounds[1:])
+        ]
+        from multiprocessing.pool import ThreadPool
+
+        with ThreadPool(len(args)) as p:
+            p.starmap(bind(self._download_range), args)
+        from .manifest import file_md5
+
+        # the ranges arrive out of order, so they are hashed in one pass after
+        digest = file_md5(output_path)
+        if md5 and not same_md5(digest, md5):
+            if tracker:
+                tracker.update(-bounds[-1])
+            raise APIException(f"{filename} does not match its md5")
+        return digest
+
+    @_retry
+    def _download_range(self, projectId, filename, output_path, start, end, tracker):
+        # identity, so that the range addresses the stored bytes
+        headers = {"Range": f"bytes={start}-{end - 1}", "Accept-Encoding": "identity"}
+        r = self._storage_get(projectId, filename, stream=True, headers=headers)
+        with r:
+            if r.status_code == 200:
+                raise _RangesIgnored()
+            if r.status_code != 206:
+                raise APIException(responses[r.status_code])
+            check = current_deadline().check
+            count = 0
+            try:
+                with open(output_path, "r+b") as f:
+                    f.seek(start)
+                    for chunk in r.iter_content(chunk_size=1024 * 1024):
+                        check()
                         f.write(chunk)
-            return output_path
+                        count += len(chunk)
+                        if tracker:
+                            tracker.update(len(chunk))
+                if count != end - start:
+                    raise APIException(f"{filename}: short read of a byte range")
+            except Exception:
+                if tracker:
+                    tracker.update(-count)
+                raise
+
+    @_limited
+    def sync_dir(
+        self,
+        projectId,
+        local_dir,
+        direction="both",
+        delete=False,
+        dry_run=False,
+        jobs=None,
+        progress=None,
+    ):
+        """Bring the files in `local_dir` and project `projectId` in step.
+
+        Only the differences are transferred. Both sides are compared with
+        what they held after the last sync, which is kept in a
+        `.bln-sync.json` file in `local_dir`, using the size, md5 and
+        updatedAt the server reports for each file.
+
+        Args:
+            projectId: the id of a Big Local News project.
+            local_dir: the local directory; subdirectories are ignored.
+            direction: "up" to make the project match the directory, "down"
+                to make the directory match the project, or "both" to carry
+                changes each way, the newer copy winning a conflict.
+            delete: whether to delete files missing on the source side, or,
+                with "both", files deleted on one side since the last sync;
+                otherwise they are copied back.
+            dry_run: if True, only return the plan, without changing anything.
+            jobs: how many files to transfer at once; defaults to the number
+                of CPUs.
+            progress: (optional) a function called as
+                `progress(bytes_done, total, rate)` during the uploads and
+                again during the downloads.
+            deadline, cancel, timeout: (optional) limits on this call, as
+                for `deadline`.
+
+        Returns:
+            actions: a list of dicts with the "action" ("upload",
+                "download", "delete_remote" or "delete_local"), file "name"
+                and "size" of every change made or, for a dry run, planned.
+        """
+        from .sync import sync_dir
+
+        return sync_dir(
+            self, projectId, local_dir, direction, delete, dry_run, jobs, progress
+        )
 
-    def upload_from_json(self, json_path):
+    @_limited
+    def upload_from_json(self, json_path, jobs=None):
         """Upload groups and projects from a json config.
 
-        See example_config.json.
+        The config holds lists of "groups" and "projects", each entry the
+        arguments of `createGroup` or `createProject`, or, if it has an
+        "id", of `updateGroup` or `updateProject`. Entries are applied
+        `jobs` at a time. A project waits only for the groups of the config
+        that its groupRoles name by id or name; a name is replaced by the
+        group's id once it exists. Other projects, and their file uploads,
+        run alongside the groups.
+
+        Args:
+            json_path: the path of the config.
+            jobs: how many entries to apply at once; defaults to the number
+                of CPUs.
+            deadline, cancel, timeout: (optional) limits on this call, as
+                for `deadline`.
+
+        Returns:
+            report: one dict per entry, groups then projects in config
+                order, with its "type", "name", "action" ("create" or
+                "update"), "result", "error" (None if it succeeded) and
+                "seconds" taken. A project whose group failed is skipped.
         """
-        path = os.path.expanduser(json_path)
-        if not os.path.exists(path):
-            raise APIException(f"invalid json_path: {path}")
-        with open(path) as f:
-            data = json.load(f)
-        if "groups" in data:
-            for group in data["groups"]:
-                if "id" in group:
-                    self.createGroup(**group)
-                else:
-                    self.updateGroup(**group)
-        if "projects" in data:
-            for project in data["projects"]:
-                if "id" in project:
-                    self.updateProject(**project)
-                else:
-                    self.createProject(**project)
+        from .config import upload_from_json
+
+        return upload_from_json(self, json_path, jobs)
 
     def search_groups(self, predicate=lambda g: re.match(".*", g["name"])):
         """Return groups where `predicate(group)` is True.
@@ -433,6 +1314,28 @@ class Client:
                     files.append(f)
         return files
 
+    def files_frame(self):
+        """Return every file the current user can see as a pandas DataFrame.
+
+        Returns:
+            files: a DataFrame with one row per file; see
+                `bln.pandas.frames.files_frame` for the columns.
+        """
+        from .pandas.frames import files_frame
+
+        return files_frame(self)
+
+    def projects_frame(self):
+        """Return every project the current user can see as a pandas DataFrame.
+
+        Returns:
+            projects: a DataFrame with one row per project; see
+                `bln.pandas.frames.projects_frame` for the columns.
+        """
+        from .pandas.frames import projects_frame
+
+        return projects_frame(self)
+
 
 def _gql(
     endpoint,
@@ -440,18 +1343,74 @@ def _gql(
     query_string,
     variables=None,
     ungraphql=True,
+    session=None,
+    persisted=False,
 ):
+    import requests
+
+    session = session or requests
     inpt = {"query": query_string, "variables": variables or {}}
     headers = {"Authorization": f"JWT {token}"}
-    res = requests.post(endpoint, json=inpt, headers=headers)
+    data = None
+    if persisted and endpoint not in _no_persisted_queries:
+        res, data = _post_persisted(session, endpoint, inpt, headers)
+    else:
+        res = session.post(endpoint, json=inpt, headers=headers)
     if res.status_code != requests.codes.ok:
         return None, responses[res.status_code]
-    data = res.json()
+    if data is None:
+        data = res.json()
     if ungraphql:
         data = _ungraphql(data)
     return data, None
 
 
+# endpoints that refused a persisted query; they are sent query text only
+_no_persisted_queries = set()
+
+
+def _post_persisted(session, endpoint, inpt, headers):
+    """Post a query as its hash, resending the text if the server lacks it.
+
+    This is the automatic persisted query protocol: once the server has seen
+    a query with its hash, later requests only need the hash.
+
+    Returns:
+        res: the response that answered the query.
+        data: its parsed body, if it was already parsed, else None.
+    """
+    extensions = {
+        "persistedQuery": {"version": 1, "sha256Hash": q.query_hash(inpt["query"])}
+    }
+    res = session.post(
+        endpoint,
+        json={"variables": inpt["variables"], "extensions": extensions},
+        headers=headers,
+    )
+    data, code = None, None
+    try:
+        data = res.json()
+        code = data["errors"][0]["extensions"]["code"]
+    except (ValueError, LookupError, TypeError):
+        pass
+    if res.status_code == 200 and not (code or "").startswith("PERSISTED_QUERY"):
+        return res, data
+    if code == "PERSISTED_QUERY_NOT_FOUND":
+        # send the text with its hash once, so the server keeps it
+        inpt = dict(inpt, extensions=extensions)
+    elif code == "PERSISTED_QUERY_NOT_SUPPORTED" or (
+        res.status_code == 400 and not code
+    ):
+        # a server that doesn't understand the extension at all may just
+        # call the request bad
+        _no_persisted_queries.add(endpoint)
+    else:
+        # a failure that has nothing to do with the hash, such as an expired
+        # token or a rate limit, is handled like that of any query
+        return res, data
+    return session.post(endpoint, json=inpt, headers=headers), None
+
+
 def _ungraphql(root):
     # unwraps levels that are simply (id, <item>: <value>) to just <value>
     if isinstance(root, dict) and "id" in root and len(root) == 2:
@@ -476,21 +1435,86 @@ def _ungraphql(root):
     return root
 
 
-@retry(APIException, tries=4, delay=15, backoff=3)
-def _upload_file(endpoint, token, projectId, path):
+class _RangesIgnored(Exception):
+    """The storage host answered a range request with the whole file."""
+
+
+def _preallocate(fd, size):
+    """Reserve `size` bytes for an open file, so parallel writes can't run out."""
+    try:
+        os.posix_fallocate(fd, 0, size)
+    except (AttributeError, OSError):
+        # not available on this platform or file system; a sparse file will do
+        os.ftruncate(fd, size)
+
+
+def _uri_expiry(uri):
+    """Return when a signed uri expires, in seconds since the epoch, or None.
+
+    Both V4 signatures (X-Goog-Date plus X-Goog-Expires seconds) and V2
+    signatures (an Expires timestamp) are understood.
+    """
+    from urllib.parse import parse_qs, urlsplit
+
+    params = parse_qs(urlsplit(uri).query)
+    try:
+        if "X-Goog-Date" in params and "X-Goog-Expires" in params:
+            signed = datetime.strptime(params["X-Goog-Date"][0], "%Y%m%dT%H%M%SZ")
+            signed = signed.replace(tzinfo=timezone.utc).timestamp()
+            return signed + int(params["X-Goog-Expires"][0])
+        if "Expires" in params:
+            return int(params["Expires"][0])
+    except ValueError:
+        pass
+    return None
+
+
+@_retry
+def _upload_file(
+    endpoint, token, projectId, path, progress=None, session=None, compress=False
+):
+    data = None
+    if isinstance(path, tuple):
+        # a (name, bytes or binary file) pair held in memory
+        path, data = path
     logger.debug(f"uploading {path}")
-    path = os.path.expanduser(path)
-    if not os.path.exists(path):
-        raise APIException(f"invalid path: {path}")
-    uri, err = _get_upload_uri(endpoint, token, projectId, path)
+    if data is None:
+        path = os.path.expanduser(path)
+        if not os.path.exists(path):
+            raise APIException(f"invalid path: {path}")
+    uri, err = _get_upload_uri(endpoint, token, projectId, path, session)
     if err:
         raise APIException(err)
-    err = _put(path, uri["uri"])
+    md5, err = _put(path, uri["uri"], progress, session, compress, data)
     if err:
         raise APIException(err)
+    return md5
+
+
+def _file_size(path):
+    if isinstance(path, tuple):
+        data = path[1]
+        if hasattr(data, "seek"):
+            return data.seek(0, os.SEEK_END)
+        return len(data)
+    try:
+        return os.path.getsize(os.path.expanduser(path))
+    except OSError:
+        return 0
+
+
+def _buffer(data):
+    """Return an in-memory upload as a binary file at its start."""
+    if not hasattr(data, "read"):
+        import io
 
+        return io.BytesIO(data)
+    # from the start, as a retry must send it all again
+    data.seek(0)
+    return data
 
-def _get_upload_uri(endpoint, token, projectId, path):
+
+def _get_upload_uri(endpoint, token, projectId, path, session=None):
     fname = os.path.basename(path)
     data, err = _gql(
         endpoint,
@@ -502,6 +1526,7 @@ def _get_upload_uri(endpoint, token, projectId, path):
                 "fileName": fname,
             }
         },
+        session=session,
     )
     if not data:
         return None, "No data returned from _get_upload_url"
@@ -513,23 +1538,123 @@ def _get_upload_uri(endpoint, token, projectId, path):
     return data["ok"], None
 
 
-def _put(path, uri):
+# files worth compressing on the way up
+TEXT_EXTENSIONS = (
+    ".csv",
+    ".tsv",
+    ".txt",
+    ".json",
+    ".jsonl",
+    ".ndjson",
+    ".geojson",
+    ".xml",
+    ".html",
+    ".md",
+    ".sql",
+)
+
+
+def _put(path, uri, progress=None, session=None, compress=False, data=None):
+    import contextlib
+
+    import requests
+
+    session = session or requests
     headers = {
         "content-type": "application/octet-stream",
         "host": "storage.googleapis.com",
     }
-    with open(path, "rb") as f:
-        res = requests.put(uri, data=f, headers=headers)
+    with contextlib.ExitStack() as stack:
+        if data is None:
+            f = stack.enter_context(open(path, "rb"))
+            size = os.fstat(f.fileno()).st_size
+        else:
+            f = _buffer(data)
+            size = f.seek(0, os.SEEK_END)
+            f.seek(0)
+        added = 0
+        if compress and path.lower().endswith(TEXT_EXTENSIONS):
+            f = stack.enter_context(_gzipped(f))
+            headers["content-encoding"] = "gzip"
+            compressed = os.fstat(f.fileno()).st_size
+            # the total counted the uncompressed size
+            added, size = compressed - size, compressed
+            if progress:
+                progress.add_total(added)
+        # hash the bytes as they are sent, rather than reading the file twice
+        hashed = MD5Reader(f, size)
+        # and stop between chunks if the call is cancelled
+        deadline = current_deadline()
+        body = CheckedReader(hashed, size, deadline)
+        if progress:
+            body = ProgressReader(body, size, progress)
+        res = None
+        try:
+            res = session.put(uri, data=body, headers=headers)
+        except Exception:
+            # a body that stopped itself is reported as a connection error
+            deadline.check()
+            raise
+        finally:
+            # take back the bytes of a failed attempt so a retry does not
+            # count them twice
+            if progress and (res is None or res.status_code != requests.codes.ok):
+                progress.update(-body.count)
+                progress.add_total(-added)
         if res.status_code != requests.codes.ok:
-            return responses[res.status_code]
-
-
-def _put_string(string, uri):
+            return None, responses[res.status_code]
+        md5 = hashed.md5.hexdigest()
+        stored = _stored_md5(res.headers)
+        if stored and not same_md5(md5, stored):
+            return None, f"{os.path.basename(path)} was stored with another md5"
+        return md5, None
+
+
+def _stored_md5(headers):
+    """Return the md5 storage reports for an object, in base64 or hex, or None.
+
+    Cloud Storage sends it in x-goog-hash; the ETag of an object uploaded in
+    one piece is its hex md5 too.
+    """
+    for part in headers.get("x-goog-hash", "").split(","):
+        name, _, value = part.strip().partition("=")
+        if name == "md5":
+            return value
+    etag = headers.get("etag", "").strip('"')
+    if re.fullmatch("[0-9a-f]{32}", etag):
+        return etag
+    return None
+
+
+def _gzipped(f):
+    """Return a temporary file holding the rest of `f`, gzipped."""
+    import gzip
+    import shutil
+    import tempfile
+
+    tmp = tempfile.TemporaryFile()
+    # mtime=0 so the same file always compresses to the same bytes
+    with gzip.GzipFile(fileobj=tmp, mode="wb", compresslevel=6, mtime=0) as gz:
+        shutil.copyfileobj(f, gz, 1024 * 1024)
+    tmp.seek(0)
+    return tmp
+
+
+def _put_string(string, uri, session=None, compress=False):
+    import requests
+
+    session = session or requests
     headers = {
         "content-type": "application/octet-stream",
         "host": "storage.googleapis.com",
     }
-    res = requests.put(uri, data=string.encode("utf-8"), headers=headers)
+    data = string.encode("utf-8")
+    if compress:
+        import gzip
+
+        data = gzip.compress(data, compresslevel=6, mtime=0)
+        headers["content-encoding"] = "gzip"
+    res = session.put(uri, data=data, headers=headers)
     if res.status_code != requests.codes.ok:
         return responses[res.status_code]
 
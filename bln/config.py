@@ -0,0 +1,155 @@
+"""Apply a json config of groups and projects."""
+
+import functools
+import json
+import os
+import time
+
+from .deadline import bind
+from .exceptions import APIException, Cancelled
+
+
+def load(json_path):
+    """Return the groups and projects of the config at `json_path`."""
+    path = os.path.expanduser(json_path)
+    if not os.path.exists(path):
+        raise APIException(f"invalid json_path: {path}")
+    with open(path) as f:
+        data = json.load(f)
+    return data.get("groups", []), data.get("projects", [])
+
+
+def _group_keys(groups):
+    """Map the id and name of each config group to its index."""
+    keys = {}
+    for i, group in enumerate(groups):
+        for key in (group.get("id"), group.get("name")):
+            if key:
+                keys.setdefault(key, i)
+    return keys
+
+
+def _group_refs(project, keys):
+    """Return the indexes of the config groups a project's groupRoles name."""
+    refs = set()
+    for role in project.get("groupRoles") or []:
+        if role.get("groupId") in keys:
+            refs.add(keys[role["groupId"]])
+    return refs
+
+
+def _run(kind, entry, func):
+    """Call `func(**entry)` and return its report; `Cancelled` is raised."""
+    action = "update" if "id" in entry else "create"
+    start = time.perf_counter()
+    result, error = None, None
+    try:
+        result = func(**entry)
+        if result is None:
+            error = f"{action} returned nothing"
+    except Cancelled:
+        # stop the whole config, not just this entry
+        raise
+    except Exception as e:
+        error = str(e) or type(e).__name__
+    return {
+        "type": kind,
+        "name": entry.get("name") or entry.get("id"),
+        "action": action,
+        "result": result,
+        "error": error,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def _skipped(project, reason):
+    return {
+        "type": "project",
+        "name": project.get("name") or project.get("id"),
+        "action": "update" if "id" in project else "create",
+        "result": None,
+        "error": reason,
+        "seconds": 0.0,
+    }
+
+
+def _resolve(project, groups, reports):
+    """Point groupRoles that name a config group at the group's id."""
+    ids = {}
+    for group, report in zip(groups, reports):
+        if report and report["result"]:
+            ids[group.get("name")] = report["result"]["id"]
+            if group.get("id"):
+                ids[group["id"]] = report["result"]["id"]
+    roles = [
+        dict(role, groupId=ids.get(role.get("groupId"), role.get("groupId")))
+        for role in project["groupRoles"]
+    ]
+    return dict(project, groupRoles=roles)
+
+
+def upload_from_json(client, json_path, jobs=None):
+    """Apply the config at `json_path`; see `Client.upload_from_json`."""
+    groups, projects = load(json_path)
+    from multiprocessing.pool import ThreadPool
+
+    keys = _group_keys(groups)
+    refs = [_group_refs(project, keys) for project in projects]
+    # the projects waiting on each group, and how many groups each awaits
+    dependents = [[] for _ in groups]
+    for i, project_refs in enumerate(refs):
+        for r in project_refs:
+            dependents[r].append(i)
+    pending = [len(project_refs) for project_refs in refs]
+    group_reports = [None] * len(groups)
+    project_results = [None] * len(projects)
+
+    with ThreadPool(jobs or os.cpu_count()) as p:
+
+        def group_done(g, report):
+            # runs in the pool's result thread, so one group at a time;
+            # projects start as soon as the groups they name are done, in
+            # whatever order the groups finish
+            group_reports[g] = report
+            for i in dependents[g]:
+                pending[i] -= 1
+                if not pending[i]:
+                    project_results[i] = _start_dependent(
+                        p, client, projects[i], refs[i], groups, group_reports
+                    )
+
+        group_results = [
+            p.apply_async(
+                bind(_run),
+                ("group", g, client.updateGroup if "id" in g else client.createGroup),
+                callback=functools.partial(group_done, i),
+            )
+            for i, g in enumerate(groups)
+        ]
+        for i, project in enumerate(projects):
+            if not refs[i]:
+                project_results[i] = _apply_project(p, client, project)
+        # a result is ready only after its callback ran, so once every group
+        # is done every project has been started
+        reports = [r.get() for r in group_results]
+        reports += [r if isinstance(r, dict) else r.get() for r in project_results]
+    return reports
+
+
+def _start_dependent(pool, client, project, refs, groups, group_reports):
+    """Start a project whose groups are done, or skip it if one failed."""
+    failed = [groups[r].get("name") for r in refs if group_reports[r]["error"]]
+    if failed:
+        return _skipped(project, f"group {', '.join(failed)} failed")
+    project = _resolve(project, groups, group_reports)
+    try:
+        return _apply_project(pool, client, project)
+    except ValueError:
+        # the pool was shut down after a cancelled group; the call raises
+        # that instead of reporting this project
+        return _skipped(project, "cancelled")
+
+
+def _apply_project(pool, client, project):
+    func = client.updateProject if "id" in project else client.createProject
+    return pool.apply_async(bind(_run), ("project", project, func))
@@ -0,0 +1,171 @@
+"""Deadlines, timeouts and cancellation shared by the parts of an operation."""
+
+import contextvars
+import functools
+import threading
+import time
+
+from .exceptions import Cancelled, DeadlineExceeded
+
+_current = contextvars.ContextVar("bln_deadline", default=None)
+
+
+class Deadline:
+    """A time limit, cancellation flag and request timeout for an operation.
+
+    The deadline in effect is kept in a context variable, so every request,
+    retry and chunk of a transfer made on its behalf can check it without
+    passing it along. `bind` carries it into pool workers. A deadline made
+    while another is in effect keeps the earlier expiry, the other's flag
+    and, unless given its own, the other's timeout.
+    """
+
+    def __init__(self, seconds=None, cancel=None, timeout=None):
+        """Create a deadline.
+
+        Args:
+            seconds: (optional) how long the operation may take, retries
+                included.
+            cancel: (optional) a `threading.Event`; setting it stops the
+                operation at its next request or chunk.
+            timeout: (optional) a connect and read timeout for each request,
+                in seconds or as a `(connect, read)` tuple, in place of the
+                client's.
+        """
+        self.parent = _current.get()
+        self.expires = None if seconds is None else time.monotonic() + seconds
+        if self.parent and self.parent.expires is not None:
+            if self.expires is None or self.parent.expires < self.expires:
+                self.expires = self.parent.expires
+        self.cancel = cancel
+        self.timeout = timeout
+        if timeout is None and self.parent:
+            self.timeout = self.parent.timeout
+
+    def __enter__(self):
+        """Put the deadline in effect."""
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        """Restore the deadline that was in effect before."""
+        _current.reset(self._token)
+
+    def cancelled(self):
+        """Test if this deadline, or one it is nested in, was cancelled."""
+        d = self
+        while d:
+            if d.cancel is not None and d.cancel.is_set():
+                return True
+            d = d.parent
+        return False
+
+    def remaining(self):
+        """Return the seconds left, or None if there is no time limit."""
+        if self.expires is None:
+            return None
+        return self.expires - time.monotonic()
+
+    def check(self):
+        """Raise `Cancelled` or `DeadlineExceeded` if the operation must stop."""
+        if self.cancelled():
+            raise Cancelled("cancelled")
+        remaining = self.remaining()
+        if remaining is not None and remaining <= 0:
+            raise DeadlineExceeded("deadline exceeded")
+
+    def request_timeout(self, default):
+        """Return the timeout for a request, cut to the time remaining."""
+        timeout = default if self.timeout is None else self.timeout
+        remaining = self.remaining()
+        if remaining is None:
+            return timeout
+        if timeout is None:
+            return remaining
+        if isinstance(timeout, tuple):
+            return tuple(remaining if t is None else min(t, remaining) for t in timeout)
+        return min(timeout, remaining)
+
+    def sleep(self, seconds):
+        """Wait `seconds`, or raise at once if the operation stops first."""
+        remaining = self.remaining()
+        if remaining is not None and remaining < seconds:
+            raise DeadlineExceeded(f"no time left to wait {seconds}s")
+        end = time.monotonic() + seconds
+        while True:
+            self.check()
+            left = end - time.monotonic()
+            if left <= 0:
+                return
+            # wake up now and then to notice a flag set on an outer deadline
+            _event(self).wait(min(left, 0.5))
+
+    async def asleep(self, seconds):
+        """Like `sleep`, but wait without blocking the event loop."""
+        import asyncio
+
+        remaining = self.remaining()
+        if remaining is not None and remaining < seconds:
+            raise DeadlineExceeded(f"no time left to wait {seconds}s")
+        end = time.monotonic() + seconds
+        while True:
+            self.check()
+            left = end - time.monotonic()
+            if left <= 0:
+                return
+            await asyncio.sleep(min(left, 0.5))
+
+
+def _event(deadline):
+    d = deadline
+    while d:
+        if d.cancel is not None:
+            return d.cancel
+        d = d.parent
+    return threading.Event()
+
+
+def current():
+    """Return the deadline in effect, or one without limits."""
+    return _current.get() or _NONE
+
+
+_NONE = Deadline()
+
+
+def bind(func, deadline=None):
+    """Return `func` set to run under `deadline`, or the one in effect now.
+
+    Pool workers are threads of their own, which do not see the context of
+    the thread that hands them work.
+    """
+    deadline = deadline or _current.get()
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        token = _current.set(deadline)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _current.reset(token)
+
+    return wrapper
+
+
+class CheckedReader:
+    """Wrap a binary file so that each read first checks the deadline."""
+
+    def __init__(self, f, size, deadline):
+        """Wrap `f`, which holds `size` bytes."""
+        self._f = f
+        self._size = size
+        self._deadline = deadline
+
+    def __len__(self):
+        """Return the total size, so HTTP clients can set Content-Length."""
+        return self._size
+
+    def read(self, n=-1):
+        """Check the deadline and read up to `n` bytes."""
+        self._deadline.check()
+        return self._f.read(n)
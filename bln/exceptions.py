@@ -2,3 +2,15 @@ class APIException(Exception):
     """An error raised when accessing the biglocalnews.org API."""
 
     pass
+
+
+class Cancelled(Exception):
+    """An operation was cancelled before it finished."""
+
+    pass
+
+
+class DeadlineExceeded(Cancelled, TimeoutError):
+    """An operation ran out of time before it finished."""
+
+    pass
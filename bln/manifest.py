@@ -0,0 +1,137 @@
+"""A record of the files last pushed to a project."""
+
+import base64
+import hashlib
+import json
+import os
+
+
+def file_md5(path, chunk_size=1024 * 1024):
+    """Return the hex md5 digest of the file at `path`."""
+    digest = hashlib.md5()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class MD5Reader:
+    """Wrap a binary file so that the bytes read from it are hashed."""
+
+    def __init__(self, f, size):
+        """Wrap `f`, which holds `size` bytes."""
+        self._f = f
+        self._size = size
+        self.md5 = hashlib.md5()
+
+    def __len__(self):
+        """Return the total size, so HTTP clients can set Content-Length."""
+        return self._size
+
+    def read(self, n=-1):
+        """Read up to `n` bytes and hash them."""
+        chunk = self._f.read(n)
+        self.md5.update(chunk)
+        return chunk
+
+
+def same_md5(hex_digest, other):
+    """Test if a hex md5 digest matches `other`, given in hex or base64."""
+    if not hex_digest or not other:
+        return False
+    if len(other) == 32:
+        return other.lower() == hex_digest
+    try:
+        return base64.b64decode(other).hex() == hex_digest
+    except ValueError:
+        return False
+
+
+class Manifest:
+    """The project id and last-pushed files of a directory, kept as JSON.
+
+    The file looks like this, with paths relative to the manifest's
+    directory:
+
+        {
+            "projectId": "UHJvamVjdDo...",
+            "files": {
+                "data/ia.csv": {"md5": "...", "size": 1024, "mtime": 1700000000.0}
+            }
+        }
+
+    A file has changed if its size or modification time differ from the
+    record and its md5 does too, so unchanged files are never read.
+    """
+
+    def __init__(self, path):
+        """Load the manifest at `path`, or start an empty one."""
+        self.path = path
+        self.root = os.path.dirname(os.path.abspath(path))
+        self.projectId = None
+        self.files = {}
+        self._digests = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                data = json.load(f)
+            self.projectId = data.get("projectId")
+            self.files = data.get("files", {})
+
+    def set_project(self, projectId):
+        """Point the manifest at `projectId`, forgetting pushes elsewhere."""
+        if projectId != self.projectId:
+            self.projectId = projectId
+            self.files = {}
+
+    def key(self, path):
+        """Return the manifest key of a local path."""
+        return os.path.relpath(os.path.abspath(path), self.root).replace(os.sep, "/")
+
+    def changed(self, paths):
+        """Return the paths that differ from what was last pushed.
+
+        Paths that no longer exist, e.g. deleted or renamed files, are left
+        out and their records forgotten, so they are pushed again if they
+        come back.
+        """
+        changed = []
+        for path in paths:
+            key = self.key(path)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                self.files.pop(key, None)
+                continue
+            record = self.files.get(key)
+            if (
+                record
+                and record["size"] == stat.st_size
+                and record["mtime"] == stat.st_mtime
+            ):
+                continue
+            digest = file_md5(path)
+            self._digests[key] = digest
+            if record and record["size"] == stat.st_size and record["md5"] == digest:
+                # touched but not modified; remember the new mtime
+                record["mtime"] = stat.st_mtime
+                continue
+            changed.append(path)
+        return changed
+
+    def record(self, path):
+        """Remember that `path` was pushed in its current state."""
+        key = self.key(path)
+        stat = os.stat(path)
+        digest = self._digests.pop(key, None) or file_md5(path)
+        self.files[key] = {
+            "md5": digest,
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+        }
+
+    def save(self):
+        """Write the manifest, replacing the old file atomically."""
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"projectId": self.projectId, "files": self.files}, f, indent=2)
+        os.replace(tmp, self.path)
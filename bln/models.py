@@ -0,0 +1,269 @@
+"""Compact typed models of API results."""
+
+import sys
+from dataclasses import asdict, dataclass
+
+
+class Model:
+    """Dict-style access to a slotted dataclass, for code written for dicts.
+
+    `project["name"]`, `project.get("files")`, `"md5" in f`, `f["projectId"] =
+    ...`, `keys()`, `items()` and `dict(project)` all work as they do on the
+    plain dicts the client returns by default.
+    """
+
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        """Return the field `key`."""
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        """Set the field `key`."""
+        if key not in self.__slots__:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        """Test if `key` is a field."""
+        return key in self.__slots__
+
+    def __iter__(self):
+        """Iterate over the field names."""
+        return iter(self.__slots__)
+
+    def __len__(self):
+        """Return the number of fields."""
+        return len(self.__slots__)
+
+    def get(self, key, default=None):
+        """Return the field `key`, or `default` if there is no such field."""
+        return getattr(self, key, default) if key in self.__slots__ else default
+
+    def keys(self):
+        """Return the field names."""
+        return self.__slots__
+
+    def values(self):
+        """Return the field values."""
+        return [getattr(self, key) for key in self.__slots__]
+
+    def items(self):
+        """Return (name, value) pairs for every field."""
+        return [(key, getattr(self, key)) for key in self.__slots__]
+
+    def to_dict(self):
+        """Return the model, and any models it holds, as plain dicts."""
+        return asdict(self)
+
+
+@dataclass(slots=True)
+class User(Model):
+    """A user, as listed in a project's or group's roles."""
+
+    id: str = None
+    username: str = None
+    displayName: str = None
+    contactMethod: str = None
+    contact: str = None
+
+
+@dataclass(slots=True)
+class Group(Model):
+    """A group; `userRoles` is a list of `User`."""
+
+    id: str = None
+    name: str = None
+    contactMethod: str = None
+    contact: str = None
+    updatedAt: str = None
+    description: str = None
+    userRoles: list = None
+
+
+@dataclass(slots=True)
+class GroupRole(Model):
+    """A group's role on a project, or the current user's role in a group."""
+
+    id: str = None
+    role: str = None
+    group: Group = None
+
+
+@dataclass(slots=True)
+class File(Model):
+    """A file with its tag names and the id and name of its project."""
+
+    id: str = None
+    name: str = None
+    createdAt: str = None
+    updatedAt: str = None
+    size: int = None
+    md5: str = None
+    tags: list = None
+    projectId: str = None
+    projectName: str = None
+
+
+@dataclass(slots=True)
+class Project(Model):
+    """A project; roles are lists of `User` and `GroupRole`, files of `File`."""
+
+    id: str = None
+    name: str = None
+    updatedAt: str = None
+    contactMethod: str = None
+    contact: str = None
+    description: str = None
+    isOpen: bool = None
+    userRoles: list = None
+    groupRoles: list = None
+    effectiveUserRoles: list = None
+    files: list = None
+    tags: list = None
+
+
+@dataclass(slots=True)
+class ProjectRole(Model):
+    """The current user's role on a project."""
+
+    id: str = None
+    role: str = None
+    project: Project = None
+
+
+def _nodes(connection):
+    return [edge["node"] for edge in connection["edges"]] if connection else []
+
+
+def _intern(value):
+    return sys.intern(value) if value else value
+
+
+def _tags(connection):
+    return [_intern(node["tag"]["name"]) for node in _nodes(connection)]
+
+
+def _users(connection):
+    return [User(**node["user"]) for node in _nodes(connection)]
+
+
+def group(raw):
+    """Build a `Group` from its GraphQL object."""
+    fields = dict(raw)
+    if "userRoles" in raw:
+        fields["userRoles"] = _users(raw["userRoles"])
+    if "contactMethod" in raw:
+        fields["contactMethod"] = _intern(raw["contactMethod"])
+    return Group(**fields)
+
+
+def _file(raw, projectId, projectName):
+    fields = dict(raw, projectId=projectId, projectName=projectName)
+    fields["tags"] = _tags(raw.get("tags"))
+    return File(**fields)
+
+
+def project(raw):
+    """Build a `Project` from its GraphQL object."""
+    fields = dict(raw)
+    for key in ("userRoles", "effectiveUserRoles"):
+        if key in raw:
+            fields[key] = _users(raw[key])
+    if "groupRoles" in raw:
+        fields["groupRoles"] = _group_roles(raw["groupRoles"])
+    if "tags" in raw:
+        fields["tags"] = _tags(raw["tags"])
+    if "contactMethod" in raw:
+        fields["contactMethod"] = _intern(raw["contactMethod"])
+    if "files" in raw:
+        id_, name = raw.get("id"), raw.get("name")
+        fields["files"] = [_file(f, id_, name) for f in _nodes(raw["files"])]
+    return Project(**fields)
+
+
+def node(raw):
+    """Build a `Project` or `Group` from the object of a node query."""
+    if raw is None:
+        return None
+    return project(raw) if "isOpen" in raw else group(raw)
+
+
+def _project_roles(connection):
+    return [
+        ProjectRole(node["id"], _intern(node["role"]), project(node["project"]))
+        for node in _nodes(connection)
+    ]
+
+
+def _group_roles(connection):
+    return [
+        GroupRole(node["id"], _intern(node["role"]), group(node["group"]))
+        for node in _nodes(connection)
+    ]
+
+
+def _tokens(connection):
+    return [node["token"] for node in _nodes(connection)]
+
+
+def _projects(connection):
+    return [project(node) for node in _nodes(connection)]
+
+
+def _ok(build):
+    def payload(raw):
+        if raw.get("ok"):
+            return dict(raw, ok=build(raw["ok"]))
+        return raw
+
+    return payload
+
+
+VIEWER = {
+    "groupRoles": _group_roles,
+    "projectRoles": _project_roles,
+    "effectiveProjectRoles": _project_roles,
+    "personalTokens": _tokens,
+}
+
+TOP = {
+    "node": node,
+    "openProjects": _projects,
+    "createGroup": _ok(group),
+    "updateGroup": _ok(group),
+    "createProject": _ok(project),
+    "updateProject": _ok(project),
+}
+
+
+def _viewer(raw):
+    if not VIEWER.keys() & raw.keys():
+        return User(**raw)
+    viewer = {k: VIEWER[k](v) if k in VIEWER else v for k, v in raw.items()}
+    if len(viewer) == 2 and "id" in viewer:
+        # as in _ungraphql, {id, <field>} is just <field>
+        return next(v for k, v in viewer.items() if k != "id")
+    return viewer
+
+
+def build(payload):
+    """Build models from a GraphQL response, in the shape `_ungraphql` gives.
+
+    The response is walked once and its objects become `User`, `Group`,
+    `GroupRole`, `Project`, `ProjectRole` and `File` instances, so there is
+    no intermediate copy as plain dicts. Role names, tag names and contact
+    methods are interned, since the same few strings repeat throughout.
+    """
+    from .client import _ungraphql
+
+    data = payload.get("data") if isinstance(payload, dict) else None
+    if not data:
+        return _ungraphql(payload)
+    if "user" in data:
+        return _viewer(data["user"])
+    if "node" in data:
+        return node(data["node"])
+    return {k: TOP[k](v) if k in TOP else _ungraphql(v) for k, v in data.items()}
@@ -6,8 +6,10 @@ def register(pd):
     """
     from pandas.api.extensions import register_dataframe_accessor
 
-    from .read_bln import read_bln
-    from .write_bln import BlnWriterAccessor
+    from .read_bln import read_bln, read_bln_async
+    from .write_bln import BlnAsyncWriterAccessor, BlnWriterAccessor
 
     pd.read_bln = read_bln
+    pd.read_bln_async = read_bln_async
     register_dataframe_accessor("to_bln")(BlnWriterAccessor)
+    register_dataframe_accessor("to_bln_async")(BlnAsyncWriterAccessor)
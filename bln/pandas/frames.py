@@ -0,0 +1,82 @@
+def _dates(pd, values):
+    return pd.to_datetime(pd.Series(values, dtype="object"), utc=True, format="ISO8601")
+
+
+def files_frame(client):
+    """Return every file the client can see as one row of a pandas DataFrame.
+
+    Args:
+        client (bln.Client): The client to fetch the files with.
+
+    Returns a pandas DataFrame with the columns projectId, projectName, id,
+    name, size, md5, createdAt, updatedAt and tags. The project columns are
+    categorical, size is a nullable integer, the dates are UTC timestamps and
+    tags holds a list of tag names per file.
+    """
+    import pandas as pd
+
+    keys = ("id", "name", "size", "md5", "createdAt", "updatedAt")
+    columns = {k: [] for k in ("projectId", "projectName", *keys, "tags")}
+    for role in client.effectiveProjectRoles():
+        project = role["project"]
+        for f in project["files"] or []:
+            columns["projectId"].append(project["id"])
+            columns["projectName"].append(project["name"])
+            for key in keys:
+                columns[key].append(f.get(key))
+            columns["tags"].append(f.get("tags") or [])
+    return pd.DataFrame(
+        {
+            "projectId": pd.Categorical(columns["projectId"]),
+            "projectName": pd.Categorical(columns["projectName"]),
+            "id": pd.Series(columns["id"], dtype="string"),
+            "name": pd.Series(columns["name"], dtype="string"),
+            "size": pd.Series(columns["size"], dtype="Int64"),
+            "md5": pd.Series(columns["md5"], dtype="string"),
+            "createdAt": _dates(pd, columns["createdAt"]),
+            "updatedAt": _dates(pd, columns["updatedAt"]),
+            "tags": pd.Series(columns["tags"], dtype="object"),
+        }
+    )
+
+
+def projects_frame(client):
+    """Return every project the client can see as one row of a pandas DataFrame.
+
+    Args:
+        client (bln.Client): The client to fetch the projects with.
+
+    Returns a pandas DataFrame with the columns id, name, description,
+    contact, contactMethod, isOpen, updatedAt, role (the current user's
+    effective role), tags, files (the number of files) and size (their
+    total bytes).
+    """
+    import pandas as pd
+
+    keys = ("id", "name", "description", "contact", "contactMethod", "isOpen")
+    columns = {k: [] for k in (*keys, "updatedAt", "role", "tags", "files", "size")}
+    for role in client.effectiveProjectRoles():
+        project = role["project"]
+        files = project["files"] or []
+        for key in keys:
+            columns[key].append(project.get(key))
+        columns["updatedAt"].append(project.get("updatedAt"))
+        columns["role"].append(role["role"])
+        columns["tags"].append(project.get("tags") or [])
+        columns["files"].append(len(files))
+        columns["size"].append(sum(f.get("size") or 0 for f in files))
+    return pd.DataFrame(
+        {
+            "id": pd.Series(columns["id"], dtype="string"),
+            "name": pd.Series(columns["name"], dtype="string"),
+            "description": pd.Series(columns["description"], dtype="string"),
+            "contact": pd.Series(columns["contact"], dtype="string"),
+            "contactMethod": pd.Categorical(columns["contactMethod"]),
+            "isOpen": pd.Series(columns["isOpen"], dtype="boolean"),
+            "updatedAt": _dates(pd, columns["updatedAt"]),
+            "role": pd.Categorical(columns["role"]),
+            "tags": pd.Series(columns["tags"], dtype="object"),
+            "files": pd.Series(columns["files"], dtype="int64"),
+            "size": pd.Series(columns["size"], dtype="int64"),
+        }
+    )
@@ -1,11 +1,11 @@
+import io
 import os
 
-import pandas as pd
+from ..client import Client, responses
+from ..exceptions import APIException
 
-from ..client import Client
 
-
-def read_bln(project_id, file_name, api_token=None, tier="prod", **kwargs):
+def read_bln(project_id, file_name, api_token=None, tier="prod", client=None, **kwargs):
     """Read in the provided file from biglocalnews.org and return a pandas dataframe.
 
     The filenames must end with .csv, .json, .xls, or .xlsx, which are mapped to the appropriate pandas reader function.
@@ -15,10 +15,55 @@ def read_bln(project_id, file_name, api_token=None, tier="prod", **kwargs):
         file_name (str): The name of the file within the biglocalnews.org project.
         api_token (str): An API key from biglocalnews.org with permission to read from the project. (Required but can be drawn from the env variable `BLN_API_TOKEN`)
         tier (str): The biglocalnews.org environment to access. (Required but default is 'prod', which will work for most users.)
+        client (bln.Client): The client to fetch the file with. (Optional; by default the shared client for the token and tier is used, so repeated reads reuse its connections.)
         **kwargs: Any other pandas options to be passed into the file reader.
 
     Returns a pandas DataFrame.
     """
+    # Reuse a connection to the biglocalnews.org API
+    client = _client(api_token, tier, client)
+
+    # Figure out what pandas reader method to use based on the file
+    reader = _reader(file_name)
+
+    # Fetch the file through the client's session, which asks for compressed
+    # files to be sent compressed and decompresses them
+    res = client._storage_get(project_id, file_name)
+    if res is None:
+        raise ValueError(f"No file named {file_name} found")
+    if res.status_code != 200:
+        raise APIException(responses[res.status_code])
+
+    # Read in the file and return the DataFrame.
+    return reader(io.BytesIO(res.content), **kwargs)
+
+
+async def read_bln_async(
+    project_id, file_name, api_token=None, tier="prod", client=None, **kwargs
+):
+    """Read in the provided file from biglocalnews.org without blocking the event loop.
+
+    Takes the same arguments as `read_bln`. The download uri is minted and the file fetched with httpx, which must be installed (`pip install httpx[http2]`), and the file is parsed in a worker thread. Each client has at most `bln.aio.MAX_TRANSFERS` files downloaded or being parsed at once, so that many reads gathered together don't hold every file in memory.
+
+    Returns a pandas DataFrame.
+    """
+    import asyncio
+
+    from .. import aio
+
+    client = _client(api_token, tier, client)
+    reader = _reader(file_name)
+    async with aio.slot(client):
+        content = await aio.get(client, project_id, file_name)
+        if content is None:
+            raise ValueError(f"No file named {file_name} found")
+        return await asyncio.to_thread(reader, io.BytesIO(content), **kwargs)
+
+
+def _client(api_token, tier, client):
+    """Return `client`, or the shared client for the token and tier."""
+    if client:
+        return client
     # Pull the api token
     if not api_token:
         api_token = os.getenv("BLN_API_TOKEN")
@@ -27,24 +72,21 @@ def read_bln(project_id, file_name, api_token=None, tier="prod", **kwargs):
             raise ValueError(
                 "No API token provided. Either provide one as an inpurt or set the BLN_API_TOKEN environment variable."
             )
+    return Client.shared(api_token, tier=tier)
+
+
+def _reader(file_name):
+    """Return the pandas reader function for a file name."""
+    # Import pandas here, not at the top, so that loading the bln package
+    # never imports it
+    import pandas as pd
 
-    # Figure out what pandas reader method to use based on the file
     if file_name.endswith(".csv"):
-        reader = pd.read_csv
+        return pd.read_csv
     elif file_name.endswith(".json"):
-        reader = pd.read_json
+        return pd.read_json
     elif file_name.endswith(".xls") or file_name.endswith(".xlsx"):
-        reader = pd.read_excel
-    else:
-        raise ValueError(
-            "File name does not have a pandas reader. Only .csv, .json, .xls and .xlsx files are supported."
-        )
-
-    # Create an connection to the biglocalnews.org API
-    client = Client(api_token, tier=tier)
-
-    # Get the url from biglocalnews.org
-    url = client.createFileDownloadUri(project_id, file_name)
-
-    # Read in the file and return the DataFrame.
-    return reader(url["uri"], **kwargs)
+        return pd.read_excel
+    raise ValueError(
+        "File name does not have a pandas reader. Only .csv, .json, .xls and .xlsx files are supported."
+    )
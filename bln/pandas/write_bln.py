@@ -1,8 +1,8 @@
-import os
+import io
 import pathlib
 import tempfile
 
-from ..client import Client
+from .read_bln import _client
 
 
 class BlnWriterAccessor:
@@ -15,6 +15,7 @@ class BlnWriterAccessor:
         file_name (str): The name of the file within the biglocalnews.org project.
         api_token (str): An API key from biglocalnews.org with permission to read from the project. (Required but can be drawn from the env variable `BLN_API_TOKEN`)
         tier (str): The biglocalnews.org environment to access. (Required but default is 'prod', which will work for most users.)
+        client (bln.Client): The client to upload the file with. (Optional; by default the shared client for the token and tier is used.)
         **kwargs: Any other pandas options to be passed into the file writer,
     """
 
@@ -22,28 +23,15 @@ class BlnWriterAccessor:
         """Initialize accessor."""
         self._obj = pandas_obj
 
-    def __call__(self, project_id, file_name, api_token=None, tier="prod", **kwargs):
+    def __call__(
+        self, project_id, file_name, api_token=None, tier="prod", client=None, **kwargs
+    ):
         """Write in attached dataframe to biglocalnews.org.."""
-        # Pull the api token
-        if not api_token:
-            api_token = os.getenv("BLN_API_TOKEN")
-            # Raise an error if it doesn't exist
-            if not api_token:
-                raise ValueError(
-                    "No API token provided. Either provide one as an inpurt or set the BLN_API_TOKEN environment variable."
-                )
+        # Reuse a connection to the biglocalnews.org API
+        client = _client(api_token, tier, client)
 
         # Figure out what pandas reader method to use based on the file
-        if file_name.endswith(".csv"):
-            writer = self._obj.to_csv
-        elif file_name.endswith(".json"):
-            writer = self._obj.to_json
-        elif file_name.endswith(".xls") or file_name.endswith(".xlsx"):
-            writer = self._obj.to_excel
-        else:
-            raise ValueError(
-                "File name does not have a pandas writer. Only .csv, .json, .xls and .xlsx files are supported."
-            )
+        writer = _writer(self._obj, file_name)
 
         # Get a temporary file
         temp_path = pathlib.Path(tempfile.mkdtemp()) / file_name
@@ -51,8 +39,45 @@ class BlnWriterAccessor:
         # Write the file to the temporary location
         writer(temp_path, **kwargs)
 
-        # Create an connection to the biglocalnews.org API
-        client = Client(api_token, tier=tier)
-
         # Now upload that file to biglocalnews.org
         client.upload_file(project_id, temp_path)
+
+
+class BlnAsyncWriterAccessor(BlnWriterAccessor):
+    """Write in attached dataframe to biglocalnews.org without blocking the event loop.
+
+    Takes the same arguments as `to_bln`. The frame is written to memory in a worker thread, then the upload uri is minted and the file sent with httpx, which must be installed (`pip install httpx[http2]`). Each client has at most `bln.aio.MAX_TRANSFERS` files being written or sent at once.
+    """
+
+    async def __call__(
+        self, project_id, file_name, api_token=None, tier="prod", client=None, **kwargs
+    ):
+        """Write in attached dataframe to biglocalnews.org and return its md5."""
+        import asyncio
+
+        from .. import aio
+
+        client = _client(api_token, tier, client)
+        writer = _writer(self._obj, file_name)
+        async with aio.slot(client):
+            data = await asyncio.to_thread(_write, writer, **kwargs)
+            return await aio.put(client, project_id, file_name, data)
+
+
+def _write(writer, **kwargs):
+    buffer = io.BytesIO()
+    writer(buffer, **kwargs)
+    return buffer.getvalue()
+
+
+def _writer(obj, file_name):
+    """Return the pandas writer method of `obj` for a file name."""
+    if file_name.endswith(".csv"):
+        return obj.to_csv
+    elif file_name.endswith(".json"):
+        return obj.to_json
+    elif file_name.endswith(".xls") or file_name.endswith(".xlsx"):
+        return obj.to_excel
+    raise ValueError(
+        "File name does not have a pandas writer. Only .csv, .json, .xls and .xlsx files are supported."
+    )
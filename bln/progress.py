@@ -0,0 +1,82 @@
+"""Transfer progress reporting."""
+
+import threading
+import time
+
+
+class Progress:
+    """Count transferred bytes and report them to a callback.
+
+    The callback is called as `callback(bytes_done, total, rate)`, where
+    `total` is the expected number of bytes (or None if unknown) and `rate`
+    is the throughput in bytes per second since the previous report. Reports
+    are throttled to one per `interval` seconds, plus a final one from
+    `close`, so counting every chunk of a fast transfer stays cheap.
+
+    A single instance may be shared by several threads to aggregate the
+    progress of a bulk operation.
+    """
+
+    def __init__(self, callback, total=None, interval=0.1):
+        """Create a progress counter.
+
+        Args:
+            callback: a function taking `(bytes_done, total, rate)`.
+            total: the expected number of bytes, if known.
+            interval: the minimum number of seconds between reports.
+        """
+        self.callback = callback
+        self.total = total
+        self.interval = interval
+        self.done = 0
+        self._lock = threading.Lock()
+        self._last = time.monotonic()
+        self._last_done = 0
+
+    def update(self, n):
+        """Add `n` bytes to the count; `n` may be negative to undo a retry."""
+        with self._lock:
+            self.done += n
+            now = time.monotonic()
+            if now - self._last >= self.interval:
+                self._report(now)
+
+    def add_total(self, n):
+        """Add `n` bytes to the expected total, e.g. once a file is compressed."""
+        with self._lock:
+            if self.total is not None:
+                self.total += n
+
+    def close(self):
+        """Report the final count."""
+        with self._lock:
+            self._report(time.monotonic())
+
+    def _report(self, now):
+        elapsed = now - self._last
+        rate = (self.done - self._last_done) / elapsed if elapsed > 0 else 0.0
+        self._last, self._last_done = now, self.done
+        self.callback(self.done, self.total, rate)
+
+
+class ProgressReader:
+    """Wrap a binary file so that reads are counted by a `Progress`."""
+
+    def __init__(self, f, size, progress):
+        """Wrap `f`, which holds `size` bytes, counting reads in `progress`."""
+        self._f = f
+        self._size = size
+        self._progress = progress
+        self.count = 0
+
+    def __len__(self):
+        """Return the total size, so HTTP clients can set Content-Length."""
+        return self._size
+
+    def read(self, n=-1):
+        """Read up to `n` bytes and count them."""
+        chunk = self._f.read(n)
+        if chunk:
+            self.count += len(chunk)
+            self._progress.update(len(chunk))
+        return chunk
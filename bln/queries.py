@@ -1,3 +1,6 @@
+import functools
+import hashlib
+
 # FRAGMENTS
 fragment_user = """
 id
@@ -250,6 +253,29 @@ query {{
 }}
 """
 
+# just enough of each project to tell whether it changed; name is included
+# because _ungraphql collapses any {id, <field>} object to the bare field
+query_projectUpdates = """
+query {
+    user {
+        id
+        effectiveProjectRoles {
+            edges {
+                node {
+                    id
+                    role
+                    project {
+                        id
+                        name
+                        updatedAt
+                    }
+                }
+            }
+        }
+    }
+}
+"""
+
 query_personalTokens = """
 query {
     user {
@@ -266,6 +292,23 @@ query {
 }
 """
 
+
+@functools.lru_cache
+def query_projects(count):
+    """Return a query for `count` projects, by ids $id0... as fields p0...."""
+    variables = ", ".join(f"$id{i}: ID!" for i in range(count))
+    nodes = "".join(f"""
+    p{i}: node(id: $id{i}) {{
+        ... on Project {{
+            {fragment_project}
+        }}
+    }}""" for i in range(count))
+    return f"""
+query Nodes({variables}) {{{nodes}
+}}
+"""
+
+
 query_userNames = """
 query {
     userNames
@@ -406,3 +449,21 @@ mutation UpdateProject($input: UpdateProjectInput!) {{
     }}
 }}
 """
+
+
+@functools.lru_cache(maxsize=64)
+def _sha256(document):
+    return hashlib.sha256(document.encode()).hexdigest()
+
+
+# SHA-256 of every document above, for automatic persisted queries
+HASHES = {
+    v: _sha256(v)
+    for k, v in list(globals().items())
+    if k.startswith(("query_", "mutation_")) and isinstance(v, str)
+}
+
+
+def query_hash(document):
+    """Return the hex SHA-256 of a document, as sent for persisted queries."""
+    return HASHES.get(document) or _sha256(document)
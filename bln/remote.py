@@ -0,0 +1,199 @@
+"""Read-only file objects backed by HTTP range requests."""
+
+import io
+import threading
+from collections import OrderedDict
+
+from .exceptions import APIException
+
+
+class RemoteFile(io.RawIOBase):
+    """A seekable binary file that reads a project file over HTTP ranges.
+
+    Bytes are fetched in blocks of `block_size` and the most recent
+    `cache_blocks` are kept, so readers that jump around (pyarrow reading a
+    Parquet footer, `zipfile` reading one member, pandas sniffing a header)
+    only transfer what they touch. When reads run sequentially, each request
+    also fetches the next `read_ahead` blocks.
+
+    The size is learned from the first request, which asks for the last
+    block, since that is where Parquet and ZIP readers start. Servers that
+    ignore ranges are handled by keeping the whole file they return.
+
+        with client.open(project_id, "data.zip") as f:
+            zipfile.ZipFile(f).read("part.csv")
+    """
+
+    def __init__(
+        self,
+        client,
+        projectId,
+        fileName,
+        block_size=1024 * 1024,
+        cache_blocks=16,
+        read_ahead=4,
+    ):
+        """Open `fileName` in project `projectId` for reading.
+
+        Args:
+            client: the `bln.Client` to mint download uris and send requests.
+            projectId: the id of a Big Local News project.
+            fileName: the name of a file in the project.
+            block_size: the bytes fetched and cached together.
+            cache_blocks: how many blocks to keep.
+            read_ahead: how many blocks past the one needed to fetch when
+                reading sequentially.
+        """
+        super().__init__()
+        self.client = client
+        self.projectId = projectId
+        self.name = fileName
+        self.mode = "rb"
+        self.block_size = block_size
+        self.cache_blocks = cache_blocks
+        self.read_ahead = read_ahead
+        # the number of HTTP requests made, for tuning the settings above
+        self.requests = 0
+        self._size = None
+        self._pos = 0
+        self._next_block = None
+        self._blocks = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def size(self):
+        """The size of the file in bytes."""
+        if self._size is None:
+            with self._lock:
+                if self._size is None:
+                    self._get(f"-{self.block_size}")
+        return self._size
+
+    def readable(self):
+        """Return True."""
+        return True
+
+    def seekable(self):
+        """Return True."""
+        return True
+
+    def tell(self):
+        """Return the current position."""
+        return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        """Move to `offset` relative to the start, current position or end."""
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += self.size
+        elif whence != io.SEEK_SET:
+            raise ValueError(f"invalid whence: {whence}")
+        if offset < 0:
+            raise ValueError("negative seek position")
+        self._pos = offset
+        return offset
+
+    def read(self, size=-1):
+        """Read up to `size` bytes, or to the end if `size` is negative."""
+        if self.closed:
+            raise ValueError("I/O operation on closed file")
+        end = (
+            self.size if size is None or size < 0 else min(self._pos + size, self.size)
+        )
+        data = self._read(self._pos, end)
+        self._pos += len(data)
+        return data
+
+    def readall(self):
+        """Read to the end of the file."""
+        return self.read()
+
+    def readinto(self, b):
+        """Read into the writable buffer `b`; return the bytes read."""
+        data = self.read(len(b))
+        b[: len(data)] = data
+        return len(data)
+
+    def close(self):
+        """Close the file and drop its cached blocks."""
+        self._blocks.clear()
+        super().close()
+
+    def _read(self, start, end):
+        if start >= end:
+            return b""
+        bs = self.block_size
+        first, last = start // bs, (end - 1) // bs
+        with self._lock:
+            blocks = {}
+            missing = []
+            for i in range(first, last + 1):
+                if i in self._blocks:
+                    self._blocks.move_to_end(i)
+                    blocks[i] = self._blocks[i]
+                else:
+                    missing.append(i)
+            if missing:
+                lo, hi = missing[0], missing[-1]
+                # reads from the start, or on from the last, are sequential
+                if lo in (0, self._next_block):
+                    hi += self.read_ahead
+                hi = min(hi, (self._size - 1) // bs)
+                blocks.update(self._get(f"{lo * bs}-{(hi + 1) * bs - 1}"))
+            self._next_block = last + 1
+        data = b"".join(blocks[i] for i in range(first, last + 1))
+        offset = start - first * bs
+        return data[offset : offset + end - start]
+
+    def _get(self, spec):
+        """Fetch the bytes in a Range spec; cache and return them by block."""
+        res = self._request({"Range": f"bytes={spec}"})
+        body = res.content
+        if res.status_code == 200:
+            # the whole file; keep it all
+            self._size, start = len(body), 0
+            self.cache_blocks = max(self.cache_blocks, -(-len(body) // self.block_size))
+        else:
+            content_range = res.headers.get("content-range", "")
+            span, _, total = content_range.removeprefix("bytes ").partition("/")
+            self._size = int(total)
+            start = int(span.partition("-")[0])
+        blocks = {}
+        bs = self.block_size
+        # a suffix range may start mid-block; only cache whole blocks and
+        # the file's last, partial one
+        skip = -start % bs
+        for offset in range(skip, len(body), bs):
+            block = body[offset : offset + bs]
+            index = (start + offset) // bs
+            if len(block) == bs or start + offset + len(block) == self._size:
+                blocks[index] = block
+        for i, block in blocks.items():
+            self._blocks[i] = block
+            self._blocks.move_to_end(i)
+        while len(self._blocks) > self.cache_blocks:
+            self._blocks.popitem(last=False)
+        return blocks
+
+    def _request(self, headers):
+        # identity, so that ranges address the stored bytes
+        headers = {**headers, "Accept-Encoding": "identity"}
+        self.requests += 1
+        res = self.client._storage_get(self.projectId, self.name, headers=headers)
+        if res is None:
+            raise APIException(f"No file named {self.name} found")
+        if res.status_code == 416:
+            # an empty file has no bytes to ask for
+            self._size = 0
+            return _Empty()
+        if res.status_code not in (200, 206):
+            from .client import responses
+
+            raise APIException(responses[res.status_code])
+        return res
+
+
+class _Empty:
+    status_code = 200
+    content = b""
@@ -0,0 +1,47 @@
+"""Scheduling of bulk file transfers."""
+
+import threading
+import time
+
+
+def largest_first(sizes):
+    """Return the indexes of `sizes` from the largest to the smallest.
+
+    Starting the longest transfers first keeps one big file from running
+    alone at the end of a batch after every other worker has finished; ties
+    keep their original order.
+    """
+    return sorted(range(len(sizes)), key=lambda i: -sizes[i])
+
+
+class ByteBudget:
+    """Limit the total size of the transfers in flight at once.
+
+    A transfer bigger than the whole budget waits until nothing else is in
+    flight and then runs alone, so every file is sent eventually.
+    """
+
+    def __init__(self, limit=None):
+        """Allow up to `limit` bytes in flight; no limit if None."""
+        self.limit = limit
+        self.inflight = 0
+        self._cond = threading.Condition()
+
+    def acquire(self, size):
+        """Wait until `size` more bytes fit; return the seconds waited."""
+        start = time.monotonic()
+        with self._cond:
+            while (
+                self.limit is not None
+                and self.inflight
+                and self.inflight + size > self.limit
+            ):
+                self._cond.wait()
+            self.inflight += size
+        return time.monotonic() - start
+
+    def release(self, size):
+        """Return `size` bytes to the budget."""
+        with self._cond:
+            self.inflight -= size
+            self._cond.notify_all()
@@ -0,0 +1,76 @@
+"""A normalized store of API entities."""
+
+import threading
+
+from .models import Model
+
+
+class EntityStore:
+    """Keep one shared dict for every GraphQL node id seen in results.
+
+    When results are merged into the store, each object with an "id" is
+    replaced by the store's dict for that id, which is updated with the new
+    fields. The same user, group, project or file then appears as one object
+    wherever it occurs, in a single result or across many, and the memory
+    held is bounded by the number of unique entities.
+
+    Fields are last-write-wins: merging a result that fetched fewer fields
+    updates only those fields. `bln.models` objects are merged the same way,
+    a field left as None counting as not fetched. Since objects are shared,
+    changing one in place changes it everywhere it appears.
+    """
+
+    def __init__(self):
+        """Create an empty store."""
+        self.entities = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        """Return the number of unique entities."""
+        return len(self.entities)
+
+    def __contains__(self, id):
+        """Test if the store holds an entity with this id."""
+        return id in self.entities
+
+    def get(self, id, default=None):
+        """Return the entity with this id."""
+        return self.entities.get(id, default)
+
+    def merge(self, data):
+        """Merge a result into the store and return it with shared entities."""
+        with self._lock:
+            return self._merge(data)
+
+    def _merge(self, data):
+        if isinstance(data, list):
+            return [self._merge(item) for item in data]
+        if isinstance(data, Model):
+            return self._merge_model(data)
+        if not isinstance(data, dict):
+            return data
+        fields = {k: self._merge(v) for k, v in data.items()}
+        id_ = fields.get("id")
+        if not isinstance(id_, str):
+            return fields
+        entity = self.entities.get(id_)
+        if entity is None:
+            self.entities[id_] = fields
+            return fields
+        entity.update(fields)
+        return entity
+
+    def _merge_model(self, model):
+        for key, value in model.items():
+            if isinstance(value, (list, Model)):
+                setattr(model, key, self._merge(value))
+        entity = self.entities.get(model.id)
+        if model.id is None or entity is model:
+            return model
+        if type(entity) is not type(model):
+            self.entities[model.id] = model
+            return model
+        for key, value in model.items():
+            if value is not None:
+                setattr(entity, key, value)
+        return entity
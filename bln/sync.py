@@ -0,0 +1,209 @@
+"""Keep a local directory and a project's files in step."""
+
+import json
+import os
+import re
+from datetime import datetime, timezone
+
+from .deadline import bind
+from .manifest import file_md5, same_md5
+
+DIRECTIONS = ("up", "down", "both")
+STATE_FILE = ".bln-sync.json"
+
+
+class SyncState:
+    """What a directory and a project held after their last sync.
+
+    For every file name the state keeps the local size, mtime and md5 and the
+    remote size, md5 and updatedAt, so either side can be checked for changes
+    without transferring or re-hashing anything.
+    """
+
+    def __init__(self, path, projectId):
+        """Load the state at `path`; it is reset if it is for another project."""
+        self.path = path
+        self.files = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                data = json.load(f)
+            if data.get("projectId") == projectId:
+                self.files = data.get("files", {})
+        self.projectId = projectId
+
+    def save(self):
+        """Write the state, replacing the old file atomically."""
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"projectId": self.projectId, "files": self.files}, f, indent=2)
+        os.replace(tmp, self.path)
+
+
+def _local_record(path, previous=None, md5=None):
+    stat = os.stat(path)
+    if (
+        previous
+        and previous.get("md5")
+        and previous["size"] == stat.st_size
+        and previous["mtime"] == stat.st_mtime
+    ):
+        return previous
+    return {"size": stat.st_size, "mtime": stat.st_mtime, "md5": md5 or file_md5(path)}
+
+
+def _remote_record(f):
+    return {"size": f.get("size"), "md5": f.get("md5"), "updatedAt": f["updatedAt"]}
+
+
+def _newer_locally(local, remote):
+    return local["mtime"] > _parse_timestamp(remote["updatedAt"])
+
+
+def _parse_timestamp(value):
+    """Return an API date as seconds since the epoch; naive dates are UTC.
+
+    Before Python 3.11, `datetime.fromisoformat` accepts neither a "Z"
+    suffix nor fractions of a second other than 3 or 6 digits.
+    """
+    value = re.sub(r"[zZ]$", "+00:00", value)
+    value = re.sub(
+        r"\.(\d+)", lambda m: "." + m.group(1)[:6].ljust(6, "0"), value, count=1
+    )
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def plan(local_dir, remote_files, state, direction="both", delete=False):
+    """Work out the transfers that bring a directory and a project in step.
+
+    Args:
+        local_dir: the local directory.
+        remote_files: the project's files, as returned by the API.
+        state: the `SyncState` of the last sync.
+        direction: "up" to make the project match the directory, "down" to
+            make the directory match the project, or "both" to carry changes
+            from each side to the other, the newer copy winning a conflict.
+        delete: whether to delete files that are missing on the source side;
+            with "both", files deleted on one side since the last sync.
+
+    Returns:
+        actions: a list of dicts with the "action" ("upload", "download",
+            "delete_remote" or "delete_local"), file "name" and "size".
+        local: the local records computed while planning, by file name.
+    """
+    if direction not in DIRECTIONS:
+        raise ValueError(f"direction must be one of {', '.join(DIRECTIONS)}")
+    up, down = direction in ("up", "both"), direction in ("down", "both")
+    remote = {f["name"]: f for f in remote_files}
+    local = {}
+    for entry in os.scandir(local_dir):
+        if entry.is_file() and not entry.name.startswith(STATE_FILE):
+            previous = state.files.get(entry.name, {}).get("local")
+            local[entry.name] = _local_record(entry.path, previous)
+
+    actions = []
+
+    def add(action, name):
+        size = (local.get(name) if action == "upload" else remote.get(name)) or {}
+        actions.append({"action": action, "name": name, "size": size.get("size")})
+
+    for name in sorted(set(local) | set(remote)):
+        previous = state.files.get(name)
+        loc, rem = local.get(name), remote.get(name)
+        if loc and rem:
+            local_changed = not previous or loc["md5"] != previous["local"]["md5"]
+            remote_changed = not previous or _remote_record(rem) != previous["remote"]
+            if not (local_changed or remote_changed) or same_md5(
+                loc["md5"], rem.get("md5")
+            ):
+                continue
+            if direction == "up" or (direction == "both" and not remote_changed):
+                add("upload", name)
+            elif direction == "down" or not local_changed:
+                add("download", name)
+            else:
+                add("upload" if _newer_locally(loc, rem) else "download", name)
+        elif loc:
+            if direction == "down" or (previous and direction == "both"):
+                # gone from the project: deleted there, or never wanted here
+                if delete:
+                    add("delete_local", name)
+                elif up:
+                    add("upload", name)
+            elif up:
+                add("upload", name)
+        else:
+            if direction == "up" or (previous and direction == "both"):
+                if delete:
+                    add("delete_remote", name)
+                elif down:
+                    add("download", name)
+            elif down:
+                add("download", name)
+    return actions, local
+
+
+def sync_dir(
+    client,
+    projectId,
+    local_dir,
+    direction="both",
+    delete=False,
+    dry_run=False,
+    jobs=None,
+    progress=None,
+):
+    """Bring `local_dir` and project `projectId` in step; see `Client.sync_dir`."""
+    local_dir = os.path.expanduser(local_dir)
+    state = SyncState(os.path.join(local_dir, STATE_FILE), projectId)
+    remote_files = client.get_project_by_id(projectId)["files"]
+    actions, local = plan(local_dir, remote_files, state, direction, delete)
+    if dry_run:
+        return actions
+
+    by_action = {}
+    for a in actions:
+        by_action.setdefault(a["action"], []).append(a["name"])
+    uploads = by_action.get("upload", [])
+    downloads = by_action.get("download", [])
+    if uploads:
+        paths = [os.path.join(local_dir, name) for name in uploads]
+        client.upload_files(projectId, paths, progress=progress, jobs=jobs)
+    # the md5 of each download, computed as it arrived
+    downloaded = {}
+    if downloads:
+        results = client.download_files(
+            projectId,
+            downloads,
+            output_dir=local_dir,
+            progress=progress,
+            jobs=jobs,
+            return_md5=True,
+        )
+        downloaded = dict(zip(downloads, (md5 for _, md5 in results)))
+    deletes = by_action.get("delete_remote", [])
+    if deletes:
+        from multiprocessing.pool import ThreadPool
+
+        with ThreadPool(jobs or os.cpu_count()) as p:
+            p.map(bind(lambda name: client.deleteFile(projectId, name)), deletes)
+    for name in by_action.get("delete_local", []):
+        os.remove(os.path.join(local_dir, name))
+
+    # record both sides as they are now
+    if uploads or deletes:
+        remote_files = client.get_project_by_id(projectId)["files"]
+    state.files = {}
+    for f in remote_files:
+        path = os.path.join(local_dir, f["name"])
+        if not os.path.isfile(path):
+            continue
+        previous = None if f["name"] in downloads else local.get(f["name"])
+        state.files[f["name"]] = {
+            "local": _local_record(path, previous, downloaded.get(f["name"])),
+            "remote": _remote_record(f),
+        }
+    state.save()
+    return actions
@@ -0,0 +1,294 @@
+"""Pooled HTTP sessions for the client."""
+
+import contextlib
+import functools
+import os
+
+from .deadline import current
+from .exceptions import Cancelled, DeadlineExceeded
+
+# requests keeps at most this many idle connections per host; enough for
+# the default number of parallel transfers on most machines
+POOL_SIZE = 32
+
+CHUNK_SIZE = 1024 * 1024
+
+# a request timeout cut to the time a deadline has left can fire a moment
+# before the deadline itself
+DEADLINE_SLACK = 0.05
+
+
+def session(http2=False, timeout=None):
+    """Return a session that keeps connections open between requests.
+
+    Every request checks the `bln.deadline.Deadline` in effect first, and
+    its timeout is cut to the time the deadline has left.
+
+    Args:
+        http2: if True, return an `HTTPXSession`, which multiplexes requests
+            to a host over one HTTP/2 connection; this needs the optional
+            `httpx[http2]` package. Otherwise return a `requests.Session`.
+        timeout: the connect and read timeout of each request, in seconds
+            or as a `(connect, read)` tuple; None waits forever.
+    """
+    if http2:
+        return HTTPXSession(timeout)
+    import requests
+
+    s = _session_class()()
+    s.timeout = timeout
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE
+    )
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    return s
+
+
+@functools.lru_cache(maxsize=1)
+def _session_class():
+    # defined on first use, so that requests is only imported then
+    import requests
+
+    class Session(requests.Session):
+        """A `requests.Session` with a default timeout and deadline checks."""
+
+        timeout = None
+
+        def request(self, method, url, **kwargs):
+            deadline = current()
+            deadline.check()
+            kwargs["timeout"] = deadline.request_timeout(
+                kwargs.get("timeout", self.timeout)
+            )
+            errors = requests.exceptions.RequestException
+            with _deadline_errors(errors, deadline):
+                response = super().request(method, url, **kwargs)
+            # a streamed body is read later, and can time out then
+            response.iter_content = _checked_iter(
+                response.iter_content, errors, deadline
+            )
+            return response
+
+    return Session
+
+
+@contextlib.contextmanager
+def _deadline_errors(errors, deadline=None):
+    """Raise the deadline's exception for `errors` that it brought about.
+
+    A request whose timeout was cut to the time a deadline has left fails
+    with the HTTP library's timeout or connection error; callers are sent
+    `Cancelled` or `DeadlineExceeded` instead, the error chained to it.
+    Other errors are raised as they are.
+    """
+    deadline = deadline or current()
+    try:
+        yield deadline
+    except errors as e:
+        try:
+            deadline.check()
+        except Cancelled as stop:
+            raise stop from e
+        remaining = deadline.remaining()
+        if remaining is not None and remaining < DEADLINE_SLACK:
+            raise DeadlineExceeded("deadline exceeded") from e
+        raise
+
+
+def _checked_iter(iter_content, errors, deadline):
+    """Wrap a response's `iter_content` in `_deadline_errors`."""
+
+    @functools.wraps(iter_content)
+    def wrapper(*args, **kwargs):
+        with _deadline_errors(errors, deadline):
+            yield from iter_content(*args, **kwargs)
+
+    return wrapper
+
+
+class HTTPXSession:
+    """The parts of the `requests.Session` API the client uses, over httpx.
+
+    Requests are sent over HTTP/2 where the server supports it, so GraphQL
+    operations and storage transfers to the same host share a connection
+    instead of each taking one. It is safe to share between threads.
+    """
+
+    def __init__(self, timeout=None):
+        """Open an httpx client with HTTP/2 enabled.
+
+        Args:
+            timeout: the connect and read timeout of each request, in
+                seconds or as a `(connect, read)` tuple; None waits forever.
+        """
+        httpx = _import_httpx()
+        self.timeout = timeout
+        self.client = httpx.Client(http2=True, timeout=None)
+
+    def _timeout(self):
+        return _httpx_timeout(self.timeout)
+
+    def post(self, url, json=None, headers=None):
+        """Send a POST request with a JSON body."""
+        import httpx
+
+        with _deadline_errors(httpx.TransportError) as deadline:
+            response = self.client.post(
+                url, json=json, headers=headers, timeout=self._timeout()
+            )
+        return _HTTPXResponse(response, deadline)
+
+    def put(self, url, data=None, headers=None):
+        """Send a PUT request with bytes or a file-like object as the body."""
+        headers = dict(headers or {})
+        content = data
+        if hasattr(data, "read"):
+            # httpx streams iterables without a length, so give it one
+            if hasattr(data, "__len__"):
+                size = len(data)
+            else:
+                size = os.fstat(data.fileno()).st_size
+            headers["content-length"] = str(size)
+            content = iter(lambda: data.read(CHUNK_SIZE), b"")
+        import httpx
+
+        with _deadline_errors(httpx.TransportError) as deadline:
+            response = self.client.put(
+                url, content=content, headers=headers, timeout=self._timeout()
+            )
+        return _HTTPXResponse(response, deadline)
+
+    def get(self, url, stream=False, headers=None):
+        """Send a GET request; with `stream`, read the body as it is used."""
+        import httpx
+
+        with _deadline_errors(httpx.TransportError) as deadline:
+            request = self.client.build_request(
+                "GET", url, headers=headers, timeout=self._timeout()
+            )
+            response = self.client.send(request, stream=stream)
+        return _HTTPXResponse(response, deadline)
+
+    def close(self):
+        """Close all connections."""
+        self.client.close()
+
+
+def _import_httpx():
+    try:
+        import httpx
+    except ImportError:
+        raise ImportError(
+            "HTTP/2 needs httpx; install it with `pip install httpx[http2]`"
+        ) from None
+    return httpx
+
+
+def _httpx_timeout(timeout):
+    """Check the deadline in effect and return the httpx timeout it leaves."""
+    import httpx
+
+    deadline = current()
+    deadline.check()
+    timeout = deadline.request_timeout(timeout)
+    if isinstance(timeout, tuple):
+        connect, read = timeout
+        return httpx.Timeout(read, connect=connect)
+    return httpx.Timeout(timeout)
+
+
+@functools.lru_cache(maxsize=1)
+def _ssl_context():
+    # loading the certificates is the slow part of opening an httpx client;
+    # do it once and share the context between async sessions
+    import httpx
+
+    return httpx.create_ssl_context()
+
+
+class AsyncSession:
+    """An `httpx.AsyncClient` over HTTP/2 that checks the deadline in effect.
+
+    Like the client's other sessions, every request checks the deadline
+    first and its timeout is cut to the time the deadline has left. A
+    session belongs to the event loop it was first used on.
+    """
+
+    def __init__(self, timeout=None):
+        """Open an async httpx client with HTTP/2 enabled.
+
+        Args:
+            timeout: the connect and read timeout of each request, in
+                seconds or as a `(connect, read)` tuple; None waits forever.
+        """
+        httpx = _import_httpx()
+        self.timeout = timeout
+        limits = httpx.Limits(max_connections=POOL_SIZE)
+        self.client = httpx.AsyncClient(
+            http2=True, timeout=None, limits=limits, verify=_ssl_context()
+        )
+
+    async def post(self, url, json=None, headers=None):
+        """Send a POST request with a JSON body."""
+        return await self._send("POST", url, json=json, headers=headers)
+
+    async def put(self, url, content=None, headers=None):
+        """Send a PUT request with bytes as the body."""
+        return await self._send("PUT", url, content=content, headers=headers)
+
+    async def get(self, url, headers=None):
+        """Send a GET request and read the whole body."""
+        return await self._send("GET", url, headers=headers)
+
+    async def _send(self, method, url, **kwargs):
+        import httpx
+
+        with _deadline_errors(httpx.TransportError):
+            return await self.client.request(
+                method, url, timeout=_httpx_timeout(self.timeout), **kwargs
+            )
+
+    async def aclose(self):
+        """Close all connections."""
+        await self.client.aclose()
+
+
+class _HTTPXResponse:
+    """An httpx response that reads like a `requests.Response`."""
+
+    def __init__(self, response, deadline):
+        self.response = response
+        self.status_code = response.status_code
+        self.headers = response.headers
+        self.raw = self
+        self._deadline = deadline
+
+    def json(self):
+        return self.response.json()
+
+    @property
+    def content(self):
+        import httpx
+
+        with _deadline_errors(httpx.TransportError, self._deadline):
+            return self.response.read()
+
+    def iter_content(self, chunk_size=None):
+        import httpx
+
+        with _deadline_errors(httpx.TransportError, self._deadline):
+            yield from self.response.iter_bytes(chunk_size)
+
+    def tell(self):
+        # as on urllib3's raw response: the bytes read before decoding
+        return self.response.num_bytes_downloaded
+
+    def close(self):
+        self.response.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
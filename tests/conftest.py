@@ -0,0 +1,22 @@
+import pytest
+
+from .fake_server import FakeBLN
+
+
+@pytest.fixture
+def server():
+    """Run a fake biglocalnews.org API for the length of a test."""
+    with FakeBLN() as fake:
+        yield fake
+
+
+@pytest.fixture
+def client(server):
+    """Return a client connected to the fake API."""
+    return server.client()
+
+
+@pytest.fixture
+def no_wait(monkeypatch):
+    """Retry at once instead of after the usual delays."""
+    monkeypatch.setattr("bln.client.RETRY_DELAYS", (0, 0, 0))
@@ -0,0 +1,719 @@
+"""An in-process stand-in for the biglocalnews.org API and its file storage.
+
+`FakeBLN` runs a small HTTP server on a background thread that answers the
+GraphQL operations in `bln.queries` and the signed-URI uploads and downloads
+they hand out, so the client can be exercised without a live tier or token.
+
+    with FakeBLN(latency=0.01) as server:
+        pid = server.add_project("WARN Act Notices")
+        server.add_file(pid, "ia.csv", b"a,b")
+        client = server.client()
+        client.download_file(pid, "ia.csv")
+
+Latency (seconds per request), bandwidth (bytes per second, per request) and
+error injection (a random `error_rate` or a queue of `fail()` calls) can be
+changed at any time, including while requests are in flight.
+"""
+
+import base64
+import gzip
+import hashlib
+import itertools
+import json
+import random
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+from bln import queries as q
+
+# map each document in bln.queries to its variable name, e.g. "query_user"
+OPERATIONS = {
+    getattr(q, name): name
+    for name in dir(q)
+    if name.startswith(("query_", "mutation_")) and isinstance(getattr(q, name), str)
+}
+
+CHUNK = 64 * 1024
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _error(message, code):
+    return {"errors": [{"message": message, "extensions": {"code": code}}]}
+
+
+def _node_id(kind, key=None):
+    key = key or uuid.uuid4()
+    return base64.b64encode(f"{kind}:{key}".encode()).decode()
+
+
+def _edges(nodes):
+    return {"edges": [{"node": n} for n in nodes]}
+
+
+class FakeBLN:
+    """A fake biglocalnews.org GraphQL endpoint and storage host."""
+
+    def __init__(self, latency=0.0, bandwidth=None, error_rate=0.0, seed=0):
+        """Create a fake server; call `start` or use it as a context manager.
+
+        Args:
+            latency: seconds to wait before answering each request.
+            bandwidth: bytes per second for request and response bodies;
+                unlimited if None.
+            error_rate: probability that any request fails with a 500.
+            seed: seed for the error injection random number generator.
+        """
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.error_rate = error_rate
+        self.url_expires = 3600
+        self.persisted_queries = True
+        # send md5s in x-goog-hash and ETag, as Cloud Storage does
+        self.hash_headers = True
+        # request body bytes read, to measure what the client sends
+        self.received = 0
+        self._persisted = {}
+        self.log = []
+        self._random = random.Random(seed)
+        self._failures = []
+        self._corruptions = 0
+        self._lock = threading.RLock()
+        self._signed = {}
+        self._counter = itertools.count()
+        self._httpd = None
+        self.user = {
+            "id": _node_id("User"),
+            "username": "tester",
+            "displayName": "Test User",
+            "contactMethod": "EMAIL",
+            "contact": "tester@example.com",
+        }
+        self.tokens = [{"id": _node_id("PersonalToken"), "token": "fake-token"}]
+        self.groups = {}
+        self.projects = {}
+        self.tags = {}
+
+    # server lifecycle
+
+    def start(self):
+        """Start serving on a free local port."""
+        self._httpd = _Server(("127.0.0.1", 0), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.fake = self
+        thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving."""
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self):
+        """Start the server."""
+        return self.start()
+
+    def __exit__(self, *exc):
+        """Stop the server."""
+        self.stop()
+
+    @property
+    def base_url(self):
+        """Return the root URL of the running server."""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def endpoint(self):
+        """Return the GraphQL endpoint of the running server."""
+        return f"{self.base_url}/graphql"
+
+    def client(self, **kwargs):
+        """Return a `bln.Client` pointed at this server."""
+        from bln import Client
+
+        client = Client("fake-token", **kwargs)
+        client.endpoint = self.endpoint
+        return client
+
+    # fixtures
+
+    def add_project(self, name, files=None, tags=(), **fields):
+        """Add a project and return its id.
+
+        Args:
+            name: the project name.
+            files: (optional) a dict of file name to bytes.
+            tags: (optional) project tag names.
+            **fields: other project fields, e.g. description or isOpen.
+        """
+        with self._lock:
+            id_ = _node_id("Project")
+            self.projects[id_] = {
+                "id": id_,
+                "updatedAt": _now(),
+                "name": name,
+                "contactMethod": fields.get("contactMethod", "EMAIL"),
+                "contact": fields.get("contact", self.user["contact"]),
+                "description": fields.get("description", ""),
+                "isOpen": bool(fields.get("isOpen", False)),
+                "tags": list(tags or ()),
+                "groupRoles": _group_roles(fields.get("groupRoles")),
+                "files": {},
+            }
+        for file_name, data in (files or {}).items():
+            self.add_file(id_, file_name, data)
+        return id_
+
+    def add_file(self, project_id, name, data, tags=(), content_encoding=None):
+        """Store `data` as file `name` in a project.
+
+        With a `content_encoding` of "gzip", `data` is kept compressed and
+        served as Cloud Storage does: compressed to clients that accept gzip,
+        decompressed to the rest.
+        """
+        with self._lock:
+            project = self.projects[project_id]
+            old = project["files"].get(name)
+            now = _now()
+            project["files"][name] = {
+                "id": old["id"] if old else _node_id("File"),
+                "name": name,
+                "createdAt": old["createdAt"] if old else now,
+                "updatedAt": now,
+                "size": len(data),
+                "md5": base64.b64encode(hashlib.md5(data).digest()).decode(),
+                "tags": list(tags or ()),
+                "data": bytes(data),
+                "contentEncoding": content_encoding,
+            }
+            project["updatedAt"] = now
+
+    def add_group(self, name, **fields):
+        """Add a group and return its id."""
+        with self._lock:
+            id_ = _node_id("Group")
+            self.groups[id_] = {
+                "id": id_,
+                "updatedAt": _now(),
+                "name": name,
+                "contactMethod": fields.get("contactMethod", "EMAIL"),
+                "contact": fields.get("contact", self.user["contact"]),
+                "description": fields.get("description", ""),
+            }
+            return id_
+
+    def get_file(self, project_id, name):
+        """Return the stored bytes of a file."""
+        return self.projects[project_id]["files"][name]["data"]
+
+    def fail(self, target="graphql", times=1, status=500):
+        """Make the next `times` requests to `target` fail with `status`.
+
+        Args:
+            target: "graphql" or "storage".
+            times: how many requests should fail.
+            status: the HTTP status code to answer with.
+        """
+        with self._lock:
+            self._failures.extend([(target, status)] * times)
+
+    def corrupt(self, times=1):
+        """Flip a byte in the bodies of the next `times` storage transfers.
+
+        A download is sent altered with the hash of the stored bytes, and an
+        upload is stored altered, as if it was damaged on the way.
+        """
+        with self._lock:
+            self._corruptions += times
+
+    def _corrupted(self, data):
+        with self._lock:
+            if not self._corruptions or not data:
+                return data
+            self._corruptions -= 1
+        return bytes([data[0] ^ 0xFF]) + data[1:]
+
+    def _injected_error(self, target):
+        with self._lock:
+            for i, (t, status) in enumerate(self._failures):
+                if t == target:
+                    del self._failures[i]
+                    return status
+            if self.error_rate and self._random.random() < self.error_rate:
+                return 500
+        return None
+
+    # rendering in the shape of the GraphQL schema
+
+    def _tag_edges(self, owner_id, names):
+        nodes = []
+        for name in names:
+            tag_id = self.tags.setdefault(name, _node_id("Tag", name))
+            nodes.append(
+                {
+                    "id": _node_id("TagRole", f"{owner_id}:{name}"),
+                    "tag": {"id": tag_id, "name": name},
+                }
+            )
+        return _edges(nodes)
+
+    def _user_roles(self, owner_id, role="ADMIN"):
+        return _edges(
+            [
+                {
+                    "id": _node_id("UserRole", f"{owner_id}:{self.user['id']}"),
+                    "role": role,
+                    "user": dict(self.user),
+                }
+            ]
+        )
+
+    def _render_file(self, f):
+        d = {k: v for k, v in f.items() if k not in ("data", "tags", "contentEncoding")}
+        d["tags"] = self._tag_edges(f["id"], f["tags"])
+        return d
+
+    def _render_group_public(self, g):
+        return {k: g[k] for k in ("id", "name", "contactMethod", "contact")}
+
+    def _render_group(self, g):
+        d = dict(g)
+        d["userRoles"] = self._user_roles(g["id"])
+        return d
+
+    def _render_project(self, p):
+        d = {k: v for k, v in p.items() if k not in ("files", "tags", "groupRoles")}
+        d["userRoles"] = self._user_roles(p["id"])
+        d["groupRoles"] = _edges(
+            [
+                {
+                    "id": _node_id("GroupRole", f"{p['id']}:{gid}"),
+                    "role": role,
+                    "group": self._render_group_public(self.groups[gid]),
+                }
+                for gid, role in p["groupRoles"]
+                if gid in self.groups
+            ]
+        )
+        d["effectiveUserRoles"] = self._user_roles(p["id"])
+        d["files"] = _edges([self._render_file(f) for f in p["files"].values()])
+        d["tags"] = self._tag_edges(p["id"], p["tags"])
+        return d
+
+    def _project_roles(self):
+        return _edges(
+            [
+                {
+                    "id": _node_id("ProjectRole", p["id"]),
+                    "role": "ADMIN",
+                    "project": self._render_project(p),
+                }
+                for p in self.projects.values()
+            ]
+        )
+
+    def _group_roles(self):
+        return _edges(
+            [
+                {
+                    "id": _node_id("GroupRole", g["id"]),
+                    "role": "ADMIN",
+                    "group": self._render_group(g),
+                }
+                for g in self.groups.values()
+            ]
+        )
+
+    # GraphQL operations
+
+    def execute(self, query, variables, extensions=None):
+        """Answer a GraphQL request body; return (status, payload).
+
+        Automatic persisted queries are supported as by Apollo Server: a
+        request may send only the SHA-256 of its query, and is told the
+        query was not found if the hash has not been sent with the query
+        before. With `persisted_queries` off, such requests are refused.
+        """
+        persisted = (extensions or {}).get("persistedQuery")
+        if persisted:
+            if not self.persisted_queries:
+                return 400, _error(
+                    "PersistedQueryNotSupported", "PERSISTED_QUERY_NOT_SUPPORTED"
+                )
+            digest = persisted.get("sha256Hash")
+            if query:
+                if hashlib.sha256(query.encode()).hexdigest() != digest:
+                    return 400, _error(
+                        "provided sha does not match query", "INTERNAL_SERVER_ERROR"
+                    )
+                self._persisted[digest] = query
+            elif digest in self._persisted:
+                query = self._persisted[digest]
+            else:
+                return 200, _error(
+                    "PersistedQueryNotFound", "PERSISTED_QUERY_NOT_FOUND"
+                )
+        name = OPERATIONS.get(query)
+        if not name and query and query.lstrip().startswith("query Nodes("):
+            name = "query_projects"
+        handler = getattr(self, f"_op_{name}", None) if name else None
+        if not handler:
+            return 400, {"errors": [{"message": "Unknown operation"}]}
+        with self._lock:
+            self.log.append(("graphql", name))
+            inpt = (variables or {}).get("input", {})
+            return 200, {"data": handler(variables or {}, inpt)}
+
+    def _op_query_everything(self, variables, inpt):
+        user = dict(self.user)
+        user["groupRoles"] = self._group_roles()
+        user["projectRoles"] = self._project_roles()
+        user["effectiveProjectRoles"] = self._project_roles()
+        user["personalTokens"] = _edges(self.tokens)
+        return {"user": user}
+
+    def _op_query_user(self, variables, inpt):
+        return {"user": dict(self.user)}
+
+    def _op_query_groupRoles(self, variables, inpt):
+        return {"user": {"id": self.user["id"], "groupRoles": self._group_roles()}}
+
+    def _op_query_projectRoles(self, variables, inpt):
+        roles = self._project_roles()
+        return {"user": {"id": self.user["id"], "projectRoles": roles}}
+
+    def _op_query_effectiveProjectRoles(self, variables, inpt):
+        roles = self._project_roles()
+        return {"user": {"id": self.user["id"], "effectiveProjectRoles": roles}}
+
+    def _op_query_personalTokens(self, variables, inpt):
+        tokens = _edges(self.tokens)
+        return {"user": {"id": self.user["id"], "personalTokens": tokens}}
+
+    def _op_query_userNames(self, variables, inpt):
+        return {"userNames": [self.user["username"]]}
+
+    def _op_query_groupNames(self, variables, inpt):
+        return {"groupNames": [g["name"] for g in self.groups.values()]}
+
+    def _op_query_openProjects(self, variables, inpt):
+        projects = [p for p in self.projects.values() if p["isOpen"]]
+        return {"openProjects": _edges([self._render_project(p) for p in projects])}
+
+    def _op_query_project(self, variables, inpt):
+        p = self.projects.get(variables.get("id"))
+        return {"node": self._render_project(p) if p else None}
+
+    def _op_query_projectUpdates(self, variables, inpt):
+        roles = _edges(
+            [
+                {
+                    "id": _node_id("ProjectRole", p["id"]),
+                    "role": "ADMIN",
+                    "project": {k: p[k] for k in ("id", "name", "updatedAt")},
+                }
+                for p in self.projects.values()
+            ]
+        )
+        return {"user": {"id": self.user["id"], "effectiveProjectRoles": roles}}
+
+    def _op_query_projects(self, variables, inpt):
+        # the batched query from bln.queries.query_projects: p<i> for $id<i>
+        data = {}
+        for key, id_ in variables.items():
+            p = self.projects.get(id_)
+            data[f"p{key[2:]}"] = self._render_project(p) if p else None
+        return data
+
+    def _op_query_group(self, variables, inpt):
+        g = self.groups.get(variables.get("id"))
+        return {"node": self._render_group(g) if g else None}
+
+    def _uri(self, inpt, method):
+        p = self.projects.get(inpt.get("projectId"))
+        if not p:
+            return None, "Project not found"
+        name = inpt.get("fileName")
+        if method == "GET" and name not in p["files"]:
+            return None, "File not found"
+        signature = hashlib.sha256(f"{next(self._counter)}".encode()).hexdigest()
+        date = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        expires = self.url_expires
+        self._signed[signature] = (p["id"], name, method, time.time() + expires)
+        uri = (
+            f"{self.base_url}/storage/{signature}/{name}"
+            f"?X-Goog-Algorithm=GOOG4-RSA-SHA256&X-Goog-Date={date}"
+            f"&X-Goog-Expires={expires}&X-Goog-Signature={signature}"
+        )
+        return {"name": name, "uri": uri, "uriType": method}, None
+
+    def _op_mutation_createFileDownloadUri(self, variables, inpt):
+        ok, err = self._uri(inpt, "GET")
+        return {"createFileDownloadUri": {"ok": ok, "err": err}}
+
+    def _op_mutation_createFileUploadUri(self, variables, inpt):
+        ok, err = self._uri(inpt, "PUT")
+        return {"createFileUploadUri": {"ok": ok, "err": err}}
+
+    def _op_mutation_createProject(self, variables, inpt):
+        fields = {k: v for k, v in inpt.items() if k not in ("name", "tags")}
+        id_ = self.add_project(inpt["name"], tags=inpt.get("tags"), **fields)
+        project = self._render_project(self.projects[id_])
+        return {"createProject": {"ok": project, "err": None}}
+
+    def _op_mutation_updateProject(self, variables, inpt):
+        p = self.projects.get(inpt.get("id"))
+        if not p:
+            return {"updateProject": {"ok": None, "err": "Project not found"}}
+        for k in ("name", "contactMethod", "contact", "description", "isOpen"):
+            if k in inpt:
+                p[k] = inpt[k]
+        if "tags" in inpt:
+            p["tags"] = list(inpt["tags"])
+        if "groupRoles" in inpt:
+            p["groupRoles"] = _group_roles(inpt["groupRoles"])
+        p["updatedAt"] = _now()
+        return {"updateProject": {"ok": self._render_project(p), "err": None}}
+
+    def _op_mutation_deleteProject(self, variables, inpt):
+        ok = self.projects.pop(inpt.get("id"), None) is not None
+        return {"deleteProject": {"ok": ok, "err": None if ok else "Not found"}}
+
+    def _op_mutation_deleteFile(self, variables, inpt):
+        p = self.projects.get(inpt.get("projectId"))
+        ok = bool(p) and p["files"].pop(inpt.get("fileName"), None) is not None
+        if ok:
+            p["updatedAt"] = _now()
+        return {"deleteFile": {"ok": ok, "err": None if ok else "File not found"}}
+
+    def _op_mutation_createGroup(self, variables, inpt):
+        fields = {k: v for k, v in inpt.items() if k != "name"}
+        g = self.groups[self.add_group(inpt["name"], **fields)]
+        return {"createGroup": {"ok": self._render_group(g), "err": None}}
+
+    def _op_mutation_updateGroup(self, variables, inpt):
+        g = self.groups.get(inpt.get("id"))
+        if not g:
+            return {"updateGroup": {"ok": None, "err": "Group not found"}}
+        for k in ("name", "contactMethod", "contact", "description"):
+            if k in inpt:
+                g[k] = inpt[k]
+        g["updatedAt"] = _now()
+        return {"updateGroup": {"ok": self._render_group(g), "err": None}}
+
+    def _op_mutation_createTag(self, variables, inpt):
+        self.tags.setdefault(inpt["name"], _node_id("Tag", inpt["name"]))
+        return {"createTag": {"ok": True, "err": None}}
+
+    def _op_mutation_createPersonalToken(self, variables, inpt):
+        token = {"id": _node_id("PersonalToken"), "token": uuid.uuid4().hex}
+        self.tokens.append(token)
+        return {"createPersonalToken": {"ok": token["token"], "err": None}}
+
+    def _op_mutation_revokePersonalToken(self, variables, inpt):
+        before = len(self.tokens)
+        self.tokens = [t for t in self.tokens if t["token"] != inpt.get("token")]
+        ok = len(self.tokens) < before
+        return {"revokePersonalToken": {"ok": ok, "err": None if ok else "Not found"}}
+
+    # storage
+
+    def _signed_target(self, path, method):
+        parts = path.split("/")
+        if len(parts) < 4 or parts[1] != "storage":
+            return None, 404
+        entry = self._signed.get(parts[2])
+        if not entry or entry[2] != method:
+            return None, 403
+        if time.time() > entry[3]:
+            return None, 403
+        return entry, None
+
+
+class _Server(ThreadingHTTPServer):
+    def handle_error(self, request, client_address):
+        # clients that give up on a response, e.g. when a transfer is
+        # cancelled, are expected
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # headers and body are written separately; without this, Nagle's
+    # algorithm holds the body back for a delayed ACK on kept-alive
+    # connections, adding ~40 ms to every response
+    disable_nagle_algorithm = True
+
+    @property
+    def fake(self):
+        return self.server.fake
+
+    def log_message(self, *args):
+        pass
+
+    def _throttle(self, nbytes):
+        if self.fake.bandwidth:
+            time.sleep(nbytes / self.fake.bandwidth)
+
+    def _read_body(self):
+        if self.headers.get("transfer-encoding", "").lower() == "chunked":
+            body = bytearray()
+            while True:
+                size = int(self.rfile.readline().split(b";")[0], 16)
+                if size == 0:
+                    self.rfile.readline()
+                    break
+                body += self.rfile.read(size)
+                self.rfile.readline()
+                self._throttle(size)
+            with self.fake._lock:
+                self.fake.received += len(body)
+            return bytes(body)
+        remaining = int(self.headers.get("content-length") or 0)
+        body = bytearray()
+        while remaining:
+            chunk = self.rfile.read(min(CHUNK, remaining))
+            if not chunk:
+                break
+            body += chunk
+            remaining -= len(chunk)
+            self._throttle(len(chunk))
+        with self.fake._lock:
+            self.fake.received += len(body)
+        return bytes(body)
+
+    def _send(self, status, body=b"", headers=None):
+        self.send_response(status)
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command == "HEAD":
+            return
+        view = memoryview(body)
+        for i in range(0, len(body), CHUNK):
+            self.wfile.write(view[i : i + CHUNK])
+            self._throttle(min(CHUNK, len(body) - i))
+
+    def _start(self, target):
+        if self.fake.latency:
+            time.sleep(self.fake.latency)
+        status = self.fake._injected_error(target)
+        if status:
+            self._read_body()
+            self._send(status, b"injected error")
+            return False
+        return True
+
+    def do_POST(self):
+        if urlparse(self.path).path != "/graphql":
+            return self._send(404)
+        if not self._start("graphql"):
+            return
+        request = json.loads(self._read_body() or b"{}")
+        status, payload = self.fake.execute(
+            request.get("query"), request.get("variables"), request.get("extensions")
+        )
+        body = json.dumps(payload).encode()
+        headers = {"Content-Type": "application/json"}
+        if self._accepts_gzip():
+            body = gzip.compress(body)
+            headers["Content-Encoding"] = "gzip"
+        self._send(status, body, headers)
+
+    def _accepts_gzip(self):
+        return "gzip" in self.headers.get("accept-encoding", "")
+
+    def do_PUT(self):
+        if not self._start("storage"):
+            return
+        entry, status = self.fake._signed_target(urlparse(self.path).path, "PUT")
+        data = self._read_body()
+        if not entry:
+            return self._send(status)
+        data = self.fake._corrupted(data)
+        project_id, name = entry[:2]
+        with self.fake._lock:
+            self.fake.log.append(("storage", "PUT"))
+            if project_id not in self.fake.projects:
+                return self._send(404)
+            self.fake.add_file(
+                project_id,
+                name,
+                data,
+                content_encoding=self.headers["content-encoding"],
+            )
+        digest = hashlib.md5(data)
+        self._send(200, headers=_hash_headers(digest) if self.fake.hash_headers else {})
+
+    def do_GET(self):
+        if not self._start("storage"):
+            return
+        entry, status = self.fake._signed_target(urlparse(self.path).path, "GET")
+        if not entry:
+            return self._send(status)
+        project_id, name = entry[:2]
+        with self.fake._lock:
+            self.fake.log.append(("storage", "GET"))
+            f = self.fake.projects.get(project_id, {}).get("files", {}).get(name)
+        if not f:
+            return self._send(404)
+        headers = {"Content-Type": "application/octet-stream"}
+        if self.fake.hash_headers:
+            headers.update(_hash_headers(hashlib.md5(f["data"])))
+        data = f["data"]
+        if f.get("contentEncoding") == "gzip":
+            headers["x-goog-stored-content-encoding"] = "gzip"
+            if self._accepts_gzip():
+                headers["Content-Encoding"] = "gzip"
+            else:
+                # decompressive transcoding
+                data = gzip.decompress(data)
+        elif "range" in self.headers:
+            # like Cloud Storage, ranges of gzip-encoded files are ignored
+            span = _byte_range(self.headers["range"], len(data))
+            if not span:
+                return self._send(
+                    416, headers={"Content-Range": f"bytes */{len(data)}"}
+                )
+            start, end = span
+            headers["Content-Range"] = f"bytes {start}-{end - 1}/{len(data)}"
+            return self._send(206, self.fake._corrupted(data[start:end]), headers)
+        self._send(200, self.fake._corrupted(data), headers)
+
+    do_HEAD = do_GET
+
+
+def _group_roles(roles):
+    """Return GroupRoleInput objects as (group id, role) pairs."""
+    return [(r["groupId"], r["role"]) for r in roles or ()]
+
+
+def _byte_range(header, size):
+    """Return the [start, end) of a single `bytes=` Range, or None."""
+    first, _, last = header.removeprefix("bytes=").partition("-")
+    if not first:
+        start, end = max(size - int(last), 0), size
+    else:
+        start = int(first)
+        end = min(int(last) + 1, size) if last else size
+    if start >= end:
+        return None
+    return start, end
+
+
+def _hash_headers(digest):
+    md5 = base64.b64encode(digest.digest()).decode()
+    return {"ETag": f'"{digest.hexdigest()}"', "x-goog-hash": f"md5={md5}"}
@@ -0,0 +1,76 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+from bln.catalog import Catalog
+
+
+def test_catalog_search(server, client, tmp_path):
+    """Test refreshing the catalog and searching it offline."""
+    big = b"x" * 2000
+    pid = server.add_project("WARN Act Notices", tags=["warn"])
+    server.add_file(pid, "ia.csv", big, tags=["warn"])
+    server.add_file(pid, "ia.json", b"{}", tags=["warn"])
+    server.add_file(server.add_project("Other"), "big.csv", big)
+
+    catalog = Catalog(tmp_path / "catalog.sqlite")
+    catalog.refresh(client)
+    requests_made = len(server.log)
+
+    files = catalog.search_files(tags=["warn"], min_size=1000)
+    assert [(f["name"], f["projectName"]) for f in files] == [
+        ("ia.csv", "WARN Act Notices")
+    ]
+    assert files[0]["tags"] == ["warn"]
+    assert len(catalog.search_files(name="*.csv")) == 2
+    week_ago = datetime.now(timezone.utc) - timedelta(days=7)
+    assert len(catalog.search_files(updated_after=week_ago)) == 3
+    assert catalog.search_files(updated_before=week_ago) == []
+    projects = catalog.search_projects(name="WARN*", role="ADMIN")
+    assert [p["tags"] for p in projects] == [["warn"]]
+    assert len(server.log) == requests_made
+
+    catalog.close()
+    assert len(Catalog(tmp_path / "catalog.sqlite").search_projects()) == 2
+
+
+def test_catalog_incremental_refresh(server, client):
+    """Test that a refresh only fetches projects that changed."""
+    ids = [server.add_project(f"Project {i}") for i in range(30)]
+    catalog = Catalog()
+    catalog.refresh(client)
+    assert len(catalog.search_projects()) == 30
+
+    server.log.clear()
+    server.add_file(ids[0], "new.csv", b"new")
+    del server.projects[ids[1]]
+    changes = client.changed_projects(
+        {i: server.projects[i]["updatedAt"] for i in ids[2:]}
+    )
+    assert [r["project"]["id"] for r in changes["changed"]] == [ids[0]]
+    assert changes["removed"] == []
+
+    server.log.clear()
+    catalog.refresh(client)
+    assert server.log == [
+        ("graphql", "query_projectUpdates"),
+        ("graphql", "query_projects"),
+    ]
+    assert len(catalog.search_projects()) == 29
+    assert [f["name"] for f in catalog.search_files()] == ["new.csv"]
+
+
+def test_catalog_naive_dates_are_local(server, client, monkeypatch):
+    """Test that naive datetimes are searched as local time, not UTC."""
+    monkeypatch.setenv("TZ", "UTC-12")
+    time.tzset()
+    pid = server.add_project("Project")
+    server.add_file(pid, "new.csv", b"new")
+    catalog = Catalog()
+    catalog.refresh(client)
+    try:
+        hour_ago = datetime.now() - timedelta(hours=1)
+        assert len(catalog.search_files(updated_after=hour_ago)) == 1
+        assert catalog.search_files(updated_before=hour_ago) == []
+    finally:
+        monkeypatch.undo()
+        time.tzset()
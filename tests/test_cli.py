@@ -0,0 +1,35 @@
+import json
+
+from bln import cli
+
+
+def test_transfer_commands(server, client, tmp_path, capsys):
+    """Test the upload, ls, download and rm commands."""
+    pid = server.add_project("CLI")
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"f{i}.csv"
+        path.write_bytes(b"x" * 1000 * (i + 1))
+        paths.append(str(path))
+
+    args = cli.parse_args(["bln", "upload", pid, *paths, "-j", "2", "-q"])
+    cli.upload(client, pid, args)
+    summary = json.loads(capsys.readouterr().out)
+    assert summary["files"] == 3
+    assert summary["bytes"] == 6000
+
+    cli.ls(client, pid, cli.parse_args(["bln", "ls", pid, "--json"]))
+    listed = json.loads(capsys.readouterr().out)
+    assert sorted(f["name"] for f in listed) == ["f0.csv", "f1.csv", "f2.csv"]
+
+    out = tmp_path / "out"
+    out.mkdir()
+    args = cli.parse_args(["bln", "download", pid, "-o", str(out), "-q"])
+    cli.download(client, pid, args)
+    summary = json.loads(capsys.readouterr().out)
+    assert summary["bytes"] == 6000
+    assert (out / "f2.csv").read_bytes() == b"x" * 3000
+
+    cli.rm(client, pid, cli.parse_args(["bln", "rm", pid, "f0.csv", "f1.csv"]))
+    capsys.readouterr()
+    assert list(server.projects[pid]["files"]) == ["f2.csv"]
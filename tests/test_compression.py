@@ -0,0 +1,42 @@
+import pytest
+
+
+def test_compressed_upload_and_download(server, client, tmp_path):
+    """Test that text files go up gzipped and come back as they were."""
+    pid = server.add_project("Project")
+    csv = tmp_path / "a.csv"
+    csv.write_text("id,name\n" + "".join(f"{i},row {i}\n" for i in range(20000)))
+    binary = tmp_path / "b.bin"
+    binary.write_bytes(b"\0" * 1000)
+    reports = []
+
+    before = server.received
+    client.upload_files(
+        pid, [csv, binary], progress=lambda *a: reports.append(a), compress=True
+    )
+    assert server.received - before < csv.stat().st_size / 3
+    assert server.get_file(pid, "a.csv")[:2] == b"\x1f\x8b"
+    assert server.get_file(pid, "b.bin") == binary.read_bytes()
+    done, total, _rate = reports[-1]
+    assert done == total < csv.stat().st_size
+
+    out = tmp_path / "out"
+    out.mkdir()
+    reports.clear()
+    client.download_files(pid, output_dir=out, progress=lambda *a: reports.append(a))
+    assert (out / "a.csv").read_bytes() == csv.read_bytes()
+    done, total, _rate = reports[-1]
+    assert done == total
+
+
+def test_read_bln_compressed(server, client, tmp_path):
+    """Test that read_bln decompresses files stored gzipped."""
+    pytest.importorskip("pandas")
+    from bln.pandas import read_bln
+
+    pid = server.add_project("Project")
+    csv = tmp_path / "a.csv"
+    csv.write_text("a,b\n1,2\n3,4\n")
+    client.upload_file(pid, csv, compress=True)
+    df = read_bln.read_bln(pid, "a.csv", client=client)
+    assert df.to_dict("list") == {"a": [1, 3], "b": [2, 4]}
@@ -0,0 +1,134 @@
+import json
+import threading
+import time
+
+import pytest
+
+from bln import Client
+from bln.exceptions import APIException, Cancelled
+
+
+def test_upload_from_json(server, client, tmp_path, no_wait):
+    """Test applying a config of groups and projects in parallel."""
+    existing = server.add_group("Old name")
+    pid = server.add_project("Existing")
+    data = tmp_path / "a.csv"
+    data.write_text("a,b\n1,2\n")
+    config = tmp_path / "config.json"
+    config.write_text(
+        json.dumps(
+            {
+                "groups": [
+                    {"name": "Newsroom"},
+                    {"id": existing, "name": "Renamed"},
+                    {"id": "R3JvdXA6bm9uZQ==", "name": "Missing"},
+                ],
+                "projects": [
+                    {
+                        "name": "Shared",
+                        "groupRoles": [{"groupId": "Newsroom", "role": "EDITOR"}],
+                    },
+                    {"name": "Standalone", "files": [str(data)]},
+                    {"id": pid, "description": "updated"},
+                    {
+                        "name": "Orphan",
+                        "groupRoles": [{"groupId": "Missing", "role": "VIEWER"}],
+                    },
+                ],
+            }
+        )
+    )
+    report = client.upload_from_json(config, jobs=4)
+    assert [(r["type"], r["name"], r["action"]) for r in report] == [
+        ("group", "Newsroom", "create"),
+        ("group", "Renamed", "update"),
+        ("group", "Missing", "update"),
+        ("project", "Shared", "create"),
+        ("project", "Standalone", "create"),
+        ("project", pid, "update"),
+        ("project", "Orphan", "create"),
+    ]
+    assert [r["error"] is None for r in report] == [1, 1, 0, 1, 1, 1, 0]
+    assert "Missing" in report[-1]["error"]
+    assert all(r["seconds"] >= 0 for r in report)
+
+    # groups with an id are updated, the rest created
+    assert server.groups[existing]["name"] == "Renamed"
+    newsroom = report[0]["result"]["id"]
+    shared = report[3]["result"]
+    assert server.projects[shared["id"]]["groupRoles"] == [(newsroom, "EDITOR")]
+    standalone = report[4]["result"]
+    assert [f["name"] for f in standalone["files"]] == ["a.csv"]
+    assert server.projects[pid]["description"] == "updated"
+    assert not [p for p in server.projects.values() if p["name"] == "Orphan"]
+
+
+def test_dependents_start_when_their_groups_are_done(
+    server, client, tmp_path, monkeypatch
+):
+    """Test that a project waiting on a slow group doesn't hold back others."""
+    finished = {}
+    create_group, create_project = client.createGroup, client.createProject
+
+    def slow_group(name, **kwargs):
+        if name == "Slow":
+            time.sleep(0.5)
+        result = create_group(name, **kwargs)
+        finished[name] = time.monotonic()
+        return result
+
+    def project(name, **kwargs):
+        result = create_project(name, **kwargs)
+        finished[name] = time.monotonic()
+        return result
+
+    monkeypatch.setattr(client, "createGroup", slow_group)
+    monkeypatch.setattr(client, "createProject", project)
+    config = tmp_path / "config.json"
+    config.write_text(
+        json.dumps(
+            {
+                "groups": [{"name": "Slow"}, {"name": "Fast"}],
+                "projects": [
+                    {
+                        "name": "A",
+                        "groupRoles": [{"groupId": "Slow", "role": "EDITOR"}],
+                    },
+                    {
+                        "name": "B",
+                        "groupRoles": [{"groupId": "Fast", "role": "EDITOR"}],
+                    },
+                ],
+            }
+        )
+    )
+    report = client.upload_from_json(config, jobs=4)
+    assert [r["error"] for r in report] == [None] * 4
+    assert finished["B"] < finished["Slow"] < finished["A"]
+
+
+def test_upload_from_json_cancel(server, client, tmp_path):
+    """Test that cancelling stops the config instead of reporting each entry."""
+    config = tmp_path / "config.json"
+    config.write_text(
+        json.dumps(
+            {
+                "groups": [{"name": "Newsroom"}],
+                "projects": [
+                    {"name": "A"},
+                    {"name": "B", "groupRoles": [{"groupId": "Newsroom"}]},
+                ],
+            }
+        )
+    )
+    stop = threading.Event()
+    stop.set()
+    with pytest.raises(Cancelled):
+        client.upload_from_json(config, cancel=stop)
+    assert not server.projects
+
+
+def test_upload_from_json_missing(tmp_path):
+    """Test that a missing config raises before anything is sent."""
+    with pytest.raises(APIException, match="invalid json_path"):
+        Client("token").upload_from_json(tmp_path / "nope.json")
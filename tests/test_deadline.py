@@ -0,0 +1,99 @@
+import os
+import threading
+import time
+
+import pytest
+import requests
+
+from bln.deadline import Deadline, current
+from bln.exceptions import Cancelled, DeadlineExceeded
+
+from .fake_server import FakeBLN
+
+
+def test_deadline():
+    """Test nesting deadlines and cutting timeouts to the time left."""
+    assert current().remaining() is None
+    with Deadline(10, timeout=(5, 60)) as outer:
+        assert current() is outer
+        connect, read = outer.request_timeout(None)
+        assert connect == 5 and 9 < read <= 10
+        with Deadline(100) as inner:
+            # the earlier deadline and the outer timeout still hold
+            assert inner.remaining() <= 10
+            assert inner.timeout == (5, 60)
+        with pytest.raises(DeadlineExceeded):
+            outer.sleep(11)
+    assert current().remaining() is None
+    assert Deadline(0.1, timeout=1).request_timeout(30) <= 0.1
+
+
+def test_cancel_wakes_sleep():
+    """Test that cancelling ends a wait at once."""
+    stop = threading.Event()
+    threading.Timer(0.1, stop.set).start()
+    start = time.monotonic()
+    with pytest.raises(Cancelled):
+        Deadline(cancel=stop).sleep(30)
+    assert time.monotonic() - start < 1
+
+
+def test_request_timeout():
+    """Test that a stalled server times out instead of hanging."""
+    with FakeBLN(latency=1) as server:
+        client = server.client(timeout=0.2)
+        with pytest.raises(requests.exceptions.Timeout):
+            client.user()
+        # and per call
+        client = server.client(timeout=None)
+        with pytest.raises(requests.exceptions.Timeout):
+            with client.deadline(timeout=0.2):
+                client.user()
+
+
+@pytest.mark.parametrize("http2", [False, True])
+def test_request_cut_by_deadline(http2, tmp_path):
+    """Test that a request the deadline cut short raises DeadlineExceeded."""
+    if http2:
+        pytest.importorskip("httpx")
+    with FakeBLN() as server:
+        pid = server.add_project("Project", files={"a.bin": b"x" * 1000})
+        client = server.client(http2=http2, timeout=None)
+        client.download_uri(pid, "a.bin")
+        server.latency = 1
+        with pytest.raises(DeadlineExceeded):
+            with client.deadline(0.3):
+                client.user()
+        start = time.monotonic()
+        with pytest.raises(DeadlineExceeded):
+            client.download_file(pid, "a.bin", tmp_path, deadline=0.3)
+        assert time.monotonic() - start < 1
+
+
+def test_deadline_bounds_retries(server, client):
+    """Test that retries are not waited for past the deadline."""
+    server.fail("graphql", times=4)
+    start = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        with client.deadline(5):
+            client.user()
+    assert time.monotonic() - start < 1
+
+
+def test_cancel_transfers(tmp_path):
+    """Test that cancelling stops downloads and uploads between chunks."""
+    with FakeBLN(bandwidth=2e6) as server:
+        client = server.client()
+        data = os.urandom(4_000_000)
+        pid = server.add_project("Project", files={"a.bin": data, "b.bin": data})
+        stop = threading.Event()
+        threading.Timer(0.3, stop.set).start()
+        start = time.monotonic()
+        with pytest.raises(Cancelled):
+            client.download_files(pid, output_dir=tmp_path, jobs=2, cancel=stop)
+        assert time.monotonic() - start < 1.5
+
+        start = time.monotonic()
+        with pytest.raises(DeadlineExceeded):
+            client.upload_file(pid, ("c.bin", data), deadline=0.3)
+        assert time.monotonic() - start < 1.5
@@ -0,0 +1,34 @@
+from bln import queries as q
+from bln.client import _gql
+
+
+def test_search_projects(server, client):
+    """Test project searches against the fake API."""
+    server.add_project("WARN Act Notices", files={"ia.csv": b"a,b\n1,2\n"})
+    server.add_project("Other")
+    projects = client.search_projects(lambda p: p["name"] == "WARN Act Notices")
+    assert len(projects) == 1
+    assert projects[0]["files"][0]["name"] == "ia.csv"
+    assert len(client.search_files(lambda f: f["name"].endswith(".csv"))) == 1
+
+
+def test_file_round_trip(server, client, tmp_path):
+    """Test uploading and downloading a file through the fake storage host."""
+    project = client.createProject("Round trip")
+    path = tmp_path / "up.csv"
+    path.write_bytes(b"x" * 100_000)
+    client.upload_file(project["id"], path)
+    assert server.get_file(project["id"], "up.csv") == path.read_bytes()
+    out = tmp_path / "out"
+    out.mkdir()
+    client.download_file(project["id"], "up.csv", output_dir=out)
+    assert (out / "up.csv").read_bytes() == path.read_bytes()
+
+
+def test_error_injection(server, client):
+    """Test that injected errors are returned by the fake API."""
+    server.fail("graphql", status=503)
+    _data, err = _gql(client.endpoint, client.token, q.query_user)
+    assert err == "Service Unavailable"
+    data, err = _gql(client.endpoint, client.token, q.query_user)
+    assert data["username"] == "tester"
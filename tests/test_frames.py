@@ -0,0 +1,26 @@
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+
+def test_files_and_projects_frames(server):
+    """Test the flat DataFrames of files and projects."""
+    pid = server.add_project("WARN Act Notices", tags=["warn"])
+    server.add_file(pid, "ia.csv", b"x" * 2000, tags=["warn"])
+    server.add_file(pid, "ia.json", b"{}")
+    server.add_project("Empty")
+
+    for client in (server.client(), server.client(models=True)):
+        files = client.files_frame()
+        assert list(files["name"]) == ["ia.csv", "ia.json"]
+        assert str(files["size"].dtype) == "Int64"
+        assert isinstance(files["updatedAt"].dtype, pd.DatetimeTZDtype)
+        assert files.groupby("projectName", observed=True)["size"].sum().to_dict() == {
+            "WARN Act Notices": 2002
+        }
+        assert files.loc[files["size"] > 1000, "tags"].tolist() == [["warn"]]
+
+        projects = client.projects_frame().set_index("name")
+        assert projects.loc["WARN Act Notices", ["files", "size"]].tolist() == [2, 2002]
+        assert projects.loc["Empty", "files"] == 0
+        assert set(projects["role"]) == {"ADMIN"}
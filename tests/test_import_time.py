@@ -0,0 +1,34 @@
+import subprocess
+import sys
+
+HEAVY = ("requests", "retry", "multiprocessing", "pandas")
+
+
+def _run(code):
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def test_lazy_imports():
+    """Test that loading the package doesn't import heavy dependencies."""
+    code = (
+        "import sys, bln, bln.cli, bln.pandas.read_bln, bln.pandas.write_bln\n"
+        "bln.Client('token')\n"
+        f"print([m for m in {HEAVY!r} if m in sys.modules])"
+    )
+    assert _run(code).stdout.strip() == "[]"
+
+
+def test_cli_import_time():
+    """Test that the `bln` command module imports in well under 100 ms."""
+    for line in _run("import bln.cli").stderr.splitlines():
+        # lines look like "import time: <self us> | <cumulative us> | <module>"
+        _self, cumulative, name = (x.strip() for x in line.split("|"))
+        if name == "bln.cli":
+            assert int(cumulative) < 50_000
+            return
+    raise AssertionError("bln.cli was not imported")
@@ -0,0 +1,63 @@
+import hashlib
+
+import pytest
+
+from bln.exceptions import APIException
+
+
+def test_upload_returns_md5(server, client, tmp_path, no_wait):
+    """Test that uploads hash what they send and check what was stored."""
+    pid = server.add_project("Project")
+    path = tmp_path / "a.bin"
+    path.write_bytes(b"abc" * 1000)
+    assert client.upload_file(pid, path) == hashlib.md5(b"abc" * 1000).hexdigest()
+
+    # a damaged upload is stored with another md5, and sent again
+    server.corrupt()
+    server.log.clear()
+    client.upload_file(pid, path, progress=lambda *a: None)
+    assert server.log.count(("storage", "PUT")) == 2
+    assert server.get_file(pid, "a.bin") == b"abc" * 1000
+
+
+def test_download_checks_md5(server, client, tmp_path, no_wait):
+    """Test that downloads are hashed as they arrive and checked."""
+    data = b"xyz" * 1000
+    pid = server.add_project("Project", files={"a.bin": data, "b.bin": b"b"})
+    path, md5 = client.download_file(pid, "a.bin", tmp_path, return_md5=True)
+    assert md5 == hashlib.md5(data).hexdigest()
+
+    server.corrupt()
+    server.log.clear()
+    path = client.download_file(pid, "a.bin", tmp_path)
+    assert server.log.count(("storage", "GET")) == 2
+    with open(path, "rb") as f:
+        assert f.read() == data
+
+    server.corrupt(4)
+    with pytest.raises(APIException, match="md5"):
+        client.download_file(pid, "a.bin", tmp_path)
+
+    results = client.download_files(pid, output_dir=tmp_path, return_md5=True)
+    assert sorted(md5 for _, md5 in results) == sorted(
+        hashlib.md5(d).hexdigest() for d in (data, b"b")
+    )
+
+
+def test_download_checks_api_md5(server, client, tmp_path, no_wait):
+    """Test that the API's md5 is checked when storage sends none."""
+    data = b"xyz" * 1000
+    pid = server.add_project("Project", files={"a.bin": data})
+    server.hash_headers = False
+    server.corrupt()
+    server.log.clear()
+    path, md5 = client.download_file(pid, "a.bin", tmp_path, return_md5=True)
+    assert server.log.count(("storage", "GET")) == 2
+    assert md5 == hashlib.md5(data).hexdigest()
+    with open(path, "rb") as f:
+        assert f.read() == data
+
+    server.corrupt()
+    (path,) = client.download_files(pid, output_dir=tmp_path)
+    with open(path, "rb") as f:
+        assert f.read() == data
@@ -0,0 +1,64 @@
+import json
+import os
+
+from bln import cli
+from bln.manifest import Manifest
+
+
+def test_manifest_changed(tmp_path):
+    """Test that only new or modified files are reported as changed."""
+    a, b = tmp_path / "a.csv", tmp_path / "b.csv"
+    a.write_text("a")
+    b.write_text("b")
+    manifest = Manifest(str(tmp_path / "bln.json"))
+    manifest.set_project("project")
+    assert manifest.changed([a, b]) == [a, b]
+    manifest.record(a)
+    manifest.record(b)
+    manifest.save()
+
+    manifest = Manifest(str(tmp_path / "bln.json"))
+    assert manifest.changed([a, b]) == []
+    os.utime(a, (0, 0))  # touched, not modified
+    b.write_text("bb")
+    assert manifest.changed([a, b]) == [b]
+    manifest.set_project("other")
+    assert manifest.files == {}
+
+
+def test_manifest_missing(tmp_path):
+    """Test that deleted files are skipped and forgotten, not an error."""
+    a, b = tmp_path / "a.csv", tmp_path / "b.csv"
+    a.write_text("a")
+    b.write_text("b")
+    manifest = Manifest(str(tmp_path / "bln.json"))
+    manifest.set_project("project")
+    manifest.record(a)
+    manifest.record(b)
+
+    a.unlink()
+    assert manifest.changed([a, b]) == []
+    assert list(manifest.files) == ["b.csv"]
+    a.write_text("a")
+    assert manifest.changed([a, b]) == [a]
+
+
+def test_git_upload_changed(server, client, tmp_path, capsys):
+    """Test that `git-bln upload --changed` skips files already pushed."""
+    pid = server.add_project("Repo")
+    paths = []
+    for name in ("a.csv", "b.csv"):
+        (tmp_path / name).write_text(name)
+        paths.append(str(tmp_path / name))
+    manifest = Manifest(str(tmp_path / "bln.json"))
+    manifest.set_project(pid)
+    argv = ["git-bln", "upload", *paths, "--changed", "-q"]
+
+    cli.git_upload(client, manifest, cli.parse_args(argv))
+    assert json.loads(capsys.readouterr().out)["files"] == 2
+
+    (tmp_path / "b.csv").write_text("changed")
+    cli.git_upload(client, Manifest(manifest.path), cli.parse_args(argv))
+    summary = json.loads(capsys.readouterr().out)
+    assert (summary["files"], summary["skipped"]) == (1, 1)
+    assert server.get_file(pid, "b.csv") == b"changed"
@@ -0,0 +1,52 @@
+import pytest
+
+from bln.catalog import Catalog
+from bln.models import File, Project, ProjectRole
+
+
+def test_models_match_dicts(server):
+    """Test that typed results hold the same data as the default dicts."""
+    pid = server.add_project("WARN Act Notices", tags=["warn"])
+    server.add_file(pid, "ia.csv", b"a,b\n", tags=["warn"])
+    plain, typed = server.client(), server.client(models=True)
+
+    project = typed.get_project_by_id(pid)
+    assert isinstance(project, Project)
+    assert not hasattr(project, "__dict__")
+    expected = plain.get_project_by_id(pid)
+    for f in expected["files"]:
+        f.update(projectId=pid, projectName=expected["name"])
+    assert project.to_dict() == expected
+    assert project["files"][0].name == "ia.csv"
+    assert project.get("tags") == ["warn"]
+
+    roles = typed.effectiveProjectRoles()
+    assert isinstance(roles[0], ProjectRole)
+    assert roles[0]["project"]["name"] == "WARN Act Notices"
+    files = typed.search_files(lambda f: f["name"].endswith(".csv"))
+    assert isinstance(files[0], File)
+    assert (files[0].projectId, files[0]["projectName"]) == (pid, project.name)
+
+    catalog = Catalog()
+    catalog.refresh(typed)
+    assert [f["name"] for f in catalog.search_files(tags=["warn"])] == ["ia.csv"]
+
+
+def test_models_with_store(server):
+    """Test that the entity store shares typed results too."""
+    pid = server.add_project("Project", files={"a.csv": b"a"})
+    client = server.client(models=True, store=True)
+    first = client.get_project_by_id(pid)
+    assert client.effectiveProjectRoles()[0].project is first
+    assert client.store.get(pid) is first
+
+
+def test_models_only_index_fields():
+    """Test that methods and other attributes are not items."""
+    project = Project(name="WARN Act Notices")
+    assert project["name"] == "WARN Act Notices"
+    for key in ("keys", "to_dict", "__class__", "missing"):
+        with pytest.raises(KeyError):
+            project[key]
+        assert key not in project
+        assert project.get(key) is None
@@ -0,0 +1,136 @@
+import asyncio
+import gc
+import gzip
+import hashlib
+import threading
+import time
+import warnings
+
+import pytest
+
+from bln import aio
+from bln.exceptions import APIException, DeadlineExceeded
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("httpx")
+
+
+@pytest.fixture
+def bln_pd():
+    """Return pandas with the Big Local News extensions registered."""
+    import bln
+
+    bln.pandas.register(pd)
+    return pd
+
+
+def test_read_many_frames(server, client, bln_pd, monkeypatch):
+    """Test that frames load concurrently, with no more parses than the limit."""
+    monkeypatch.setattr(aio, "MAX_TRANSFERS", 2)
+    files = {f"{i}.csv": f"a,b\n{i},{i * 2}\n".encode() for i in range(6)}
+    pid = server.add_project("Project", files=files)
+    server.add_file(
+        pid, "gz.csv", gzip.compress(b"a,b\n7,8\n"), content_encoding="gzip"
+    )
+
+    parsing, peak = 0, 0
+    lock = threading.Lock()
+    read_csv = pd.read_csv
+
+    def counted(*args, **kwargs):
+        nonlocal parsing, peak
+        with lock:
+            parsing += 1
+            peak = max(peak, parsing)
+        time.sleep(0.05)
+        with lock:
+            parsing -= 1
+        return read_csv(*args, **kwargs)
+
+    monkeypatch.setattr(pd, "read_csv", counted)
+
+    async def main():
+        frames = await asyncio.gather(
+            *(bln_pd.read_bln_async(pid, f"{i}.csv", client=client) for i in range(6)),
+            bln_pd.read_bln_async(pid, "gz.csv", client=client),
+        )
+        with pytest.raises(APIException, match="not found"):
+            await bln_pd.read_bln_async(pid, "missing.csv", client=client)
+        return frames
+
+    frames = asyncio.run(main())
+    assert [f.to_dict("list") for f in frames] == [
+        *({"a": [i], "b": [i * 2]} for i in range(6)),
+        {"a": [7], "b": [8]},
+    ]
+    assert peak == 2
+
+
+def test_write_frame(server, client, bln_pd, no_wait):
+    """Test that frames are uploaded from the event loop, and retried."""
+    pid = server.add_project("Project")
+    df = pd.DataFrame({"a": [1, 2], "b": ["x", "y"]})
+
+    async def main():
+        md5 = await df.to_bln_async(pid, "a.csv", client=client, index=False)
+        server.corrupt()
+        server.log.clear()
+        await df.to_bln_async(pid, "b.json", client=client)
+        return md5
+
+    md5 = asyncio.run(main())
+    assert server.get_file(pid, "a.csv") == b"a,b\n1,x\n2,y\n"
+    assert md5 == hashlib.md5(b"a,b\n1,x\n2,y\n").hexdigest()
+    assert server.log.count(("storage", "PUT")) == 2
+    assert server.get_file(pid, "b.json") == df.to_json().encode()
+
+
+def test_deadline(server, client, bln_pd):
+    """Test that async reads stop at the deadline in effect."""
+    pid = server.add_project("Project", files={"a.csv": b"a\n1\n"})
+    server.latency = 1
+
+    async def main():
+        with client.deadline(0.2):
+            with pytest.raises(DeadlineExceeded):
+                await bln_pd.read_bln_async(pid, "a.csv", client=client)
+            with pytest.raises(DeadlineExceeded):
+                await bln_pd.read_bln_async(pid, "a.csv", client=client)
+
+    start = time.monotonic()
+    asyncio.run(main())
+    assert time.monotonic() - start < 1
+
+
+def test_no_connections_left(server, client, bln_pd, monkeypatch):
+    """Test that connections close with the transfers of each event loop."""
+    from bln import transport
+
+    pid = server.add_project("Project", files={"a.csv": b"a\n1\n"})
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        for _ in range(5):
+            asyncio.run(bln_pd.read_bln_async(pid, "a.csv", client=client))
+        assert not aio._states
+        gc.collect()
+    assert not [w for w in caught if issubclass(w.category, ResourceWarning)]
+
+    # connect keeps one session open across awaited reads
+    opened = []
+
+    class Session(transport.AsyncSession):
+        def __init__(self, *args):
+            super().__init__(*args)
+            opened.append(self)
+
+    monkeypatch.setattr(transport, "AsyncSession", Session)
+
+    async def main():
+        async with aio.connect(client):
+            for _ in range(3):
+                await bln_pd.read_bln_async(pid, "a.csv", client=client)
+            assert aio._states
+
+    asyncio.run(main())
+    assert len(opened) == 1
+    assert not aio._states
@@ -0,0 +1,48 @@
+import threading
+
+import pytest
+
+from bln import Client
+
+pd = pytest.importorskip("pandas")
+
+
+def test_read_and_write_with_client(server, client):
+    """Test that the pandas helpers use the client they are given."""
+    import bln
+
+    bln.pandas.register(pd)
+    pid = server.add_project("Project", files={"a.csv": b"a,b\n1,2\n3,4\n"})
+    df = pd.read_bln(pid, "a.csv", client=client)
+    assert df.to_dict("list") == {"a": [1, 3], "b": [2, 4]}
+
+    df.to_bln(pid, "b.csv", client=client, index=False)
+    assert server.get_file(pid, "b.csv") == b"a,b\n1,2\n3,4\n"
+
+    # a second read of the same file reuses the cached download uri
+    server.log.clear()
+    pd.read_bln(pid, "a.csv", client=client)
+    assert ("graphql", "mutation_createFileDownloadUri") not in server.log
+
+
+def test_shared_client(monkeypatch):
+    """Test that one client is kept per token and tier."""
+    monkeypatch.setattr("bln.client._shared", {})
+    clients = []
+    threads = [
+        threading.Thread(target=lambda: clients.append(Client.shared("token")))
+        for _ in range(8)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len({id(c) for c in clients}) == 1
+    assert Client.shared("token", tier="dev") is not clients[0]
+    assert Client.shared("other") is not clients[0]
+
+    monkeypatch.setenv("BLN_API_TOKEN", "token")
+    assert Client.shared() is clients[0]
+    monkeypatch.delenv("BLN_API_TOKEN")
+    with pytest.raises(ValueError):
+        Client.shared()
@@ -0,0 +1,44 @@
+import pytest
+
+from bln import queries as q
+from bln.client import _no_persisted_queries
+from bln.exceptions import APIException
+
+
+def test_persisted_queries(server):
+    """Test that queries are sent as hashes once the server knows them."""
+    server.add_project("Project", files={"a.csv": b"a"})
+    client = server.client(persisted_queries=True)
+    expected = server.client().everything()
+    sizes = []
+    for _ in range(2):
+        before = server.received
+        assert client.everything() == expected
+        sizes.append(server.received - before)
+    # the hash, text and hash again, then only the hash
+    assert sizes[1] * 10 < len(q.query_everything) < sizes[0]
+
+
+def test_persisted_queries_unsupported(server):
+    """Test falling back to query text for a server without the extension."""
+    server.persisted_queries = False
+    client = server.client(persisted_queries=True)
+    assert client.user()["username"] == "tester"
+    assert server.endpoint in _no_persisted_queries
+    before = server.received
+    client.user()
+    assert server.received - before > len(q.query_user)
+
+
+def test_persisted_queries_kept_after_other_errors(server, no_wait):
+    """Test that errors unrelated to the extension don't turn it off."""
+    client = server.client(persisted_queries=True)
+    for status in (401, 429):
+        server.fail("graphql", times=4, status=status)
+        with pytest.raises(APIException):
+            client.user()
+    assert server.endpoint not in _no_persisted_queries
+    client.everything()
+    before = server.received
+    client.everything()
+    assert (server.received - before) * 10 < len(q.query_everything)
@@ -0,0 +1,26 @@
+import io
+
+from bln.progress import Progress, ProgressReader
+
+
+def test_progress():
+    """Test that progress reports are aggregated and throttled."""
+    calls = []
+    p = Progress(lambda *a: calls.append(a), total=30, interval=60)
+    p.update(10)
+    p.update(20)
+    assert calls == []
+    p.close()
+    assert calls[-1][:2] == (30, 30)
+
+
+def test_progress_reader():
+    """Test that reads through a ProgressReader are counted."""
+    calls = []
+    p = Progress(lambda *a: calls.append(a), total=5, interval=0)
+    r = ProgressReader(io.BytesIO(b"hello"), 5, p)
+    assert len(r) == 5
+    while r.read(2):
+        pass
+    assert r.count == 5
+    assert calls[-1][0] == 5
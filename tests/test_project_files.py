@@ -0,0 +1,65 @@
+import time
+
+import pytest
+
+from bln.exceptions import APIException
+
+
+def _ops(server):
+    return [name for target, name in server.log if target == "graphql"]
+
+
+def test_create_project(server, client, tmp_path):
+    """Test that projects are only fetched again when files were uploaded."""
+    path = tmp_path / "a.csv"
+    path.write_text("a,b\n1,2\n")
+
+    server.log.clear()
+    project = client.createProject("Empty")
+    assert project["name"] == "Empty"
+    assert _ops(server) == ["mutation_createProject"]
+
+    server.log.clear()
+    project = client.createProject("Full", files=[path])
+    assert [f["name"] for f in project["files"]] == ["a.csv"]
+    assert _ops(server)[-1] == "query_project"
+
+    server.log.clear()
+    project = client.createProject("Fast", files=[path], refetch=False)
+    assert project["files"] == []
+    assert "query_project" not in _ops(server)
+    assert server.get_file(project["id"], "a.csv") == b"a,b\n1,2\n"
+
+
+def test_update_project(server, client, tmp_path):
+    """Test updating a project's fields while its files upload."""
+    pid = server.add_project("Project")
+    paths = []
+    for name in ("a.csv", "b.csv"):
+        paths.append(tmp_path / name)
+        paths[-1].write_text(name)
+
+    project = client.updateProject(pid, description="new", files=paths)
+    assert project["description"] == "new"
+    assert sorted(f["name"] for f in project["files"]) == ["a.csv", "b.csv"]
+
+    server.log.clear()
+    project = client.updateProject(pid, name="Renamed", files=paths, refetch=False)
+    assert project["name"] == "Renamed"
+    assert "query_project" not in _ops(server)
+    assert ("storage", "PUT") in server.log
+
+
+def test_update_project_upload_fails(server, client, tmp_path, monkeypatch, no_wait):
+    """Test that a failed upload still waits for the fields to be updated."""
+    pid = server.add_project("Project")
+    gql = client._gql
+
+    def slow_gql(*args):
+        time.sleep(0.3)
+        return gql(*args)
+
+    monkeypatch.setattr(client, "_gql", slow_gql)
+    with pytest.raises(APIException, match="invalid path"):
+        client.updateProject(pid, description="new", files=[tmp_path / "nope.csv"])
+    assert server.projects[pid]["description"] == "new"
@@ -0,0 +1,49 @@
+import io
+import os
+import zipfile
+
+
+def test_remote_file_ranges(server, client):
+    """Test seeking and reading a file through range requests."""
+    data = os.urandom(5 * 1024 + 500)
+    pid = server.add_project("Project", files={"a.bin": data})
+    with client.open(pid, "a.bin", block_size=1024, read_ahead=2) as f:
+        f.seek(-100, io.SEEK_END)
+        assert f.read() == data[-100:]
+        assert (f.size, f.requests) == (len(data), 1)
+        f.seek(0)
+        chunks = iter(lambda: f.read(300), b"")
+        assert b"".join(chunks) == data
+        # the footer, then blocks 0-2 and 3-5 with read-ahead
+        assert f.requests == 3
+        f.seek(1000)
+        assert f.read(100) == data[1000:1100]
+        assert f.requests == 3
+
+
+def test_remote_zip_member(server, client):
+    """Test that reading one member of a ZIP skips the rest of it."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as z:
+        z.writestr("big.bin", os.urandom(200_000))
+        z.writestr("small.csv", "a,b\n1,2\n")
+    pid = server.add_project("Project", files={"data.zip": buffer.getvalue()})
+    with client.open(pid, "data.zip", block_size=4096) as f:
+        assert zipfile.ZipFile(f).read("small.csv") == b"a,b\n1,2\n"
+        assert f.requests <= 3
+
+
+def test_remote_compressed_and_empty(server, client, tmp_path):
+    """Test files stored gzipped, where ranges are ignored, and empty files."""
+    pid = server.add_project("Project", files={"empty.csv": b""})
+    path = tmp_path / "a.csv"
+    path.write_text("a,b\n" * 1000)
+    client.upload_file(pid, path, compress=True)
+    with client.open(pid, "a.csv", block_size=100) as f:
+        f.seek(4)
+        assert f.read(4) == b"a,b\n"
+        assert f.size == 4000
+        assert f.read() == b"a,b\n" * 998
+        assert f.requests == 1
+    with client.open(pid, "empty.csv") as f:
+        assert (f.read(), f.size) == (b"", 0)
@@ -0,0 +1,68 @@
+import threading
+import time
+
+from bln.schedule import ByteBudget, largest_first
+
+
+def test_largest_first():
+    """Test ordering transfers by size, ties in their original order."""
+    assert largest_first([1, 30, 5, 30, 0]) == [1, 3, 2, 0, 4]
+    assert largest_first([]) == []
+
+
+def test_byte_budget():
+    """Test that the budget holds transfers until their bytes fit."""
+    budget = ByteBudget(100)
+    assert budget.acquire(60) < 0.1
+    started = []
+
+    def take(size):
+        budget.acquire(size)
+        started.append(size)
+
+    waiting = threading.Thread(target=take, args=(50,))
+    waiting.start()
+    time.sleep(0.05)
+    assert started == []
+    budget.release(60)
+    waiting.join(1)
+    assert started == [50]
+
+    # a file bigger than the budget runs alone
+    waiting = threading.Thread(target=take, args=(500,))
+    waiting.start()
+    time.sleep(0.05)
+    assert started == [50]
+    budget.release(50)
+    waiting.join(1)
+    assert started == [50, 500]
+    assert budget.inflight == 500
+
+
+def test_upload_schedule(server, client, tmp_path):
+    """Test that uploads start largest first and respect the byte cap."""
+    pid = server.add_project("Project")
+    paths = []
+    for name, size in (("small", 10), ("big", 3000), ("medium", 500)):
+        paths.append(str(tmp_path / name))
+        with open(paths[-1], "wb") as f:
+            f.write(b"x" * size)
+    events = []
+    md5s = client.upload_files(pid, paths, jobs=1, report=events.append)
+    assert len(md5s) == 3 and all(md5s)
+    starts = [e for e in events if e["event"] == "start"]
+    assert [(e["position"], e["size"]) for e in starts] == [
+        (0, 3000),
+        (1, 500),
+        (2, 10),
+    ]
+    assert len([e for e in events if e["event"] == "done"]) == 3
+
+    events.clear()
+    client.upload_files(
+        pid, paths, jobs=3, max_inflight_bytes=1000, report=events.append
+    )
+    # the big file is sent alone; the others share the budget
+    for e in events:
+        if e["event"] == "start":
+            assert e["inflight"] == e["size"] or e["inflight"] <= 1000
@@ -0,0 +1,75 @@
+import os
+import threading
+
+import pytest
+
+from bln.exceptions import APIException, Cancelled
+
+
+def test_segmented_download(server, client, tmp_path, no_wait):
+    """Test downloading a file as parallel byte ranges."""
+    data = os.urandom(10_000)
+    pid = server.add_project("Project", files={"a.bin": data})
+    client.MIN_SEGMENT_SIZE = 1000
+    reports = []
+    server.log.clear()
+    path = client.download_file(
+        pid, "a.bin", tmp_path, progress=lambda *a: reports.append(a), segments=4
+    )
+    with open(path, "rb") as f:
+        assert f.read() == data
+    assert server.log.count(("storage", "GET")) == 4
+    assert reports[-1][:2] == (10_000, 10_000)
+
+    # a damaged range is caught by the md5 and every range fetched again
+    server.corrupt()
+    server.log.clear()
+    reports.clear()
+    path = client.download_file(
+        pid, "a.bin", tmp_path, progress=lambda *a: reports.append(a), segments=4
+    )
+    with open(path, "rb") as f:
+        assert f.read() == data
+    assert server.log.count(("storage", "GET")) == 8
+    assert reports[-1][:2] == (10_000, 10_000)
+
+    server.projects[pid]["files"]["a.bin"]["md5"] = "0" * 32
+    with pytest.raises(APIException, match="md5"):
+        client.download_file(pid, "a.bin", tmp_path, segments=4)
+    assert not os.path.exists(path)
+
+
+def test_segmented_download_falls_back(server, client, tmp_path):
+    """Test that small files and files stored gzipped come down in one piece."""
+    pid = server.add_project("Project", files={"small.bin": b"x" * 100})
+    csv = tmp_path / "a.csv"
+    csv.write_text("a,b\n" * 5000)
+    client.upload_file(pid, csv, compress=True)
+    client.MIN_SEGMENT_SIZE = 100
+    out = tmp_path / "out"
+    out.mkdir()
+    for name, source in (("a.csv", csv.read_bytes()), ("small.bin", b"x" * 100)):
+        path = client.download_file(pid, name, out, segments=4)
+        with open(path, "rb") as f:
+            assert f.read() == source
+
+
+def test_segmented_download_cancelled(server, client, tmp_path):
+    """Test that a stopped segmented download leaves no zero-filled file."""
+    pid = server.add_project("Project", files={"a.bin": os.urandom(10_000)})
+    client.MIN_SEGMENT_SIZE = 1000
+    server.bandwidth = 20_000
+    stop = threading.Event()
+    server.log.clear()
+    with pytest.raises(Cancelled):
+        client.download_file(
+            pid,
+            "a.bin",
+            tmp_path,
+            progress=lambda *a: stop.set(),
+            segments=4,
+            cancel=stop,
+        )
+    assert not (tmp_path / "a.bin").exists()
+    # the size and md5 are looked up once, not again for the ranges
+    assert server.log.count(("graphql", "query_project")) == 1
@@ -0,0 +1,45 @@
+from bln.store import EntityStore
+
+
+def test_store_shares_entities(server):
+    """Test that repeated entities in results become one shared object."""
+    for i in range(3):
+        server.add_project(f"Project {i}", files={"a.csv": b"a"})
+    client = server.client(store=True)
+    e = client.everything()
+    owned = {r["project"]["id"]: r["project"] for r in e["projectRoles"]}
+    for role in e["effectiveProjectRoles"]:
+        assert role["project"] is owned[role["project"]["id"]]
+    users = [u for r in e["projectRoles"] for u in r["project"]["userRoles"]]
+    assert all(u is users[0] for u in users)
+
+    project = client.get_project_by_id(role["project"]["id"])
+    assert project is role["project"]
+    assert client.store.get(project["id"]) is project
+
+
+def test_store_merges_fields():
+    """Test that later results update the shared entity in place."""
+    store = EntityStore()
+    first = store.merge({"id": "a", "name": "old", "size": 1})
+    second = store.merge([{"id": "a", "name": "new"}])[0]
+    assert second is first
+    assert first == {"id": "a", "name": "new", "size": 1}
+    assert len(store) == 1
+
+
+def test_store_keeps_changed_projects(server):
+    """Test that refetched projects update the store's shared objects."""
+    pid = server.add_project("Project", files={"a.csv": b"a"})
+    clients = (server.client(store=True), server.client(store=True, models=True))
+    for i, client in enumerate(clients):
+        known = {
+            r["project"]["id"]: r["project"]["updatedAt"]
+            for r in client.changed_projects({})["changed"]
+        }
+        server.add_file(pid, f"b{i}.csv", b"b")
+        (role,) = client.changed_projects(known)["changed"]
+        project = client.store.get(pid)
+        assert role["project"] is project
+        assert len(project["files"]) == len(server.projects[pid]["files"])
+        assert project["updatedAt"] == server.projects[pid]["updatedAt"]
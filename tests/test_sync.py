@@ -0,0 +1,56 @@
+def _actions(actions):
+    return sorted((a["action"], a["name"]) for a in actions)
+
+
+def test_sync_dir(server, client, tmp_path):
+    """Test syncing a directory both ways, with and without deletes."""
+    pid = server.add_project("Sync", files={"remote.csv": b"r", "both.csv": b"b"})
+    (tmp_path / "local.csv").write_text("l")
+    (tmp_path / "both.csv").write_text("b")
+
+    plan = client.sync_dir(pid, tmp_path, dry_run=True)
+    assert _actions(plan) == [("download", "remote.csv"), ("upload", "local.csv")]
+    assert not (tmp_path / "remote.csv").exists()
+
+    client.sync_dir(pid, tmp_path)
+    assert (tmp_path / "remote.csv").read_bytes() == b"r"
+    assert server.get_file(pid, "local.csv") == b"l"
+    assert client.sync_dir(pid, tmp_path) == []
+
+    (tmp_path / "local.csv").write_text("changed")
+    server.add_file(pid, "remote.csv", b"changed too")
+    (tmp_path / "both.csv").unlink()
+    actions = client.sync_dir(pid, tmp_path, delete=True)
+    assert _actions(actions) == [
+        ("delete_remote", "both.csv"),
+        ("download", "remote.csv"),
+        ("upload", "local.csv"),
+    ]
+    assert "both.csv" not in server.projects[pid]["files"]
+    assert (tmp_path / "remote.csv").read_bytes() == b"changed too"
+
+
+def test_sync_dir_down(server, client, tmp_path):
+    """Test that a one-way sync leaves the other side alone."""
+    pid = server.add_project("Down", files={"a.csv": b"a"})
+    (tmp_path / "extra.csv").write_text("x")
+    assert _actions(client.sync_dir(pid, tmp_path, direction="down")) == [
+        ("download", "a.csv")
+    ]
+    actions = client.sync_dir(pid, tmp_path, direction="down", delete=True)
+    assert _actions(actions) == [("delete_local", "extra.csv")]
+    assert list(server.projects[pid]["files"]) == ["a.csv"]
+
+
+def test_parse_timestamp():
+    """Test reading API dates the same way on every Python version."""
+    from bln.sync import _parse_timestamp
+
+    expected = 1700000000.5
+    for value in (
+        "2023-11-14T22:13:20.5Z",
+        "2023-11-14T22:13:20.500000+00:00",
+        "2023-11-14T23:13:20.5000000+01:00",
+        "2023-11-14T22:13:20.500",
+    ):
+        assert _parse_timestamp(value) == expected
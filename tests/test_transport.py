@@ -0,0 +1,22 @@
+import pytest
+
+
+@pytest.mark.parametrize("http2", [False, True])
+def test_transport_round_trip(server, tmp_path, http2):
+    """Test GraphQL calls and transfers over each transport."""
+    if http2:
+        pytest.importorskip("h2")
+    pid = server.add_project("Project")
+    path = tmp_path / "a.bin"
+    path.write_bytes(b"x" * 3_000_000)
+    done = []
+    with server.client(http2=http2) as client:
+        session = client.session
+        client.upload_files(pid, [path], progress=lambda *a: done.append(a[0]))
+        assert done[-1] == 3_000_000
+        out = tmp_path / "out"
+        out.mkdir()
+        client.download_file(pid, "a.bin", out)
+        assert (out / "a.bin").read_bytes() == path.read_bytes()
+        assert client.session is session
+    assert client._session is None
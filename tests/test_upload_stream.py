@@ -0,0 +1,59 @@
+import hashlib
+import io
+
+import pytest
+
+from bln.exceptions import APIException
+
+
+def test_upload_stream(server, client, tmp_path):
+    """Test uploading files and buffers as a generator makes them."""
+    pid = server.add_project("Project")
+    path = tmp_path / "a.csv"
+    path.write_text("a,b\n1,2\n")
+    made = []
+
+    def export():
+        yield str(path)
+        for i in range(5):
+            made.append(i)
+            yield f"part{i}.bin", b"x" * i if i % 2 else io.BytesIO(b"y" * i)
+
+    reports = []
+    results = dict(
+        client.upload_stream(
+            pid, export(), jobs=2, progress=lambda *a: reports.append(a)
+        )
+    )
+    assert sorted(results) == sorted([str(path)] + [f"part{i}.bin" for i in range(5)])
+    assert server.get_file(pid, "part3.bin") == b"xxx"
+    assert server.get_file(pid, "part4.bin") == b"yyyy"
+    assert results["part4.bin"] == hashlib.md5(b"yyyy").hexdigest()
+    assert reports[-1][:2] == (8 + 1 + 2 + 3 + 4, 8 + 1 + 2 + 3 + 4)
+
+
+def test_upload_stream_backpressure(server, client):
+    """Test that the generator is only read a bounded distance ahead."""
+    pid = server.add_project("Project")
+    taken = []
+
+    def export():
+        for i in range(20):
+            taken.append(i)
+            yield f"{i}.txt", b"data"
+
+    stream = client.upload_stream(pid, export(), jobs=1, queue_size=2)
+    first = next(stream)
+    assert first[0] == "0.txt"
+    # one uploading, two queued and the one being handed over at most
+    assert len(taken) <= 5
+    stream.close()
+    assert len(taken) < 20
+
+
+def test_upload_stream_error(server, client, no_wait):
+    """Test that a failed upload raises from the stream."""
+    pid = server.add_project("Project")
+    server.fail("graphql", times=4)
+    with pytest.raises(APIException):
+        list(client.upload_stream(pid, [("a.txt", b"a")], jobs=1))
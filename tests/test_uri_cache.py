@@ -0,0 +1,39 @@
+from bln.client import _uri_expiry
+
+
+def test_download_uri_reused(server, client, tmp_path):
+    """Test that repeated downloads mint one uri and re-mint after a 403."""
+    pid = server.add_project("Project", files={"a.csv": b"a,b\n"})
+    client.download_file(pid, "a.csv", tmp_path)
+    client.download_file(pid, "a.csv", tmp_path)
+    mints = [
+        e for e in server.log if e == ("graphql", "mutation_createFileDownloadUri")
+    ]
+    assert len(mints) == 1
+
+    server.fail("storage", status=403)
+    server.log.clear()
+    assert client.download_file(pid, "a.csv", tmp_path)
+    assert server.log == [
+        ("graphql", "query_project"),
+        ("graphql", "mutation_createFileDownloadUri"),
+        ("storage", "GET"),
+    ]
+
+
+def test_download_uri_expiry(server, client):
+    """Test that uris close to their expiry are not reused."""
+    pid = server.add_project("Project", files={"a.csv": b"a,b\n"})
+    server.url_expires = client.URI_EXPIRY_MARGIN
+    first = client.download_uri(pid, "a.csv")
+    assert client.download_uri(pid, "a.csv") != first
+
+
+def test_uri_expiry():
+    """Test reading the expiry of V4 and V2 signed uris."""
+    v4 = "https://x/a?X-Goog-Date=20240101T000000Z&X-Goog-Expires=600&X-Goog-X=1"
+    assert _uri_expiry(v4) == 1704067200 + 600
+    assert _uri_expiry("https://x/a?GoogleAccessId=x&Expires=1704067200") == (
+        1704067200
+    )
+    assert _uri_expiry("https://x/a") is None